@@ -0,0 +1,4 @@
+"""Offline benchmarks for the Cloudflare Browser Rendering CLI.
+
+Run with ``python -m benchmarks.run``; see :mod:`benchmarks.run` for options.
+"""
@@ -0,0 +1,142 @@
+"""In-process fake of the Cloudflare Browser Rendering API.
+
+:class:`FakeBrowserRendering` serves the responses of
+:class:`~cloudflare_browser_render.mockserver.MockBrowserRendering` (the
+engine behind ``cbr mock-server``) through an :class:`httpx.MockTransport`
+instead of a socket. The real Cloudflare SDK client – request building,
+response parsing, its own 429 retries – and everything above it therefore run
+exactly as in production, without network, ports or credentials.
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import AsyncIterator, Generator, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import httpx
+
+from cloudflare_browser_render.mockserver import API_PREFIX, MockBrowserRendering
+
+BASE_URL = f"http://fake-browser-rendering.test{API_PREFIX}"
+
+
+async def _aiter(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+class FakeBrowserRendering(MockBrowserRendering):
+    """Mock Browser Rendering API reachable through an httpx transport."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Configure the fake; see :class:`MockBrowserRendering` for options.
+
+        Unlike the mock server, the fake defaults to a fixed seed and a 10 ms
+        ``Retry-After`` so benchmark runs are repeatable and quick.
+        """
+        kwargs.setdefault("seed", 0)
+        kwargs.setdefault("retry_after", 0.01)
+        super().__init__(**kwargs)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Answer *request* synchronously (for :class:`httpx.Client`).
+
+        Returns:
+            The fake response, its body streamed in chunks.
+
+        """
+        delay, response = self.handle(request.url.path, request.content)
+        if delay:
+            time.sleep(delay)
+        return httpx.Response(
+            response.status, headers=response.headers, content=response.chunks
+        )
+
+    async def handle_request_async(self, request: httpx.Request) -> httpx.Response:
+        """Answer *request* asynchronously (for :class:`httpx.AsyncClient`).
+
+        Returns:
+            The fake response, its body streamed in chunks.
+
+        """
+        delay, response = self.handle(request.url.path, request.content)
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(
+            response.status, headers=response.headers, content=_aiter(response.chunks)
+        )
+
+    def client(self, **kwargs: Any) -> Any:
+        """Return a Cloudflare SDK client wired to this fake.
+
+        Like the package's own client, it leaves retries to
+        ``call_with_retry`` unless *kwargs* set ``max_retries``.
+
+        Returns:
+            A ``cloudflare.Cloudflare`` instance.
+
+        """
+        from cloudflare import Cloudflare
+
+        kwargs.setdefault("max_retries", 0)
+
+        transport = httpx.MockTransport(self.handle_request)
+        return Cloudflare(
+            api_token="fake-token",
+            base_url=BASE_URL,
+            http_client=httpx.Client(transport=transport),
+            **kwargs,
+        )
+
+    def async_client(self, **kwargs: Any) -> Any:
+        """Return an async Cloudflare SDK client wired to this fake.
+
+        Returns:
+            A ``cloudflare.AsyncCloudflare`` instance.
+
+        """
+        from cloudflare import AsyncCloudflare
+
+        kwargs.setdefault("max_retries", 0)
+
+        transport = httpx.MockTransport(self.handle_request_async)
+        return AsyncCloudflare(
+            api_token="fake-token",
+            base_url=BASE_URL,
+            http_client=httpx.AsyncClient(transport=transport),
+            **kwargs,
+        )
+
+    @contextmanager
+    def installed(self, **kwargs: Any) -> Generator["FakeBrowserRendering", None, None]:
+        """Make the package's client singletons talk to this fake.
+
+        Credentials are set to dummy values for the duration; the previous
+        clients and environment are restored afterwards.
+
+        Yields:
+            The fake itself.
+
+        """
+        import cloudflare_browser_render.client as client_mod
+
+        saved = (client_mod._cf_client, client_mod._async_cf_client)
+        saved_env = {
+            name: os.environ.get(name)
+            for name in ("CLOUDFLARE_API_TOKEN", "CLOUDFLARE_ACCOUNT_ID")
+        }
+        os.environ["CLOUDFLARE_API_TOKEN"] = "fake-token"
+        os.environ["CLOUDFLARE_ACCOUNT_ID"] = "fake-account"
+        client_mod._cf_client = self.client(**kwargs)
+        client_mod._async_cf_client = self.async_client(**kwargs)
+        try:
+            yield self
+        finally:
+            client_mod._cf_client, client_mod._async_cf_client = saved
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
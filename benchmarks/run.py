@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Run the offline benchmark suite and record the results as JSON.
+
+Every benchmark talks to :class:`benchmarks.fake.FakeBrowserRendering`
+through the real Cloudflare SDK, so no network access or credentials are
+needed. The suite measures:
+
+* ``single_call.*`` – per-call overhead of each renderer at zero latency,
+  next to a bare SDK call as the baseline;
+* ``throughput.*`` – URLs per second of ``cbr batch`` (rendering *and*
+  writing files) against a fixed server latency, with and without injected
+  429 responses;
+* ``memory.*`` – tracemalloc peak for a large PDF, buffered versus streamed;
+* ``startup.*`` – CLI import and ``--help`` time in a fresh interpreter.
+
+Results are written as ``{"meta": ..., "results": {name: {"value", "unit",
+"better"}}}``. Pass ``--compare BASELINE.json`` to print the change against
+an earlier run and exit non-zero on regressions beyond ``--tolerance``.
+
+Usage::
+
+    python -m benchmarks.run -o results.json
+    python -m benchmarks.run --quick --compare results.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from benchmarks.fake import FakeBrowserRendering
+
+URL = "https://bench.test/page"
+ENDPOINT_CALLS: dict[str, Callable[[Callable[..., Any]], Any]] = {
+    "content": lambda render: render(URL),
+    "markdown": lambda render: render(URL),
+    "links": lambda render: render(URL),
+    "json": lambda render: render(URL),
+    "scrape": lambda render: render(URL, "h1"),
+    "snapshot": lambda render: render(URL),
+    "pdf": lambda render: render(URL),
+    "screenshot": lambda render: render(URL),
+}
+
+Results = dict[str, dict[str, Any]]
+
+
+def _record(results: Results, name: str, value: float, unit: str, better: str) -> None:
+    results[name] = {"value": round(value, 6), "unit": unit, "better": better}
+    print(f"  {name:<40} {value:>14.3f} {unit}")
+
+
+def bench_single_call(results: Results, calls: int) -> None:
+    """Median wall time per renderer call, with the SDK call as a baseline."""
+    from cloudflare_browser_render.client import get_client
+    from cloudflare_browser_render.renderers import get_renderer
+
+    with FakeBrowserRendering(binary_size=16 * 1024).installed():
+        cf = get_client()
+
+        def _sdk() -> None:
+            cf.browser_rendering.content.with_raw_response.create(
+                account_id="fake-account", url=URL
+            ).text()
+
+        benchmarks = {"sdk_content": _sdk}
+        for endpoint, call in ENDPOINT_CALLS.items():
+            render = get_renderer(endpoint)
+            benchmarks[endpoint] = lambda render=render, call=call: call(render)
+
+        for name, func in benchmarks.items():
+            func()  # warm up imports and connection state
+            samples = []
+            for _ in range(calls):
+                started = time.perf_counter()
+                func()
+                samples.append(time.perf_counter() - started)
+            median_us = statistics.median(samples) * 1e6
+            _record(results, f"single_call.{name}", median_us, "us", "lower")
+
+
+def _run_batch(fake: FakeBrowserRendering, urls: int, jobs: int) -> float:
+    from click.testing import CliRunner
+
+    from cloudflare_browser_render.cli import cli
+
+    with tempfile.TemporaryDirectory() as tmp:
+        urls_file = Path(tmp, "urls.txt")
+        urls_file.write_text("".join(f"{URL}/{n}\n" for n in range(urls)))
+        args = ["batch", "markdown", str(urls_file), "-d", str(Path(tmp, "out"))]
+        started = time.perf_counter()
+        with fake.installed():
+            result = CliRunner().invoke(cli, [*args, "-j", str(jobs)])
+        elapsed = time.perf_counter() - started
+        if result.exit_code != 0:
+            raise RuntimeError(f"batch failed: {result.output}")
+    return urls / elapsed
+
+
+def bench_throughput(results: Results, urls: int, jobs: int, latency: float) -> None:
+    """URLs per second of ``cbr batch``, with and without injected 429s."""
+    fake = FakeBrowserRendering(latency=latency)
+    _record(
+        results, "throughput.batch", _run_batch(fake, urls, jobs), "urls/s", "higher"
+    )
+
+    fake = FakeBrowserRendering(latency=latency, rate_limit_rate=0.1)
+    rate = _run_batch(fake, urls, jobs)
+    _record(results, "throughput.batch_429", rate, "urls/s", "higher")
+    limited = sum(fake.rate_limited.values())
+    _record(results, "throughput.batch_429_responses", limited, "count", "info")
+
+
+def bench_memory(results: Results, size: int) -> None:
+    """Peak traced memory while saving a large PDF, buffered vs streamed."""
+    from cloudflare_browser_render.renderers.pdf import render_pdf, stream_pdf
+    from cloudflare_browser_render.utils import save_bytes
+
+    runs = {
+        "buffered": lambda path: save_bytes(render_pdf(URL), path),
+        "streamed": lambda path: stream_pdf(URL, path),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        with FakeBrowserRendering(binary_size=size).installed():
+            for name, run in runs.items():
+                path = str(Path(tmp, f"{name}.pdf"))
+                tracemalloc.start()
+                run(path)
+                _current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                _record(
+                    results, f"memory.pdf_{name}_peak", peak / 2**20, "MiB", "lower"
+                )
+
+
+def bench_startup(results: Results, repeat: int) -> None:
+    """Best-of-*repeat* CLI import and ``--help`` time in a fresh interpreter."""
+    commands = {
+        "import": [sys.executable, "-c", "import cloudflare_browser_render.cli"],
+        "help": [sys.executable, "-m", "cloudflare_browser_render", "--help"],
+    }
+    for name, command in commands.items():
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.run(command, check=True, capture_output=True)
+            best = min(best, time.perf_counter() - started)
+        _record(results, f"startup.{name}", best * 1000, "ms", "lower")
+
+
+def compare(results: Results, baseline: Results, tolerance: float) -> list[str]:
+    """Print the change of every metric against *baseline*.
+
+    Returns:
+        The names of metrics that regressed by more than *tolerance*.
+
+    """
+    regressions = []
+    print(f"\nCompared with baseline (tolerance {tolerance:.0%}):")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None or not before["value"] or result["better"] == "info":
+            continue
+        change = result["value"] / before["value"] - 1
+        worse = -change if result["better"] == "higher" else change
+        flag = "REGRESSION" if worse > tolerance else ""
+        print(f"  {name:<40} {change:>+8.1%} {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the suite.
+
+    Returns:
+        The process exit code: 1 if ``--compare`` found regressions.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", default="benchmark-results.json")
+    parser.add_argument("--quick", action="store_true", help="Small, fast runs.")
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--compare", type=Path, help="Baseline results JSON.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=["single_call", "throughput", "memory", "startup"],
+        help="Run only the named benchmark group (repeatable).",
+    )
+    args = parser.parse_args(argv)
+
+    groups: dict[str, Callable[[Results], None]] = {
+        "single_call": lambda r: bench_single_call(r, 20 if args.quick else 200),
+        "throughput": lambda r: bench_throughput(
+            r, 20 if args.quick else 200, args.jobs, args.latency
+        ),
+        "memory": lambda r: bench_memory(r, (4 if args.quick else 64) * 2**20),
+        "startup": lambda r: bench_startup(r, 1 if args.quick else 5),
+    }
+    results: Results = {}
+    for name, run in groups.items():
+        if args.only and name not in args.only:
+            continue
+        print(f"{name}:")
+        run(results)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "jobs": args.jobs,
+            "latency": args.latency,
+        },
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
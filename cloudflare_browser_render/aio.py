@@ -0,0 +1,115 @@
+"""Asyncio-native rendering API.
+
+Exposes ``render_<endpoint>_async`` coroutines for every endpoint plus
+:func:`render_many`, an async generator that renders many URLs concurrently on
+a single event loop and yields results as they complete::
+
+    async for item in render_many("markdown", urls, concurrency=50):
+        if item.ok:
+            handle(item.url, item.result)
+"""
+
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from typing import Any
+
+from cloudflare_browser_render.batch import BatchItem
+from cloudflare_browser_render.client import reserve_connections
+from cloudflare_browser_render.renderers import get_async_renderer
+from cloudflare_browser_render.renderers.content import render_content_async
+from cloudflare_browser_render.renderers.json import render_json_async
+from cloudflare_browser_render.renderers.links import render_links_async
+from cloudflare_browser_render.renderers.markdown import render_markdown_async
+from cloudflare_browser_render.renderers.pdf import render_pdf_async
+from cloudflare_browser_render.renderers.scrape import render_scrape_async
+from cloudflare_browser_render.renderers.screenshot import render_screenshot_async
+from cloudflare_browser_render.renderers.snapshot import render_snapshot_async
+
+__all__ = [
+    "BatchItem",
+    "render_content_async",
+    "render_json_async",
+    "render_links_async",
+    "render_many",
+    "render_markdown_async",
+    "render_pdf_async",
+    "render_scrape_async",
+    "render_screenshot_async",
+    "render_snapshot_async",
+]
+
+
+async def _aiter_urls(urls: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[str]:
+    """Yield from *urls*, whether it is a sync or an async iterable.
+
+    Yields:
+        Each URL in *urls*.
+
+    """
+    if isinstance(urls, AsyncIterable):
+        async for url in urls:
+            yield url
+    else:
+        for url in urls:
+            yield url
+
+
+async def render_many(
+    endpoint: str,
+    urls: Iterable[str] | AsyncIterable[str],
+    *,
+    concurrency: int = 16,
+    **params: Any,
+) -> AsyncIterator[BatchItem]:
+    """Render *urls* with *endpoint*, keeping up to *concurrency* requests open.
+
+    URLs are pulled from *urls* only as slots free up, so arbitrarily large
+    (or unbounded async) sources can be fed in.
+
+    Args:
+        endpoint: Name of the Browser Rendering endpoint (see ``ENDPOINTS``).
+        urls: URLs to render; either a regular or an async iterable.
+        concurrency: Maximum number of requests in flight at once.
+        **params: Extra keyword arguments passed to the renderer.
+
+    Yields:
+        A :class:`BatchItem` per URL, in completion order. Renderer exceptions
+        are captured on the item rather than raised.
+
+    Raises:
+        ValueError: If *concurrency* is smaller than 1.
+
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    reserve_connections(concurrency)
+
+    renderer = get_async_renderer(endpoint)
+    url_iter = _aiter_urls(urls)
+    pending: dict[asyncio.Task, str] = {}
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    url = await anext(url_iter)
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(renderer(url, **params))] = url
+
+            if not pending:
+                return
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                url = pending.pop(task)
+                error = task.exception()
+                if error is None:
+                    yield BatchItem(url, task.result())
+                else:
+                    yield BatchItem(url, error=error)
+    finally:
+        # Consumer stopped early (break / cancellation): don't leak requests.
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,119 @@
+"""Concurrent multi-URL rendering.
+
+Fans a stream of URLs out over a bounded thread pool and yields one
+:class:`BatchItem` per URL as soon as its render completes. At most
+``2 * jobs`` renders are queued at any time, so memory stays bounded no
+matter how many URLs are fed in.
+"""
+
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from typing import IO, Any, NamedTuple
+
+from cloudflare_browser_render.client import reserve_connections
+from cloudflare_browser_render.renderers import get_renderer
+
+# File extension used when writing each endpoint's result to disk.
+EXTENSIONS: dict[str, str] = {
+    "content": ".html",
+    "screenshot": ".png",
+    "pdf": ".pdf",
+    "snapshot": ".json",
+    "scrape": ".json",
+    "json": ".json",
+    "links": ".json",
+    "markdown": ".md",
+}
+
+
+class BatchItem(NamedTuple):
+    """Outcome of rendering a single URL in a batch."""
+
+    url: str
+    result: Any = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the render succeeded."""
+        return self.error is None
+
+
+def read_urls(stream: IO[str]) -> Iterator[str]:
+    """Yield URLs from *stream*, one per line.
+
+    Blank lines and lines starting with ``#`` are skipped, as are URLs that
+    were already seen earlier in the stream.
+
+    Yields:
+        Each unique URL in input order.
+
+    """
+    seen: set[str] = set()
+    for line in stream:
+        url = line.strip()
+        if not url or url.startswith("#") or url in seen:
+            continue
+        seen.add(url)
+        yield url
+
+
+def iter_batch(
+    endpoint: str,
+    urls: Iterable[str],
+    *,
+    jobs: int = 4,
+    render: Callable[..., Any] | None = None,
+    **params: Any,
+) -> Iterator[BatchItem]:
+    """Render every URL in *urls* with *endpoint* using *jobs* worker threads.
+
+    Args:
+        endpoint: Name of the Browser Rendering endpoint (see ``ENDPOINTS``).
+        urls: URLs to render. Consumed lazily.
+        jobs: Maximum number of renders in flight at once.
+        render: Callable used instead of the endpoint's renderer, e.g. to
+            stream binary bodies straight to disk. Called as
+            ``render(url, **params)``.
+        **params: Extra keyword arguments passed to the renderer (e.g.
+            ``selector`` for ``scrape``).
+
+    Yields:
+        A :class:`BatchItem` per URL, in completion order. Renderer exceptions
+        are captured on the item rather than raised.
+
+    Raises:
+        ValueError: If *jobs* is smaller than 1.
+
+    """
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    reserve_connections(jobs)
+
+    # Imported here to keep the CLI's start-up path lean.
+    from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+    renderer = render or get_renderer(endpoint)
+    url_iter = iter(urls)
+    pool = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="cbr")
+    pending: dict[Future, str] = {}
+
+    def _fill() -> None:
+        for url in islice(url_iter, 2 * jobs - len(pending)):
+            pending[pool.submit(renderer, url, **params)] = url
+
+    try:
+        _fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    yield BatchItem(url, future.result())
+                except Exception as exc:  # noqa: BLE001 – reported per item
+                    yield BatchItem(url, error=exc)
+            _fill()
+    finally:
+        # When the caller stops early (break, Ctrl-C), drop the queued renders
+        # instead of running them all before returning.
+        pool.shutdown(wait=True, cancel_futures=True)
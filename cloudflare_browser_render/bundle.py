@@ -0,0 +1,332 @@
+"""Several output formats per URL, fetched concurrently.
+
+A bundle renders one URL with several endpoints at once and writes each
+result into a per-URL directory (``markdown.md``, ``links.json``,
+``screenshot.png``, ...). Requests for the same URL run in parallel, so a
+bundle takes about as long as its slowest endpoint rather than the sum of all
+of them.
+
+Where one response can serve several formats it is only requested once: the
+``snapshot`` endpoint returns both the rendered HTML and a screenshot, so a
+bundle asking for ``content`` and ``screenshot`` makes a single snapshot call.
+With local extraction enabled, ``markdown`` and ``links`` are derived from
+that HTML too.
+"""
+
+import json
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from cloudflare_browser_render.batch import EXTENSIONS
+from cloudflare_browser_render.client import reserve_connections
+from cloudflare_browser_render.extract import (
+    extract_links,
+    extract_markdown,
+    html_from_content,
+    local_extract_enabled,
+)
+from cloudflare_browser_render.renderers import (
+    ENDPOINTS,
+    STREAMING_ENDPOINTS,
+    get_renderer,
+    get_streamer,
+)
+from cloudflare_browser_render.result import RenderResult, unwrap
+from cloudflare_browser_render.utils import (
+    iter_base64,
+    iter_encoded,
+    save_bytes,
+    save_stream,
+    save_text,
+    url_to_filename,
+)
+
+# Formats a bundle can contain (scrape needs per-run selectors).
+BUNDLE_FORMATS: tuple[str, ...] = tuple(e for e in ENDPOINTS if e != "scrape")
+DEFAULT_FORMATS: tuple[str, ...] = ("markdown", "links", "screenshot")
+
+# A task renders one URL into a directory and returns the files it wrote,
+# keyed by format.
+_Task = Callable[[str, Path], dict[str, Path]]
+
+
+class BundleItem(NamedTuple):
+    """Outcome of bundling a single URL."""
+
+    url: str
+    directory: Path
+    files: dict[str, Path]
+    errors: dict[str, Exception]
+
+    @property
+    def ok(self) -> bool:
+        """Whether every format was rendered."""
+        return not self.errors
+
+
+def bundle_filename(fmt: str) -> str:
+    """Return the file name used for *fmt* inside a bundle directory."""
+    return f"{fmt}{EXTENSIONS[fmt]}"
+
+
+def _write(value: Any, path: Path) -> Path:
+    """Write a renderer result to *path* according to its type.
+
+    Returns:
+        *path*.
+
+    """
+    if isinstance(value, bytes):
+        return save_bytes(value, str(path))
+    if isinstance(value, RenderResult):
+        return save_bytes(value.data, str(path))
+    if isinstance(value, Iterator):  # chunks, e.g. a streamed base64 decode
+        return save_stream(value, str(path)) or path
+    if isinstance(value, str):
+        return save_text(value, str(path))
+    return save_text(json.dumps(value, indent=2), str(path))
+
+
+def snapshot_payload(result: Any) -> dict[str, Any]:
+    """Return the ``result`` object of a snapshot response.
+
+    Returns:
+        The payload holding ``content`` and ``screenshot``, or ``{}``.
+
+    """
+    result = unwrap(result)
+    payload = result.get("result", result) if isinstance(result, dict) else {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def split_snapshot(result: Any, directory: Path) -> dict[str, Path]:
+    """Write a snapshot response as separate files in *directory*.
+
+    The page HTML goes to ``content.html`` and the screenshot, base64-decoded
+    chunk by chunk, to ``screenshot.png``. Everything else, with the two
+    large fields replaced by those file names, goes to ``snapshot.json``. The
+    base64 string is never copied whole or pretty-printed.
+
+    Returns:
+        The written files, keyed by ``content``, ``screenshot`` and
+        ``snapshot``.
+
+    """
+    envelope = unwrap(result)
+    payload = snapshot_payload(envelope)
+    directory.mkdir(parents=True, exist_ok=True)
+    files: dict[str, Path] = {}
+    if payload.get("content"):
+        path = directory / bundle_filename("content")
+        files["content"] = _write(iter_encoded(payload["content"]), path)
+    if payload.get("screenshot"):
+        path = directory / bundle_filename("screenshot")
+        files["screenshot"] = _write(iter_base64(payload["screenshot"]), path)
+
+    metadata = {k: v for k, v in payload.items() if k not in files}
+    metadata.update({fmt: path.name for fmt, path in files.items()})
+    if isinstance(envelope, dict) and "result" in envelope:
+        metadata = {**envelope, "result": metadata}
+    files["snapshot"] = _write(metadata, directory / bundle_filename("snapshot"))
+    return files
+
+
+def _endpoint_task(fmt: str) -> _Task:
+    def _run(url: str, directory: Path) -> dict[str, Path]:
+        path = directory / bundle_filename(fmt)
+        if fmt in STREAMING_ENDPOINTS:
+            get_streamer(fmt)(url, str(path))
+            return {fmt: path}
+        result = get_renderer(fmt, lazy=True)(url)
+        if fmt == "content":
+            # Bare HTML, as served from a snapshot, not the JSON envelope.
+            result = iter_encoded(html_from_content(unwrap(result)))
+        _write(result, path)
+        return {fmt: path}
+
+    return _run
+
+
+def _derived_values(html: str, url: str) -> dict[str, Callable[[], Any]]:
+    """Return lazy producers for the formats extracted locally from *html*.
+
+    Returns:
+        ``markdown`` and ``links`` producers.
+
+    """
+    return {
+        "markdown": lambda: extract_markdown(html, url),
+        "links": lambda: extract_links(html, url),
+    }
+
+
+def _snapshot_task(formats: tuple[str, ...]) -> _Task:
+    """Serve *formats* from a single ``snapshot`` request.
+
+    The snapshot carries the rendered HTML (``content``) and a base64
+    screenshot; ``markdown`` and ``links`` are extracted from the HTML.
+
+    Returns:
+        A task making a single ``snapshot`` request.
+
+    """
+
+    def _run(url: str, directory: Path) -> dict[str, Path]:
+        result = get_renderer("snapshot", lazy=True)(url)
+        payload = snapshot_payload(result)
+        html = payload.get("content") or ""
+        values = {
+            "snapshot": lambda: result,
+            "content": lambda: iter_encoded(html),
+            "screenshot": lambda: iter_base64(payload.get("screenshot") or ""),
+            **_derived_values(html, url),
+        }
+        return {
+            fmt: _write(values[fmt](), directory / bundle_filename(fmt))
+            for fmt in formats
+        }
+
+    return _run
+
+
+def _content_task(formats: tuple[str, ...]) -> _Task:
+    """Serve *formats* from a single ``content`` request.
+
+    Returns:
+        A task making a single ``content`` request and extracting
+        ``markdown``/``links`` locally.
+
+    """
+
+    def _run(url: str, directory: Path) -> dict[str, Path]:
+        html = html_from_content(unwrap(get_renderer("content", lazy=True)(url)))
+        values = {
+            "content": lambda: iter_encoded(html),
+            **_derived_values(html, url),
+        }
+        return {
+            fmt: _write(values[fmt](), directory / bundle_filename(fmt))
+            for fmt in formats
+        }
+
+    return _run
+
+
+def plan_bundle(
+    formats: Iterable[str], *, local: bool | None = None
+) -> list[tuple[tuple[str, ...], _Task]]:
+    """Group *formats* into the smallest set of requests that serves them.
+
+    A ``snapshot`` serves ``content`` and ``screenshot`` together. With
+    local extraction (by default, whenever :mod:`extract` is enabled),
+    ``markdown`` and ``links`` are derived from that same HTML as well.
+
+    Returns:
+        ``(formats served, task)`` pairs, one per request to make.
+
+    Raises:
+        ValueError: If a format cannot be bundled.
+
+    """
+    wanted = list(dict.fromkeys(formats))
+    unknown = [fmt for fmt in wanted if fmt not in BUNDLE_FORMATS]
+    if unknown:
+        raise ValueError(f"Cannot bundle format(s): {', '.join(unknown)}")
+    if local is None:
+        local = local_extract_enabled()
+
+    html_formats = {"content", "markdown", "links"} if local else {"content"}
+    needs_html = [fmt for fmt in wanted if fmt in html_formats]
+    html_served: tuple[str, ...] = ()
+    html_task = None
+    # One snapshot is cheaper than separate HTML and screenshot renders.
+    if "snapshot" in wanted or ("screenshot" in wanted and needs_html):
+        html_served = tuple(
+            f for f in wanted if f in {"snapshot", "screenshot", *html_formats}
+        )
+        html_task = _snapshot_task(html_served)
+    elif local and needs_html:
+        html_served = tuple(needs_html)
+        html_task = _content_task(html_served)
+
+    tasks = [((fmt,), _endpoint_task(fmt)) for fmt in wanted if fmt not in html_served]
+    if html_task is not None:
+        tasks.insert(0, (html_served, html_task))
+    return tasks
+
+
+def iter_bundles(
+    urls: Iterable[str],
+    formats: Iterable[str] = DEFAULT_FORMATS,
+    output_dir: str | Path = "output",
+    *,
+    jobs: int = 4,
+) -> Iterator[BundleItem]:
+    """Render every URL in *urls* into a bundle directory under *output_dir*.
+
+    Args:
+        urls: URLs to render. Consumed lazily.
+        formats: Endpoints to include in each bundle.
+        output_dir: Parent directory; each URL gets a sub-directory named
+            after it (see :func:`utils.url_to_filename`).
+        jobs: Maximum number of requests in flight at once, across URLs.
+
+    Yields:
+        A :class:`BundleItem` per URL once all of its formats are done.
+        Renderer exceptions are captured on the item rather than raised.
+
+    Raises:
+        ValueError: If *jobs* is smaller than 1 or a format cannot be bundled.
+
+    """
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    reserve_connections(jobs)
+    tasks = plan_bundle(formats)
+
+    # Imported here to keep the CLI's start-up path lean.
+    from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+    root = Path(output_dir)
+    seen: set[str] = set()
+    unique_urls = (url for url in urls if not (url in seen or seen.add(url)))
+    # Every URL's tasks are queued together, so a bundle is never starved by
+    # the next URL's requests.
+    work = (
+        (url, root / url_to_filename(url), served, task)
+        for url in unique_urls
+        for served, task in tasks
+    )
+    # url -> [remaining tasks, directory, files, errors]
+    state: dict[str, list[Any]] = {}
+    pool = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="cbr-bundle")
+    pending: dict[Future, tuple[str, tuple[str, ...]]] = {}
+
+    def _fill() -> None:
+        for url, directory, served, task in islice(work, 2 * jobs - len(pending)):
+            if url not in state:
+                directory.mkdir(parents=True, exist_ok=True)
+                state[url] = [len(tasks), directory, {}, {}]
+            pending[pool.submit(task, url, directory)] = (url, served)
+
+    try:
+        _fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, served = pending.pop(future)
+                entry = state[url]
+                try:
+                    entry[2].update(future.result())
+                except Exception as exc:  # noqa: BLE001 – reported per item
+                    entry[3].update(dict.fromkeys(served, exc))
+                entry[0] -= 1
+                if not entry[0]:
+                    del state[url]
+                    yield BundleItem(url, entry[1], entry[2], entry[3])
+            _fill()
+    finally:
+        # Stopping early (break, Ctrl-C) drops the queued tasks.
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,466 @@
+"""Persistent on-disk response cache.
+
+Responses are stored content-addressed under ``<directory>/<endpoint>/`` with
+a file name derived from a SHA-256 of ``(endpoint, url, params)`` and the
+account and API base URL they were requested from. Freshness
+is judged from each entry's modification time against a per-endpoint TTL,
+while the access time is refreshed on every hit and drives LRU eviction once
+the cache exceeds its size budget.
+
+All renderers look results up through :func:`cached_render`, which is a no-op
+until a cache has been activated with :func:`configure_cache` (the CLI does so
+for ``--cache-dir``). It also coalesces concurrent identical requests, with or
+without a cache, so that a hot URL is rendered once however many threads or
+tasks ask for it at the same moment.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Mapping
+from contextlib import ExitStack
+from pathlib import Path
+from typing import IO, Any, TypeVar
+
+from cloudflare_browser_render.client import api_scope
+from cloudflare_browser_render.profiling import phase
+from cloudflare_browser_render.result import JSON, TEXT, RenderResult
+from cloudflare_browser_render.singleflight import SingleFlight
+from cloudflare_browser_render.utils import STREAM_CHUNK_SIZE, save_stream
+
+T = TypeVar("T")
+
+DEFAULT_TTL = 24 * 60 * 60  # one day
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB
+
+# On-disk suffix per cached value type.
+_SUFFIXES: dict[type, str] = {bytes: ".bin", str: ".txt"}
+_JSON_SUFFIX = ".json"
+
+
+def _read_chunks(fh: IO[bytes]) -> Iterator[bytes]:
+    """Yield *fh* in ``STREAM_CHUNK_SIZE`` chunks, closing it when done.
+
+    Yields:
+        Successive chunks of the file.
+
+    """
+    with fh:
+        while chunk := fh.read(STREAM_CHUNK_SIZE):
+            yield chunk
+
+
+class ResponseCache:
+    """Content-addressed response cache with TTL expiry and LRU size eviction.
+
+    Safe to share between threads; several processes may also point at the
+    same directory, as every write is an atomic rename.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        *,
+        ttl: float = DEFAULT_TTL,
+        endpoint_ttls: Mapping[str, float] | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """Create a cache rooted at *directory*.
+
+        Args:
+            directory: Cache root; created on first write.
+            ttl: Default time-to-live in seconds for every endpoint.
+            endpoint_ttls: Per-endpoint TTL overrides, e.g. ``{"pdf": 3600}``.
+            max_bytes: Total size budget. The least recently used entries are
+                removed once it is exceeded.
+
+        """
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.endpoint_ttls = dict(endpoint_ttls or {})
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size_estimate: int | None = None
+
+    # ------------------------------------------------------------------
+    # Keys & paths
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def key(endpoint: str, url: str, params: Mapping[str, Any] | None = None) -> str:
+        """Return the content address for a request.
+
+        The account and base URL of :func:`client.api_scope` are part of the
+        key, so a cache directory shared between accounts, or with a mock
+        API, never answers one with the other's responses.
+
+        Returns:
+            Hex SHA-256 digest of the canonical JSON request description.
+
+        """
+        payload = json.dumps(
+            [*api_scope(), endpoint, url, params or {}],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def ttl_for(self, endpoint: str) -> float:
+        """Return the TTL in seconds that applies to *endpoint*."""
+        return self.endpoint_ttls.get(endpoint, self.ttl)
+
+    def _find(self, endpoint: str, key: str) -> Path | None:
+        base = self.directory / endpoint / key
+        for suffix in (*_SUFFIXES.values(), _JSON_SUFFIX):
+            path = base.with_suffix(suffix)
+            if path.exists():
+                return path
+        return None
+
+    # ------------------------------------------------------------------
+    # Lookup & storage
+    # ------------------------------------------------------------------
+
+    def _lookup(
+        self, endpoint: str, url: str, params: Mapping[str, Any] | None
+    ) -> Path | None:
+        """Return the path of a fresh entry for the request, if any.
+
+        Expired entries are removed; fresh ones get their access time bumped.
+
+        Returns:
+            The entry's path, or ``None`` on a miss.
+
+        """
+        path = self._find(endpoint, self.key(endpoint, url, params))
+        if path is None:
+            return None
+        try:
+            stat = path.stat()
+            now = time.time()
+            if now - stat.st_mtime > self.ttl_for(endpoint):
+                path.unlink(missing_ok=True)
+                return None
+            # Refresh the access time only: mtime keeps tracking freshness.
+            os.utime(path, (now, stat.st_mtime))
+        except FileNotFoundError:  # evicted concurrently
+            return None
+        return path
+
+    def get(
+        self, endpoint: str, url: str, params: Mapping[str, Any] | None = None
+    ) -> Any | None:
+        """Return the cached response for the request, or ``None`` on a miss.
+
+        Expired entries count as misses and are removed.
+
+        Returns:
+            The cached ``bytes``, or a :class:`RenderResult` over the stored
+            text or JSON body, or ``None``.
+
+        """
+        path = self._lookup(endpoint, url, params)
+        if path is None:
+            return None
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:  # evicted concurrently
+            return None
+
+        if path.suffix == ".bin":
+            return data
+        return RenderResult(data, TEXT if path.suffix == ".txt" else JSON)
+
+    def iter_chunks(
+        self, endpoint: str, url: str, params: Mapping[str, Any] | None = None
+    ) -> Iterator[bytes] | None:
+        """Return an iterator over a cached binary response, or ``None``.
+
+        Returns:
+            Chunks of the cached body, read lazily from disk.
+
+        """
+        path = self._lookup(endpoint, url, params)
+        if path is None or path.suffix != ".bin":
+            return None
+        try:
+            fh = path.open("rb")
+        except FileNotFoundError:  # evicted concurrently
+            return None
+        return _read_chunks(fh)
+
+    def put(
+        self,
+        endpoint: str,
+        url: str,
+        params: Mapping[str, Any] | None,
+        value: Any,
+    ) -> None:
+        """Store *value* as the response for the request.
+
+        A :class:`RenderResult` is stored as the body it holds, without being
+        decoded.
+        """
+        if isinstance(value, bytes):
+            data, suffix = value, _SUFFIXES[bytes]
+        elif isinstance(value, RenderResult):
+            data = value.data
+            suffix = _SUFFIXES[str] if value.kind == TEXT else _JSON_SUFFIX
+        elif isinstance(value, str):
+            data, suffix = value.encode(), _SUFFIXES[str]
+        else:
+            data, suffix = json.dumps(value).encode(), _JSON_SUFFIX
+
+        for _ in self._write(endpoint, url, params, suffix, [data]):
+            pass
+
+    def tee(
+        self,
+        endpoint: str,
+        url: str,
+        params: Mapping[str, Any] | None,
+        chunks: Iterable[bytes],
+    ) -> Iterator[bytes]:
+        """Pass *chunks* through while storing them as a binary response.
+
+        The entry only becomes visible once the stream has been consumed to
+        the end; an interrupted stream leaves the cache untouched.
+
+        Returns:
+            An iterator yielding the same chunks as *chunks*.
+
+        """
+        return self._write(endpoint, url, params, _SUFFIXES[bytes], chunks)
+
+    def _write(
+        self,
+        endpoint: str,
+        url: str,
+        params: Mapping[str, Any] | None,
+        suffix: str,
+        chunks: Iterable[bytes],
+    ) -> Iterator[bytes]:
+        import tempfile  # deferred: only needed once something is written
+
+        folder = self.directory / endpoint
+        folder.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+            os.replace(tmp, folder / f"{self.key(endpoint, url, params)}{suffix}")
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            if self._size_estimate is not None:
+                self._size_estimate += size
+            if self._size_estimate is None or self._size_estimate > self.max_bytes:
+                self._size_estimate = self._evict()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob("*/*"):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> int:
+        """Remove least recently used entries until within budget.
+
+        Returns:
+            The total size in bytes of the remaining entries.
+
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        return total
+
+    def size(self) -> int:
+        """Return the total size in bytes of all cached entries."""
+        return sum(size for _, size, _ in self._entries())
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            for _, _, path in self._entries():
+                path.unlink(missing_ok=True)
+            self._size_estimate = 0
+
+
+# ---------------------------------------------------------------------------
+# Process-wide cache used by the renderers
+# ---------------------------------------------------------------------------
+
+_active_cache: ResponseCache | None = None
+
+# Renders in flight, so that concurrent identical requests share one.
+_in_flight: SingleFlight[Any] = SingleFlight()
+
+
+def configure_cache(
+    directory: str | os.PathLike[str] | None, **options: Any
+) -> ResponseCache | None:
+    """Activate (or, with ``None``, deactivate) the cache used by renderers.
+
+    Args:
+        directory: Cache root, or ``None`` to disable caching.
+        **options: Keyword arguments forwarded to :class:`ResponseCache`.
+
+    Returns:
+        The active cache, or ``None`` when caching is disabled.
+
+    """
+    global _active_cache
+    _active_cache = ResponseCache(directory, **options) if directory else None
+    return _active_cache
+
+
+def get_cache() -> ResponseCache | None:
+    """Return the active cache, or ``None`` when caching is disabled."""
+    return _active_cache
+
+
+def _cached_fetch(
+    endpoint: str,
+    url: str,
+    params: Mapping[str, Any] | None,
+    fetch: Callable[[], T],
+) -> T:
+    cache = _active_cache
+    if cache is None:
+        with phase("decode"):
+            return fetch()
+    with phase("cache"):
+        hit = cache.get(endpoint, url, params)
+    if hit is not None:
+        return hit
+    with phase("decode"):
+        value = fetch()
+    with phase("cache"):
+        cache.put(endpoint, url, params, value)
+    return value
+
+
+def cached_render(
+    endpoint: str,
+    url: str,
+    params: Mapping[str, Any] | None,
+    fetch: Callable[[], T],
+) -> T:
+    """Return the cached response for the request, calling *fetch* on a miss.
+
+    Concurrent calls for the same ``(endpoint, url, params)`` are coalesced:
+    while one thread looks the request up or renders it, the others wait and
+    receive the same result (or exception). Shared results are the same
+    object in every caller and must not be mutated.
+
+    Returns:
+        The cached or freshly fetched response.
+
+    """
+    key = ResponseCache.key(endpoint, url, params)
+    value, _shared = _in_flight.do(
+        key, lambda: _cached_fetch(endpoint, url, params, fetch)
+    )
+    return value
+
+
+async def _cached_fetch_async(
+    endpoint: str,
+    url: str,
+    params: Mapping[str, Any] | None,
+    fetch: Callable[[], Awaitable[T]],
+) -> T:
+    cache = _active_cache
+    if cache is None:
+        with phase("decode"):
+            return await fetch()
+    with phase("cache"):
+        hit = cache.get(endpoint, url, params)
+    if hit is not None:
+        return hit
+    with phase("decode"):
+        value = await fetch()
+    with phase("cache"):
+        cache.put(endpoint, url, params, value)
+    return value
+
+
+async def cached_render_async(
+    endpoint: str,
+    url: str,
+    params: Mapping[str, Any] | None,
+    fetch: Callable[[], Awaitable[T]],
+) -> T:
+    """Asynchronous counterpart of :func:`cached_render`.
+
+    Concurrent calls on the same event loop are coalesced like threads are
+    in :func:`cached_render`.
+
+    Returns:
+        The cached or freshly fetched response.
+
+    """
+    key = ResponseCache.key(endpoint, url, params)
+    value, _shared = await _in_flight.do_async(
+        key, lambda: _cached_fetch_async(endpoint, url, params, fetch)
+    )
+    return value
+
+
+def cached_stream(
+    endpoint: str,
+    url: str,
+    params: Mapping[str, Any] | None,
+    open_chunks: Callable[[ExitStack], Iterable[bytes]],
+    filename: str,
+) -> Path | None:
+    """Stream a binary response to *filename*, going through the cache.
+
+    On a hit the cached file is copied chunk by chunk; on a miss the chunks
+    returned by *open_chunks* are written to *filename* and, if a cache is
+    active, to the cache at the same time. Memory use is bounded by the chunk
+    size either way.
+
+    Args:
+        endpoint: Endpoint name, part of the cache key.
+        url: Rendered URL, part of the cache key.
+        params: Extra request parameters, part of the cache key.
+        open_chunks: Opens the network stream. Resources it acquires must be
+            registered on the given :class:`~contextlib.ExitStack`.
+        filename: Destination file, or ``-`` for stdout.
+
+    Returns:
+        The Path of the written file, or ``None`` when writing to stdout.
+
+    """
+    cache = _active_cache
+    with ExitStack() as stack:
+        chunks = cache.iter_chunks(endpoint, url, params) if cache else None
+        if chunks is None:
+            chunks = open_chunks(stack)
+            if cache is not None:
+                chunks = cache.tee(endpoint, url, params, chunks)
+        return save_stream(chunks, filename)
@@ -1,25 +1,59 @@
-"""Command line interface for Cloudflare Browser Rendering API."""
+"""Command line interface for Cloudflare Browser Rendering API.
 
+Heavy dependencies (the Cloudflare SDK, Rich, Questionary, python-dotenv) are
+imported only once a command actually needs them, so ``--help`` and argument
+errors return without paying for them.
+"""
+
+import functools
+import itertools
 import json
+import os
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import ExitStack
+from pathlib import Path
+from typing import IO, Any
 
 import click
-import questionary
-from rich.console import Console
 
+from cloudflare_browser_render.batch import EXTENSIONS, iter_batch, read_urls
+from cloudflare_browser_render.bundle import (
+    BUNDLE_FORMATS,
+    DEFAULT_FORMATS,
+    iter_bundles,
+    split_snapshot,
+)
+from cloudflare_browser_render.cache import DEFAULT_TTL, configure_cache
+from cloudflare_browser_render.client import configure_client
+from cloudflare_browser_render.concurrency import configure_concurrency
+from cloudflare_browser_render.crawl import iter_crawl
+from cloudflare_browser_render.extract import configure_extraction
+from cloudflare_browser_render.journal import DONE, FAILED, UNCHANGED, Journal
+from cloudflare_browser_render.metrics import Metrics, configure_metrics
+from cloudflare_browser_render.ndjson import NDJSONWriter
+from cloudflare_browser_render.profiling import Profile, configure_profiling, phase
+from cloudflare_browser_render.ratelimit import configure_rate_limit
 from cloudflare_browser_render.renderers import (
-    render_content,
-    render_json,
-    render_links,
-    render_markdown,
-    render_pdf,
-    render_scrape,
-    render_screenshot,
-    render_snapshot,
+    ENDPOINTS,
+    STREAMING_ENDPOINTS,
+    get_renderer,
+    get_streamer,
 )
-from cloudflare_browser_render.utils import print_json, save_bytes, save_text
-
-console = Console()
-
+from cloudflare_browser_render.result import RenderResult, unwrap
+from cloudflare_browser_render.utils import (
+    configure_output,
+    get_console,
+    print_json,
+    print_text,
+    raw_output,
+    save_bytes,
+    save_text,
+    url_to_filename,
+    write_line,
+    write_stdout,
+)
+from cloudflare_browser_render.watch import ContentState
 
 # ---------------------------------------------------------------------------
 # Global debug flag
@@ -27,6 +61,15 @@ console = Console()
 
 _DEBUG: bool = False  # toggled via --debug option
 
+# Socket of the render daemon when --daemon is on; ``None`` renders in-process.
+_DAEMON: Path | None = None
+
+# Global options that only concern the invoking process, not a daemon it starts.
+_CLIENT_ONLY_OPTIONS = frozenset({
+    "debug", "raw", "daemon", "daemon_socket", "show_metrics", "metrics_file",
+    "profile_run", "profile_memory",
+})  # fmt: skip
+
 
 # ---------------------------------------------------------------------------
 # Internal helpers
@@ -37,31 +80,232 @@ def _process_result(result, output: str | None) -> None:
     """Handle the output coming back from a renderer.
 
     If *output* is provided, the result is written to that file. Otherwise it
-    will be printed to the terminal. Binary data will warn the user if no
-    filename was provided.
+    is printed: formatted by Rich on a terminal, as plain bytes when stdout is
+    piped or ``--raw`` is given. Binary data is only written to a pipe; on a
+    terminal the user is warned to provide a filename instead. The body of a
+    :class:`RenderResult` is written to files and pipes exactly as received.
     """
+    if isinstance(result, RenderResult):
+        # Copy the body as received: no decode/re-encode for files and pipes.
+        if output:
+            save_bytes(result.data, output)
+            return
+        if raw_output():
+            write_line(result.data)
+            return
+        result = result.value()
+
     if output:
         if isinstance(result, bytes):
             save_bytes(result, output)
         elif isinstance(result, str):
             save_text(result, output)
         else:  # JSON-serialisable
-            save_text(json.dumps(result, indent=2), output)
+            with phase("serialize"):
+                text = json.dumps(result, indent=2)
+            save_text(text, output)
         return
 
-    # No output path provided — print to console.
+    # No output path provided — print to stdout (raw when piped or --raw).
     if isinstance(result, bytes):
+        if raw_output():
+            write_stdout(result)
+            return
         msg = (
             f"[yellow]Binary data received ({len(result)} bytes). "
             "Use --output to save it."
         )
-        console.print(msg)
+        get_console(stderr=True).print(msg)
     elif isinstance(result, str):
-        console.print(result)
+        print_text(result)
     else:
         print_json(result)
 
 
+def _parse_endpoint_values(
+    values: tuple[str, ...], option: str
+) -> tuple[float | None, dict[str, float]]:
+    """Parse repeated ``[ENDPOINT=]NUMBER`` option values.
+
+    Returns:
+        The global value (or ``None`` if not given) and per-endpoint overrides.
+
+    Raises:
+        BadParameter: If a value is malformed or names an unknown endpoint.
+
+    """
+    default: float | None = None
+    overrides: dict[str, float] = {}
+    for value in values:
+        endpoint, sep, number = value.rpartition("=")
+        try:
+            parsed = float(number)
+        except ValueError:
+            raise click.BadParameter(
+                f"{value!r} is not a number or ENDPOINT=NUMBER pair.",
+                param_hint=option,
+            ) from None
+        if not sep:
+            default = parsed
+        elif endpoint in ENDPOINTS:
+            overrides[endpoint] = parsed
+        else:
+            raise click.BadParameter(
+                f"unknown endpoint {endpoint!r}.", param_hint=option
+            )
+    return default, overrides
+
+
+def _scrape_params(
+    selector: str | None,
+    fields: tuple[str, ...],
+    spec: str | None,
+    expression: str | None,
+) -> dict[str, Any]:
+    """Build the renderer keyword arguments for a (multi-selector) scrape.
+
+    Named fields come from repeated ``NAME=SELECTOR`` values and from a JSON
+    *spec* file mapping names to a selector or to ``{"selector": ...,
+    "expression": ...}``. Without any, the single *selector* is used.
+
+    Returns:
+        Either ``{"selector": ..., "expression": ...}`` or ``{"fields": ...}``.
+
+    Raises:
+        BadParameter: If a field or the spec file is malformed.
+        UsageError: If the selector arguments are missing or conflict.
+
+    """
+    named: dict[str, Any] = {}
+    if spec:
+        try:
+            with open(spec, encoding="utf-8") as fh:
+                loaded = json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise click.BadParameter(str(exc), param_hint="--spec") from None
+        if not isinstance(loaded, dict) or not all(
+            isinstance(v, str) or (isinstance(v, dict) and v.get("selector"))
+            for v in loaded.values()
+        ):
+            raise click.BadParameter(
+                "expected an object mapping names to a selector or to "
+                '{"selector": ..., "expression": ...}.',
+                param_hint="--spec",
+            )
+        named.update(loaded)
+    for value in fields:
+        name, sep, css = value.partition("=")
+        if not (sep and name.isidentifier() and css):
+            raise click.BadParameter(
+                f"{value!r} is not a NAME=SELECTOR pair.", param_hint="--selector"
+            )
+        named[name] = css
+
+    if not named:
+        if not selector:
+            raise click.UsageError(
+                "Give a SELECTOR, one or more --selector NAME=SELECTOR or --spec."
+            )
+        return {"selector": selector, "expression": expression}
+    if selector or expression:
+        raise click.UsageError(
+            "SELECTOR/--expression cannot be combined with named fields; "
+            'use {"selector": ..., "expression": ...} in --spec instead.'
+        )
+    return {"fields": named}
+
+
+def _daemon_args(ctx: click.Context) -> list[str]:
+    """Rebuild the global options given to this process for a daemon.
+
+    Options set through environment variables are spelled out too, and paths
+    are made absolute: the result describes the options independently of
+    this process's environment and working directory, so a running daemon
+    can be compared with it.
+
+    Returns:
+        Command line arguments reproducing the root command's options.
+
+    """
+    from click.core import ParameterSource
+
+    root = ctx.find_root()
+    args: list[str] = []
+    for param in root.command.params:
+        name = param.name
+        if (
+            not isinstance(param, click.Option)
+            or name in _CLIENT_ONLY_OPTIONS
+            or root.get_parameter_source(name)
+            not in (ParameterSource.COMMANDLINE, ParameterSource.ENVIRONMENT)
+        ):
+            continue
+        value = root.params[name]
+        if isinstance(value, Path):
+            value = os.path.abspath(value)
+        if param.is_flag:
+            if value or param.secondary_opts:
+                args.append(param.opts[0] if value else param.secondary_opts[0])
+        else:
+            args += [
+                item
+                for one in (value if param.multiple else (value,))
+                for item in (param.opts[0], str(one))
+            ]
+    return args
+
+
+def _ensure_daemon(path: Path) -> None:
+    """Start the daemon on *path* with this process's global options if needed.
+
+    Raises:
+        UsageError: If a daemon runs there with other global options.
+        ClickException: If the daemon cannot be started.
+        DaemonError: Instead, with ``--debug``.
+
+    """
+    from cloudflare_browser_render import daemon
+
+    try:
+        daemon.ensure_running(path, _daemon_args(click.get_current_context()))
+    except daemon.DaemonOptionsError as exc:
+        raise click.UsageError(str(exc)) from None
+    except daemon.DaemonError as exc:
+        if _DEBUG:
+            raise
+        raise click.ClickException(str(exc)) from None
+
+
+def _renderer(endpoint: str) -> Callable[..., Any]:
+    """Return the renderer for *endpoint*, forwarded to the daemon if enabled.
+
+    Returns:
+        A callable with the signature of ``render_<endpoint>``.
+
+    """
+    if _DAEMON is None:
+        return get_renderer(endpoint, lazy=True)
+    from cloudflare_browser_render import daemon
+
+    _ensure_daemon(_DAEMON)
+    return functools.partial(daemon.render, _DAEMON, endpoint)
+
+
+def _streamer(endpoint: str) -> Callable[[str, str], Path | None]:
+    """Return the streamer for *endpoint*, forwarded to the daemon if enabled.
+
+    Returns:
+        A callable with the signature of ``stream_<endpoint>``.
+
+    """
+    if _DAEMON is None:
+        return get_streamer(endpoint)
+    from cloudflare_browser_render import daemon
+
+    _ensure_daemon(_DAEMON)
+    return functools.partial(daemon.stream, _DAEMON, endpoint)
+
+
 # ---------------------------------------------------------------------------
 # Click CLI definition
 # ---------------------------------------------------------------------------
@@ -73,20 +317,281 @@ def _process_result(result, output: str | None) -> None:
     is_flag=True,
     help="Show full Python tracebacks instead of concise error messages.",
 )
+@click.option(
+    "--raw",
+    is_flag=True,
+    envvar="CBR_RAW",
+    help="Write results to stdout as plain bytes, without Rich formatting, even "
+    "on a terminal (the default whenever stdout is piped).",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, writable=True, path_type=Path),
+    envvar="CBR_CACHE_DIR",
+    help="Cache responses on disk under DIR and reuse them on later runs.",
+)
+@click.option(
+    "--cache-ttl",
+    "cache_ttls",
+    multiple=True,
+    metavar="[ENDPOINT=]SECONDS",
+    help=(
+        f"How long cached responses stay fresh (default {DEFAULT_TTL}s). "
+        "Repeat with ENDPOINT=SECONDS to override single endpoints."
+    ),
+)
+@click.option(
+    "--cache-max-size",
+    type=click.IntRange(min=1),
+    default=1024,
+    show_default=True,
+    metavar="MB",
+    help="Size budget of the cache; least recently used entries are evicted.",
+)
+@click.option(
+    "--rate-limit",
+    "rate_limits",
+    multiple=True,
+    envvar="CBR_RATE_LIMIT",
+    metavar="[ENDPOINT=]PER_MINUTE",
+    help=(
+        "Pace requests to stay within PER_MINUTE for the account. Repeat with "
+        "ENDPOINT=PER_MINUTE to add per-endpoint limits."
+    ),
+)
+@click.option(
+    "--rate-burst",
+    type=click.FloatRange(min=1),
+    default=1,
+    show_default=True,
+    help="Requests that may be sent back-to-back after an idle period.",
+)
+@click.option(
+    "--rate-limit-state",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    envvar="CBR_RATE_LIMIT_STATE",
+    help=(
+        "SQLite file holding the rate-limit state, so that several cbr "
+        "processes on this host share one budget."
+    ),
+)
+@click.option(
+    "--local-extract",
+    is_flag=True,
+    envvar="CBR_LOCAL_EXTRACT",
+    help=(
+        "Derive links, Markdown and expression-free scrapes from one fetch of "
+        "the page's HTML (content endpoint) instead of a render per endpoint."
+    ),
+)
+@click.option(
+    "--base-url",
+    envvar="CLOUDFLARE_BASE_URL",
+    help="Send API requests to this base URL instead of Cloudflare's, e.g. "
+    "http://127.0.0.1:8787/client/v4 for `cbr mock-server`.",
+)
+@click.option(
+    "--http-max-connections",
+    type=click.IntRange(min=1),
+    help="Connection pool size (env CBR_HTTP_MAX_CONNECTIONS; default 100). "
+    "Multi-URL commands raise it, and the keep-alive pool, to --jobs.",
+)
+@click.option(
+    "--http-keepalive-expiry",
+    type=click.FloatRange(min=0),
+    help="Seconds an idle connection is kept open for reuse "
+    "(env CBR_HTTP_KEEPALIVE_EXPIRY; default 5).",
+)
+@click.option(
+    "--http2/--no-http2",
+    default=None,
+    help="Multiplex requests over HTTP/2 (env CBR_HTTP_HTTP2; needs the "
+    "'http2' extra).",
+)
+@click.option(
+    "--connect-timeout",
+    type=click.FloatRange(min=0),
+    help="Seconds to wait for a connection (env CBR_HTTP_CONNECT_TIMEOUT; default 5).",
+)
+@click.option(
+    "--read-timeout",
+    type=click.FloatRange(min=0),
+    help="Seconds to wait for response data (env CBR_HTTP_READ_TIMEOUT; default 60).",
+)
+@click.option(
+    "--metrics",
+    "show_metrics",
+    is_flag=True,
+    help="Print per-endpoint request metrics (latency p50/p95/p99, retries, "
+    "rate limits, bytes, errors) when the command finishes.",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="CBR_METRICS_FILE",
+    help="Also export the metrics to FILE when the command finishes: JSON for "
+    "a .json suffix, Prometheus text format otherwise.",
+)
+@click.option(
+    "--profile",
+    "profile_run",
+    is_flag=True,
+    help="Report the time spent per phase (imports, client set-up, network, "
+    "decoding, cache, serialisation, console output, file writes) on exit.",
+)
+@click.option(
+    "--profile-memory",
+    is_flag=True,
+    help="Like --profile, and also trace allocations to report peak memory "
+    "and the top allocation sites (slows the run down).",
+)
+@click.option(
+    "--daemon/--no-daemon",
+    default=False,
+    envvar="CBR_DAEMON",
+    help="Forward single-URL commands to a background render daemon, starting "
+    "it if needed, to skip start-up costs on every invocation.",
+)
+@click.option(
+    "--daemon-socket",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="CBR_DAEMON_SOCKET",
+    help="Unix socket of the render daemon (default $XDG_RUNTIME_DIR/cbr-daemon.sock).",
+)
 @click.pass_context
-def cli(ctx: click.Context, debug: bool) -> None:
+def cli(
+    ctx: click.Context,
+    debug: bool,
+    raw: bool,
+    cache_dir: Path | None,
+    cache_ttls: tuple[str, ...],
+    cache_max_size: int,
+    rate_limits: tuple[str, ...],
+    rate_burst: float,
+    rate_limit_state: Path | None,
+    local_extract: bool,
+    base_url: str | None,
+    http_max_connections: int | None,
+    http_keepalive_expiry: float | None,
+    http2: bool | None,
+    connect_timeout: float | None,
+    read_timeout: float | None,
+    show_metrics: bool,
+    metrics_file: Path | None,
+    profile_run: bool,
+    profile_memory: bool,
+    daemon: bool,
+    daemon_socket: Path | None,
+) -> None:
     """Cloudflare Browser Rendering CLI.
 
     Run with **--help** to see all available subcommands. If no subcommand is
     supplied, an interactive menu will be presented.
     """
-    global _DEBUG
+    global _DEBUG, _DAEMON
     _DEBUG = debug
+    configure_output(raw)
+    _DAEMON = None
+    if daemon:
+        from cloudflare_browser_render.daemon import default_socket_path
+
+        _DAEMON = daemon_socket or default_socket_path()
+
+    ttl, endpoint_ttls = _parse_endpoint_values(cache_ttls, "--cache-ttl")
+    configure_cache(
+        cache_dir,
+        ttl=DEFAULT_TTL if ttl is None else ttl,
+        endpoint_ttls=endpoint_ttls,
+        max_bytes=cache_max_size * 1024 * 1024,
+    )
+    per_minute, endpoint_limits = _parse_endpoint_values(rate_limits, "--rate-limit")
+    configure_rate_limit(
+        per_minute,
+        endpoint_limits=endpoint_limits,
+        burst=rate_burst,
+        state_path=rate_limit_state,
+    )
+    configure_extraction(local_extract)
+    http = {
+        name: value
+        for name, value in (
+            ("max_connections", http_max_connections),
+            ("keepalive_expiry", http_keepalive_expiry),
+            ("http2", http2),
+            ("connect_timeout", connect_timeout),
+            ("read_timeout", read_timeout),
+        )
+        if value is not None
+    }
+    if base_url or http:
+        configure_client(base_url=base_url, http=http)
+    metrics = configure_metrics(show_metrics or metrics_file is not None)
+    if metrics is not None:
+        ctx.call_on_close(lambda: _report_metrics(metrics, metrics_file))
+
+    profile = configure_profiling(profile_run or profile_memory, memory=profile_memory)
+    if profile is not None:
+        ctx.call_on_close(lambda: _report_profile(profile))
 
     if ctx.invoked_subcommand is None:
         _interactive_flow()
 
 
+def _report_metrics(metrics: Metrics, metrics_file: Path | None) -> None:
+    """Print the end-of-run metrics summary and export it to *metrics_file*."""
+    if metrics_file is not None:
+        metrics.write(metrics_file)
+    rows = metrics.summary_rows()
+    if not rows:
+        return
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title="Request metrics")
+    for column in ("endpoint", "requests", "p50 ms", "p95 ms", "p99 ms",
+                   "retries", "429s", "bytes", "errors"):  # fmt: skip
+        table.add_column(column, justify="left" if column == "endpoint" else "right")
+    for row in rows:
+        table.add_row(*row)
+    # stderr, so the summary never mixes with results streamed to stdout.
+    Console(stderr=True).print(table)
+
+
+def _report_profile(profile: Profile) -> None:
+    """Print the per-phase timings (and memory profile) to stderr."""
+    elapsed = profile.elapsed()
+    memory = profile.memory_report()
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title=f"Profile ({elapsed:.3f}s wall clock)")
+    for column in ("phase", "calls", "seconds", "% of wall"):
+        table.add_column(column, justify="left" if column == "phase" else "right")
+    accounted = 0.0
+    for stat in profile.phases():
+        accounted += stat.seconds
+        share = stat.seconds / elapsed * 100 if elapsed else 0.0
+        table.add_row(stat.name, str(stat.calls), f"{stat.seconds:.3f}", f"{share:.1f}")
+    other = max(elapsed - accounted, 0.0)
+    share = other / elapsed * 100 if elapsed else 0.0
+    table.add_row("(other)", "", f"{other:.3f}", f"{share:.1f}")
+    console = Console(stderr=True)
+    console.print(table)
+    if memory is not None:
+        peak, sites = memory
+        console.print(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB")
+        sites_table = Table(title="Top allocation sites")
+        for column in ("location", "KiB", "blocks"):
+            sites_table.add_column(
+                column, justify="left" if column == "location" else "right"
+            )
+        for site in sites:
+            sites_table.add_row(
+                site.location, f"{site.size / 1024:.1f}", str(site.count)
+            )
+        console.print(sites_table)
+
+
 # ---------------------------------------------------------------------------
 # Subcommands (one per API endpoint)
 # ---------------------------------------------------------------------------
@@ -107,8 +612,9 @@ def content(url: str, output: str | None) -> None:  # noqa: D401
         ClickException: If rendering fails.
 
     """
+    render = _renderer("content")
     try:
-        result = render_content(url)
+        result = render(url)
     except Exception as exc:
         if _DEBUG:
             raise
@@ -121,8 +627,8 @@ def content(url: str, output: str | None) -> None:  # noqa: D401
 @click.option(
     "-o",
     "--output",
-    type=click.Path(dir_okay=False, writable=True),
-    help="Save PNG to FILE.",
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    help="Save PNG to FILE (default screenshot.png, - for stdout).",
 )
 def screenshot(url: str, output: str | None) -> None:
     """Capture a PNG screenshot of *url*.
@@ -131,13 +637,13 @@ def screenshot(url: str, output: str | None) -> None:
         ClickException: If screenshot capture fails.
 
     """
+    stream = _streamer("screenshot")
     try:
-        result = render_screenshot(url)
+        stream(url, output or "screenshot.png")
     except Exception as exc:
         if _DEBUG:
             raise
         raise click.ClickException(str(exc)) from None
-    _process_result(result, output or "screenshot.png")
 
 
 @cli.command(help="Generate a PDF of the page.")
@@ -145,8 +651,8 @@ def screenshot(url: str, output: str | None) -> None:
 @click.option(
     "-o",
     "--output",
-    type=click.Path(dir_okay=False, writable=True),
-    help="Save PDF to FILE.",
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    help="Save PDF to FILE (default output.pdf, - for stdout).",
 )
 def pdf(url: str, output: str | None) -> None:
     """Generate a PDF from *url*.
@@ -155,27 +661,41 @@ def pdf(url: str, output: str | None) -> None:
         ClickException: If PDF generation fails.
 
     """
+    stream = _streamer("pdf")
     try:
-        result = render_pdf(url)
+        stream(url, output or "output.pdf")
     except Exception as exc:
         if _DEBUG:
             raise
         raise click.ClickException(str(exc)) from None
-    _process_result(result, output or "output.pdf")
 
 
 @cli.command(help="Create a durable snapshot of the page and return metadata.")
 @click.argument("url")
 @click.option("-o", "--output", type=click.Path(dir_okay=False, writable=True))
-def snapshot(url: str, output: str | None) -> None:
+@click.option(
+    "-d",
+    "--output-dir",
+    type=click.Path(file_okay=False, writable=True, path_type=Path),
+    help="Split the snapshot into content.html, screenshot.png and a small "
+    "snapshot.json with the remaining metadata in DIR.",
+)
+def snapshot(url: str, output: str | None, output_dir: Path | None) -> None:
     """Create a durable snapshot of *url* and return its metadata.
 
     Raises:
+        UsageError: If both --output and --output-dir are given.
         ClickException: If snapshot creation fails.
 
     """
+    if output and output_dir:
+        raise click.UsageError("--output and --output-dir are mutually exclusive.")
+    render = _renderer("snapshot")
     try:
-        result = render_snapshot(url)
+        result = render(url)
+        if output_dir is not None:
+            split_snapshot(result, output_dir)
+            return
     except Exception as exc:
         if _DEBUG:
             raise
@@ -183,9 +703,16 @@ def snapshot(url: str, output: str | None) -> None:
     _process_result(result, output)
 
 
-@cli.command(help="Scrape page data with a CSS selector and return structured JSON.")
+@cli.command(
+    help=(
+        "Scrape page data with a CSS selector and return structured JSON. "
+        "Several named selectors (-s NAME=SELECTOR, repeatable, or --spec) are "
+        "scraped in a single render and returned keyed by name."
+    ),
+    short_help="Scrape page data with CSS selectors.",
+)
 @click.argument("url")
-@click.argument("selector")
+@click.argument("selector", required=False)
 @click.option("-o", "--output", type=click.Path(dir_okay=False, writable=True))
 @click.option(
     "-e",
@@ -193,15 +720,37 @@ def snapshot(url: str, output: str | None) -> None:
     type=str,
     help="Run a Javascript expression on the matched element(s).",
 )
-def scrape(url: str, selector: str, output: str | None, expression: str | None) -> None:
-    """Scrape *selector* from *url* and return structured JSON.
+@click.option(
+    "-s",
+    "--selector",
+    "fields",
+    multiple=True,
+    metavar="NAME=SELECTOR",
+    help="Scrape SELECTOR into field NAME (repeatable).",
+)
+@click.option(
+    "--spec",
+    type=click.Path(exists=True, dir_okay=False),
+    help='JSON file mapping field names to selectors or {"selector", "expression"}.',
+)
+def scrape(
+    url: str,
+    selector: str | None,
+    output: str | None,
+    expression: str | None,
+    fields: tuple[str, ...],
+    spec: str | None,
+) -> None:
+    """Scrape *selector* (or named fields) from *url* and return JSON.
 
     Raises:
         ClickException: If scraping fails.
 
     """
+    params = _scrape_params(selector, fields, spec, expression)
+    render = _renderer("scrape")
     try:
-        result = render_scrape(url, selector, expression)
+        result = render(url, **params)
     except Exception as exc:
         if _DEBUG:
             raise
@@ -219,8 +768,9 @@ def json_(url: str, output: str | None) -> None:  # name json_ to avoid keyword
         ClickException: If JSON rendering fails.
 
     """
+    render = _renderer("json")
     try:
-        result = render_json(url)
+        result = render(url)
     except Exception as exc:
         if _DEBUG:
             raise
@@ -238,8 +788,9 @@ def links(url: str, output: str | None) -> None:
         ClickException: If link extraction fails.
 
     """
+    render = _renderer("links")
     try:
-        result = render_links(url)
+        result = render(url)
     except Exception as exc:
         if _DEBUG:
             raise
@@ -257,8 +808,9 @@ def markdown(url: str, output: str | None) -> None:  # noqa: D401
         ClickException: If Markdown conversion fails.
 
     """
+    render = _renderer("markdown")
     try:
-        result = render_markdown(url)
+        result = render(url)
     except Exception as exc:
         if _DEBUG:
             raise
@@ -266,6 +818,1140 @@ def markdown(url: str, output: str | None) -> None:  # noqa: D401
     _process_result(result, output)
 
 
+# ---------------------------------------------------------------------------
+# Multi-URL rendering
+# ---------------------------------------------------------------------------
+
+
+def _record_failure(
+    endpoint: str,
+    url: str,
+    error: Exception,
+    journal: Journal | None,
+    dead_letter: IO[str] | None,
+) -> str:
+    """Record a failed render in the journal and the dead-letter file.
+
+    In debug mode *error* is re-raised instead.
+
+    Returns:
+        The error as ``"<ExceptionType>: <message>"``.
+
+    """
+    message = f"{type(error).__name__}: {error}"
+    if journal is not None:
+        journal.record(endpoint, url, FAILED, error=message)
+    if dead_letter is not None:
+        # One comment line, so the file stays a valid URLs file to retry with.
+        dead_letter.write(f"# {' '.join(message.split())}\n{url}\n")
+        dead_letter.flush()
+    if _DEBUG:
+        raise error
+    return message
+
+
+def _render_to_dir(
+    endpoint: str,
+    urls: Iterable[str],
+    output_dir: Path,
+    *,
+    jobs: int,
+    journal: Journal | None = None,
+    dead_letter: IO[str] | None = None,
+    state: ContentState | None = None,
+    events: IO[str] | None = None,
+    **params: Any,
+) -> tuple[int, int]:
+    """Render *urls* concurrently, writing one file per URL into *output_dir*.
+
+    Failures are reported on stderr as they happen (or raised in debug
+    mode). With a *journal*, URLs already done in an earlier run are skipped
+    and every outcome is recorded; failed URLs are also appended to
+    *dead_letter*, preceded by a ``#`` comment holding the error. With a
+    content *state*, only results that changed since the previous run are
+    written, and each change is reported to *events* as a JSON line; the
+    journal records the others as ``unchanged`` rather than ``done``.
+
+    Returns:
+        The number of URLs processed and the number that failed.
+
+    """
+
+    def _target(url: str) -> Path:
+        return output_dir / url_to_filename(url, EXTENSIONS[endpoint])
+
+    # Bodies are written as received, without decoding them first.
+    render = get_renderer(endpoint, lazy=True)
+    # Incremental runs must see the body to hash it, so they do not stream.
+    streaming = endpoint in STREAMING_ENDPOINTS and state is None
+    if streaming:
+        # Binary bodies go straight from the network to their file.
+        streamer = get_streamer(endpoint)
+
+        def render(url: str) -> Path | None:
+            return streamer(url, str(_target(url)))
+
+    if journal is not None:
+        urls = journal.track(endpoint, urls)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    total = failed = 0
+    for item in iter_batch(endpoint, urls, jobs=jobs, render=render, **params):
+        total += 1
+        if not item.ok:
+            failed += 1
+            _record_failure(endpoint, item.url, item.error, journal, dead_letter)
+            get_console(stderr=True).print(
+                f"[red]Failed {item.url}: {item.error}[/red]"
+            )
+            continue
+        target = _target(item.url)
+        if state is not None:
+            event = state.check(endpoint, item.url, item.result, str(target))
+            if event is None:
+                # Nothing was written, so --resume must not treat it as done.
+                if journal is not None:
+                    journal.record(endpoint, item.url, UNCHANGED)
+                continue
+            _process_result(item.result, str(target))
+            if events is not None:
+                events.write(event.to_json() + "\n")
+                events.flush()
+        elif not streaming:
+            _process_result(item.result, str(target))
+        if journal is not None:
+            journal.record(endpoint, item.url, DONE, output=str(target))
+    return total, failed
+
+
+def _render_to_ndjson(
+    endpoint: str,
+    urls: Iterable[str],
+    writer: NDJSONWriter,
+    *,
+    jobs: int,
+    journal: Journal | None = None,
+    dead_letter: IO[str] | None = None,
+    **params: Any,
+) -> tuple[int, int]:
+    """Render *urls* concurrently, writing one JSON line per URL to *writer*.
+
+    Every line holds ``url``, ``endpoint`` and either ``result`` or
+    ``error``, and is flushed as soon as the render completes; nothing is
+    kept in memory. Failures are also reported on stderr, so that stdout
+    carries nothing but JSON lines.
+
+    Returns:
+        The number of URLs processed and the number that failed.
+
+    """
+    if journal is not None:
+        urls = journal.track(endpoint, urls)
+    target = getattr(writer.stream, "name", "-")
+    total = failed = 0
+    for item in iter_batch(endpoint, urls, jobs=jobs, **params):
+        total += 1
+        if item.ok:
+            writer.write({
+                "url": item.url,
+                "endpoint": endpoint,
+                "result": unwrap(item.result),
+            })
+            if journal is not None:
+                journal.record(endpoint, item.url, DONE, output=str(target))
+            continue
+        failed += 1
+        error = _record_failure(endpoint, item.url, item.error, journal, dead_letter)
+        writer.write({"url": item.url, "endpoint": endpoint, "error": error})
+        click.echo(f"Failed {item.url}: {item.error}", err=True)
+    return total, failed
+
+
+def _open_ndjson(stack: ExitStack, output: str | None) -> NDJSONWriter:
+    """Open *output* (stdout for ``None`` or ``-``) for JSON Lines.
+
+    The file is closed when *stack* unwinds; stdout stays open.
+
+    Returns:
+        A writer appending to the opened stream.
+
+    """
+    return NDJSONWriter(stack.enter_context(click.open_file(output or "-", "wb")))
+
+
+def _check_ndjson_endpoint(endpoint: str) -> None:
+    """Reject binary endpoints, which have no JSON representation.
+
+    Raises:
+        UsageError: If *endpoint* returns a binary body.
+
+    """
+    if endpoint in STREAMING_ENDPOINTS:
+        raise click.UsageError(
+            f"--format ndjson needs a text or JSON endpoint; {endpoint} results "
+            "are binary files."
+        )
+
+
+def _journal_options(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Add the ``--journal``/``--resume``/``--dead-letter`` options to *func*.
+
+    Returns:
+        The decorated command callback.
+
+    """
+    func = click.option(
+        "--dead-letter",
+        type=click.Path(dir_okay=False, writable=True),
+        help="Write failed URLs (with their errors as # comments) to FILE.",
+    )(func)
+    func = click.option(
+        "--resume",
+        is_flag=True,
+        help="Skip URLs the journal already records as done.",
+    )(func)
+    return click.option(
+        "--journal",
+        type=click.Path(dir_okay=False, writable=True),
+        help="Record the state of every URL in FILE (JSON lines).",
+    )(func)
+
+
+def _open_journal(
+    stack: ExitStack, journal: str | None, resume: bool, dead_letter: str | None
+) -> tuple[Journal | None, IO[str] | None]:
+    """Open the journal and dead-letter files requested on the command line.
+
+    Both are closed when *stack* unwinds.
+
+    Returns:
+        The journal and the dead-letter file, each ``None`` if not requested.
+
+    Raises:
+        UsageError: If ``--resume`` is given without ``--journal``.
+
+    """
+    if resume and not journal:
+        raise click.UsageError("--resume requires --journal.")
+    run_journal = None
+    if journal:
+        run_journal = stack.enter_context(Journal(journal, resume=resume))
+    dead_fh = None
+    if dead_letter:
+        dead_fh = stack.enter_context(open(dead_letter, "w", encoding="utf-8"))
+    return run_journal, dead_fh
+
+
+def _batch_params(
+    endpoint: str, selector: tuple[str, ...], expression: str | None, spec: str | None
+) -> dict[str, Any]:
+    """Return the renderer keyword arguments for a multi-URL command.
+
+    Returns:
+        The scrape parameters for ``scrape``, otherwise an empty dict.
+
+    Raises:
+        UsageError: If ``scrape`` is requested without a selector.
+
+    """
+    if endpoint != "scrape":
+        return {}
+    if not (selector or spec):
+        raise click.UsageError("--selector is required for the scrape endpoint.")
+    # A lone value without a NAME= prefix keeps the plain-selector output.
+    name, sep, _ = selector[0].partition("=") if selector else ("", "", "")
+    if len(selector) == 1 and not (sep and name.isidentifier()):
+        return _scrape_params(selector[0], (), spec, expression)
+    return _scrape_params(None, selector, spec, expression)
+
+
+def _open_state(
+    stack: ExitStack, state_path: str | None, events: str | None
+) -> tuple[ContentState | None, IO[str] | None]:
+    """Load the incremental state and open the change-event stream.
+
+    The state is saved, and the event stream closed, when *stack* unwinds -
+    including on Ctrl-C - so completed work is never forgotten.
+
+    Returns:
+        The state and the event stream, each ``None`` if not requested.
+
+    Raises:
+        BadParameter: If the state file cannot be read.
+        UsageError: If events are requested without a state file.
+
+    """
+    if events and not state_path:
+        raise click.UsageError("--events requires a state file.")
+    if not state_path:
+        return None, None
+    try:
+        state = ContentState(state_path)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from None
+    stack.callback(state.save)
+    events_fh = stack.enter_context(click.open_file(events, "a")) if events else None
+    return state, events_fh
+
+
+@cli.command(
+    help=(
+        "Render many URLs concurrently with ENDPOINT. URLs are read one per line "
+        "from URLS_FILE (default: stdin) and each result is written to its own "
+        "file in the output directory."
+    ),
+    short_help="Render many URLs concurrently.",
+)
+@click.argument("endpoint", type=click.Choice(ENDPOINTS))
+@click.argument("urls_file", type=click.File("r"), default="-")
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Maximum number of renders in flight at once.",
+)
+@click.option(
+    "--adaptive",
+    is_flag=True,
+    help=(
+        "Tune the number of renders in flight automatically: grow while "
+        "responses are fast, back off on rate limits or rising latency. "
+        "--jobs becomes the upper bound."
+    ),
+)
+@click.option(
+    "-d",
+    "--output-dir",
+    type=click.Path(file_okay=False, writable=True, path_type=Path),
+    default=Path("output"),
+    show_default=True,
+    help="Directory that receives one output file per URL.",
+)
+@click.option(
+    "-s",
+    "--selector",
+    multiple=True,
+    metavar="[NAME=]SELECTOR",
+    help=(
+        "CSS selector (scrape only). Repeat as NAME=SELECTOR to scrape several "
+        "named fields in one render."
+    ),
+)
+@click.option(
+    "-e",
+    "--expression",
+    help="Javascript expression to run on matched element(s) (scrape only).",
+)
+@click.option(
+    "--spec",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON field spec for scrape (see `cbr scrape --help`).",
+)
+@_journal_options
+@click.option(
+    "--incremental",
+    type=click.Path(dir_okay=False, writable=True),
+    metavar="STATE_FILE",
+    help=(
+        "Keep content hashes in STATE_FILE and only write results that "
+        "changed since the previous run."
+    ),
+)
+@click.option(
+    "--events",
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    help="Append a JSON line per new or changed page to FILE (- for stdout).",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["files", "ndjson"]),
+    default="files",
+    show_default=True,
+    help="Write one file per URL into --output-dir, or stream one JSON line per "
+    "URL (url, endpoint, result or error) to --output as it completes.",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    help="Destination of --format ndjson (default stdout).",
+)
+def batch(
+    endpoint: str,
+    urls_file,
+    jobs: int,
+    adaptive: bool,
+    output_dir: Path,
+    selector: tuple[str, ...],
+    expression: str | None,
+    spec: str | None,
+    journal: str | None,
+    resume: bool,
+    dead_letter: str | None,
+    incremental: str | None,
+    events: str | None,
+    output_format: str,
+    output: str | None,
+) -> None:
+    """Render every URL in *urls_file* with *endpoint* over *jobs* workers.
+
+    Raises:
+        UsageError: If the output options do not fit the output format.
+        ClickException: If one or more URLs failed to render.
+
+    """
+    params = _batch_params(endpoint, selector, expression, spec)
+    ndjson = output_format == "ndjson"
+    if ndjson:
+        _check_ndjson_endpoint(endpoint)
+        if incremental or events:
+            raise click.UsageError(
+                "--incremental and --events cannot be combined with --format ndjson."
+            )
+    elif output:
+        raise click.UsageError("--output requires --format ndjson.")
+    # Progress messages go to stderr, keeping stdout for JSON lines.
+    report = get_console(stderr=True).print
+    with ExitStack() as stack:
+        run_journal, dead_fh = _open_journal(stack, journal, resume, dead_letter)
+        state, events_fh = _open_state(stack, incremental, events)
+        controller = None
+        if adaptive:
+            controller = configure_concurrency(min(4, jobs), maximum=jobs)
+            stack.callback(configure_concurrency, None)
+
+        if ndjson:
+            total, failed = _render_to_ndjson(
+                endpoint,
+                read_urls(urls_file),
+                _open_ndjson(stack, output),
+                jobs=jobs,
+                journal=run_journal,
+                dead_letter=dead_fh,
+                **params,
+            )
+        else:
+            total, failed = _render_to_dir(
+                endpoint,
+                read_urls(urls_file),
+                output_dir,
+                jobs=jobs,
+                journal=run_journal,
+                dead_letter=dead_fh,
+                state=state,
+                events=events_fh,
+                **params,
+            )
+
+    target = "as JSON lines" if ndjson else f"into {output_dir}"
+    report(f"Rendered {total - failed}/{total} URLs {target}")
+    if state is not None:
+        report(f"{len(state.changes)} of them new or changed")
+    if run_journal is not None and run_journal.skipped:
+        report(f"Skipped {run_journal.skipped} URLs already done in {journal}")
+    if controller is not None:
+        report(f"Concurrency window settled at {controller.limit}")
+    if failed:
+        raise click.ClickException(f"{failed} of {total} URLs failed to render.")
+
+
+@cli.command(
+    help=(
+        "Re-render the URLs in URLS_FILE every --interval seconds and only "
+        "write pages whose normalised content changed since the last pass. "
+        "Content hashes persist in --state, so later invocations pick up where "
+        "earlier ones stopped. URLS_FILE is re-read on every pass."
+    ),
+    short_help="Monitor pages and re-emit only changed ones.",
+)
+@click.argument("endpoint", type=click.Choice(ENDPOINTS))
+@click.argument("urls_file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--state",
+    "state_path",
+    type=click.Path(dir_okay=False, writable=True),
+    default="cbr-state.json",
+    show_default=True,
+    help="File holding the content hash of every (URL, endpoint).",
+)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0),
+    default=0,
+    show_default=True,
+    metavar="SECONDS",
+    help="Seconds between passes; 0 runs a single pass.",
+)
+@click.option(
+    "--events",
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    help="Append a JSON line per new or changed page to FILE (- for stdout).",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Maximum number of renders in flight at once.",
+)
+@click.option(
+    "-d",
+    "--output-dir",
+    type=click.Path(file_okay=False, writable=True, path_type=Path),
+    default=Path("output"),
+    show_default=True,
+    help="Directory that receives the changed pages.",
+)
+@click.option(
+    "-s",
+    "--selector",
+    multiple=True,
+    metavar="[NAME=]SELECTOR",
+    help="CSS selector(s) for scrape, as for `cbr batch`.",
+)
+@click.option(
+    "-e",
+    "--expression",
+    help="Javascript expression to run on matched element(s) (scrape only).",
+)
+@click.option(
+    "--spec",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON field spec for scrape (see `cbr scrape --help`).",
+)
+def watch(
+    endpoint: str,
+    urls_file: str,
+    state_path: str,
+    interval: float,
+    events: str | None,
+    jobs: int,
+    output_dir: Path,
+    selector: tuple[str, ...],
+    expression: str | None,
+    spec: str | None,
+) -> None:
+    """Render *urls_file* repeatedly, writing only changed results.
+
+    Raises:
+        ClickException: If URLs failed to render in a single-pass run.
+
+    """
+    params = _batch_params(endpoint, selector, expression, spec)
+    with ExitStack() as stack:
+        state, events_fh = _open_state(stack, state_path, events)
+        passes = 0
+        while True:
+            passes += 1
+            state.changes.clear()
+            with open(urls_file, encoding="utf-8") as fh:
+                total, failed = _render_to_dir(
+                    endpoint,
+                    read_urls(fh),
+                    output_dir,
+                    jobs=jobs,
+                    state=state,
+                    events=events_fh,
+                    **params,
+                )
+            state.save()
+            get_console(stderr=True).print(
+                f"Pass {passes}: {len(state.changes)} of {total} pages new or "
+                f"changed, {failed} failed"
+            )
+            if not interval:
+                break
+            time.sleep(interval)
+
+    if failed:
+        raise click.ClickException(f"{failed} of {total} URLs failed to render.")
+
+
+@cli.command(
+    help=(
+        "Crawl breadth-first from SEEDS by following links, up to --max-depth "
+        "hops. Crawled URLs are printed one per line (or written to --output); "
+        "with --then, every crawled page is also rendered with that endpoint."
+    ),
+    short_help="Crawl a site by following links.",
+)
+@click.argument("seeds", nargs=-1, required=True)
+@click.option(
+    "--max-depth",
+    type=click.IntRange(min=0),
+    default=2,
+    show_default=True,
+    help="Number of link hops to follow from the seeds.",
+)
+@click.option(
+    "--max-pages",
+    type=click.IntRange(min=1),
+    help="Stop after this many pages.",
+)
+@click.option(
+    "--include",
+    multiple=True,
+    metavar="REGEX",
+    help="Only follow URLs matching REGEX (repeatable).",
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    metavar="REGEX",
+    help="Never follow URLs matching REGEX (repeatable).",
+)
+@click.option(
+    "--same-host/--any-host",
+    default=True,
+    show_default=True,
+    help="Restrict the crawl to the seeds' hosts.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Maximum number of requests in flight at once (per stage).",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the crawled URLs (or JSON lines) to FILE instead of stdout.",
+)
+@click.option(
+    "--then",
+    "then",
+    type=click.Choice([e for e in ENDPOINTS if e != "scrape"]),
+    help="Also render every crawled page with this endpoint.",
+)
+@click.option(
+    "-d",
+    "--output-dir",
+    type=click.Path(file_okay=False, writable=True, path_type=Path),
+    default=Path("output"),
+    show_default=True,
+    help="Directory that receives the --then output files.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "ndjson"]),
+    default="text",
+    show_default=True,
+    help="Print crawled URLs one per line, or write one JSON line per page as "
+    "it is crawled (url and depth) or, with --then, rendered (url, endpoint, "
+    "result). JSON lines go to --output, or stdout.",
+)
+@_journal_options
+def crawl(
+    seeds: tuple[str, ...],
+    max_depth: int,
+    max_pages: int | None,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    same_host: bool,
+    jobs: int,
+    output: str | None,
+    then: str | None,
+    output_dir: Path,
+    output_format: str,
+    journal: str | None,
+    resume: bool,
+    dead_letter: str | None,
+) -> None:
+    """Crawl from *seeds* and optionally render each page with *then*.
+
+    The journal options apply to the ``--then`` stage: on ``--resume`` the
+    site is crawled again (cheaply, with ``--cache-dir``), but pages already
+    rendered are skipped.
+
+    Raises:
+        UsageError: If journal options are given without ``--then``.
+        ClickException: If pages failed to crawl or render.
+
+    """
+    if then is None and (journal or resume or dead_letter):
+        raise click.UsageError("--journal, --resume and --dead-letter require --then.")
+    ndjson = output_format == "ndjson"
+    if ndjson and then is not None:
+        _check_ndjson_endpoint(then)
+    pages = iter_crawl(
+        seeds,
+        max_depth=max_depth,
+        max_pages=max_pages,
+        include=include,
+        exclude=exclude,
+        same_host=same_host,
+        jobs=jobs,
+    )
+    crawled: list[str] = []
+    crawl_count = crawl_failed = 0
+    writer: NDJSONWriter | None = None
+
+    def _crawled_urls() -> Iterator[str]:
+        nonlocal crawl_count, crawl_failed
+        for page in pages:
+            if not page.ok:
+                crawl_failed += 1
+                if _DEBUG:
+                    raise page.error
+                click.echo(f"Failed {page.url}: {page.error}", err=True)
+                if writer is not None and then is None:
+                    error = f"{type(page.error).__name__}: {page.error}"
+                    writer.write({"url": page.url, "depth": page.depth, "error": error})
+                continue
+            crawl_count += 1
+            if writer is not None:
+                if then is None:
+                    writer.write({"url": page.url, "depth": page.depth})
+            elif output is None:
+                click.echo(page.url)
+            else:
+                crawled.append(page.url)
+            yield page.url
+
+    rendered = render_failed = 0
+    with ExitStack() as stack:
+        if ndjson:
+            writer = _open_ndjson(stack, output)
+        if then is None:
+            for _ in _crawled_urls():
+                pass
+        else:
+            run_journal, dead_fh = _open_journal(stack, journal, resume, dead_letter)
+            # Pages are rendered while the crawl is still discovering more.
+            if writer is not None:
+                rendered, render_failed = _render_to_ndjson(
+                    then,
+                    _crawled_urls(),
+                    writer,
+                    jobs=jobs,
+                    journal=run_journal,
+                    dead_letter=dead_fh,
+                )
+            else:
+                rendered, render_failed = _render_to_dir(
+                    then,
+                    _crawled_urls(),
+                    output_dir,
+                    jobs=jobs,
+                    journal=run_journal,
+                    dead_letter=dead_fh,
+                )
+
+    if output is not None and writer is None:
+        save_text("".join(f"{url}\n" for url in crawled), output)
+    click.echo(f"Crawled {crawl_count} pages", err=True)
+    if then is not None:
+        target = "as JSON lines" if ndjson else f"into {output_dir}"
+        click.echo(
+            f"Rendered {rendered - render_failed}/{rendered} pages {target}",
+            err=True,
+        )
+    if crawl_failed or render_failed:
+        raise click.ClickException(
+            f"{crawl_failed} pages failed to crawl, {render_failed} failed to render."
+        )
+
+
+def _parse_formats(
+    ctx: click.Context, param: click.Parameter, value: str
+) -> tuple[str, ...]:
+    """Split and validate a comma-separated ``--formats`` value.
+
+    Returns:
+        The requested formats, in order and without duplicates.
+
+    Raises:
+        BadParameter: If a format is unknown or cannot be bundled.
+
+    """
+    formats = tuple(dict.fromkeys(f.strip() for f in value.split(",") if f.strip()))
+    invalid = [f for f in formats if f not in BUNDLE_FORMATS]
+    if invalid or not formats:
+        raise click.BadParameter(
+            f"choose from {', '.join(BUNDLE_FORMATS)} (got {value!r})."
+        )
+    return formats
+
+
+@cli.command(
+    help=(
+        "Render each URL with several endpoints at once and write the results "
+        "into one directory per URL. Requests for a URL run concurrently, and "
+        "content+screenshot are served by a single snapshot render."
+    ),
+    short_help="Render several formats per URL concurrently.",
+)
+@click.argument("urls", nargs=-1)
+@click.option(
+    "-f",
+    "--formats",
+    default=",".join(DEFAULT_FORMATS),
+    show_default=True,
+    callback=_parse_formats,
+    help="Comma-separated endpoints to include in each bundle.",
+)
+@click.option(
+    "-i",
+    "--urls-file",
+    type=click.File("r"),
+    help="Also read URLs from FILE, one per line (- for stdin).",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Maximum number of requests in flight at once.",
+)
+@click.option(
+    "-d",
+    "--output-dir",
+    type=click.Path(file_okay=False, writable=True, path_type=Path),
+    default=Path("output"),
+    show_default=True,
+    help="Directory that receives one sub-directory per URL.",
+)
+def bundle(
+    urls: tuple[str, ...],
+    formats: tuple[str, ...],
+    urls_file,
+    jobs: int,
+    output_dir: Path,
+) -> None:
+    """Render *urls* into per-URL bundles containing *formats*.
+
+    Raises:
+        UsageError: If no URLs were given.
+        ClickException: If one or more formats failed to render.
+
+    """
+    if not urls and urls_file is None:
+        raise click.UsageError("Give at least one URL or --urls-file.")
+    all_urls = itertools.chain(urls, read_urls(urls_file) if urls_file else ())
+
+    total = failed = 0
+    for item in iter_bundles(all_urls, formats, output_dir, jobs=jobs):
+        total += 1
+        for fmt, error in item.errors.items():
+            if _DEBUG:
+                raise error
+            get_console(stderr=True).print(
+                f"[red]Failed {item.url} ({fmt}): {error}[/red]"
+            )
+        failed += not item.ok
+
+    get_console(stderr=True).print(
+        f"Bundled {total - failed}/{total} URLs into {output_dir}"
+    )
+    if failed:
+        raise click.ClickException(f"{failed} of {total} bundles are incomplete.")
+
+
+def _parse_latency(ctx: click.Context, param: click.Parameter, value: str) -> str:
+    """Validate a ``--latency`` distribution without building it.
+
+    Returns:
+        The unchanged *value*.
+
+    Raises:
+        BadParameter: If *value* is not a known distribution.
+
+    """
+    from cloudflare_browser_render.mockserver import parse_latency
+
+    try:
+        parse_latency(value)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from None
+    return value
+
+
+@cli.command(
+    "mock-server",
+    help=(
+        "Serve a local stand-in for the Browser Rendering API with realistic "
+        "response shapes, tunable latency, and injected errors and 429s. Point "
+        "cbr at it with --base-url (or CLOUDFLARE_BASE_URL) to load test "
+        "pipelines without spending quota."
+    ),
+    short_help="Serve a local mock of the API.",
+)
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option(
+    "-p", "--port", type=click.IntRange(0, 65535), default=8787, show_default=True
+)
+@click.option(
+    "--latency",
+    default="0",
+    show_default=True,
+    callback=_parse_latency,
+    help="Response latency in seconds, or a distribution: fixed:S, "
+    "uniform:LOW,HIGH, normal:MEAN,SD, lognormal:MEDIAN,SIGMA, exponential:MEAN.",
+)
+@click.option(
+    "--error-rate",
+    type=click.FloatRange(0, 1),
+    default=0.0,
+    show_default=True,
+    help="Share of requests answered with a 500 error.",
+)
+@click.option(
+    "--rate-limit-rate",
+    type=click.FloatRange(0, 1),
+    default=0.0,
+    show_default=True,
+    help="Share of requests answered with a 429 carrying Retry-After.",
+)
+@click.option(
+    "--retry-after",
+    type=click.FloatRange(min=0),
+    default=1.0,
+    show_default=True,
+    help="Seconds advertised in the Retry-After header of 429 responses.",
+)
+@click.option(
+    "--payload-size",
+    type=click.IntRange(min=0),
+    default=16 * 1024,
+    show_default=True,
+    help="Approximate size in bytes of generated HTML, Markdown and JSON.",
+)
+@click.option(
+    "--binary-size",
+    type=click.IntRange(min=0),
+    default=256 * 1024,
+    show_default=True,
+    help="Size in bytes of generated PDF and screenshot bodies.",
+)
+@click.option(
+    "--payloads",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory of canned payloads named after the endpoint (content.html, "
+    "links.json, pdf.pdf, ...); JSON files hold the envelope's result value.",
+)
+@click.option("--seed", type=int, help="Seed latency and failure injection.")
+@click.option("-v", "--verbose", is_flag=True, help="Log every request.")
+def mock_server(
+    host: str,
+    port: int,
+    latency: str,
+    error_rate: float,
+    rate_limit_rate: float,
+    retry_after: float,
+    payload_size: int,
+    binary_size: int,
+    payloads: Path | None,
+    seed: int | None,
+    verbose: bool,
+) -> None:
+    """Serve the mock Browser Rendering API until interrupted."""
+    from cloudflare_browser_render.mockserver import MockBrowserRendering, serve_mock
+
+    mock = MockBrowserRendering(
+        latency=latency,
+        payload_size=payload_size,
+        binary_size=binary_size,
+        error_rate=error_rate,
+        rate_limit_rate=rate_limit_rate,
+        retry_after=retry_after,
+        payload_dir=payloads,
+        seed=seed,
+    )
+    server = serve_mock(mock, host, port, verbose=verbose)
+    console = get_console()
+    console.print(f"Mock Browser Rendering API listening on {server.base_url}")
+    console.print(f"Use it with: cbr --base-url {server.base_url} ...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    console.print(
+        f"Served {sum(mock.requests.values())} requests "
+        f"({sum(mock.rate_limited.values())} rate limited, "
+        f"{sum(mock.errors.values())} errors)."
+    )
+
+
+@cli.command(
+    help=(
+        "Serve the renderers over a local HTTP API: GET /render/ENDPOINT?url=URL "
+        "or POST a JSON body with url (and selector, expression or fields for "
+        "scrape). All callers share one warm client, the --rate-limit limiter "
+        "and the --cache-dir cache, and identical concurrent requests are "
+        "coalesced into a single render."
+    ),
+    short_help="Serve the renderers over local HTTP.",
+)
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option(
+    "-p", "--port", type=click.IntRange(0, 65535), default=8788, show_default=True
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Maximum number of renders running at the same time.",
+)
+@click.option("-v", "--verbose", is_flag=True, help="Log every request.")
+def serve(host: str, port: int, jobs: int, verbose: bool) -> None:
+    """Serve the rendering gateway until interrupted."""
+    from cloudflare_browser_render.gateway import RenderGateway, serve_gateway
+
+    gateway = RenderGateway(jobs=jobs)
+    server = serve_gateway(gateway, host, port, verbose=verbose)
+    console = get_console()
+    console.print(f"Rendering gateway listening on {server.url}")
+    console.print(f"Try: curl '{server.url}/render/markdown?url=https://example.com'")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    stats = gateway.stats()
+    console.print(
+        f"Served {stats['requests']} requests with {stats['renders']} renders "
+        f"({stats['coalesced']} coalesced, {stats['errors']} errors)."
+    )
+
+
+@cli.group(
+    help=(
+        "Manage the background render daemon. With cbr --daemon (or "
+        "CBR_DAEMON=1) the single-URL commands forward their request to it over "
+        "a Unix socket, starting it on first use, so repeated invocations skip "
+        "the SDK import, .env loading and TLS handshake. The daemon renders "
+        "with the global options it was started with."
+    ),
+    short_help="Manage the background render daemon.",
+)
+def daemon() -> None:
+    """Group of daemon management commands."""
+
+
+def _daemon_socket(ctx: click.Context) -> Path:
+    """Return the socket from ``--daemon-socket`` or the default path.
+
+    Returns:
+        The path of the daemon's Unix socket.
+
+    """
+    from cloudflare_browser_render.daemon import default_socket_path
+
+    return ctx.find_root().params["daemon_socket"] or default_socket_path()
+
+
+@daemon.command(name="start", help="Start the render daemon.")
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Maximum number of renders running at the same time.",
+)
+@click.option(
+    "--idle-timeout",
+    type=click.FloatRange(min=0),
+    default=0,
+    help="Exit after this many seconds without requests (0: never). Daemons "
+    "started by --daemon exit after 15 minutes.",
+)
+@click.option(
+    "--foreground",
+    is_flag=True,
+    help="Serve in this process instead of in the background.",
+)
+@click.pass_context
+def daemon_start(
+    ctx: click.Context, jobs: int, idle_timeout: float, foreground: bool
+) -> None:
+    """Start the daemon, in the background unless *foreground* is set.
+
+    Raises:
+        ClickException: If a daemon is already running or fails to start.
+
+    """
+    from cloudflare_browser_render import daemon as daemon_mod
+
+    path = _daemon_socket(ctx)
+    console = get_console()
+    info = daemon_mod.status(path)
+    if info is not None:
+        raise click.ClickException(
+            f"The daemon is already running (pid {info['pid']}) on {path}."
+        )
+    if not foreground:
+        try:
+            info = daemon_mod.start(
+                path, _daemon_args(ctx), jobs=jobs, idle_timeout=idle_timeout
+            )
+        except daemon_mod.DaemonError as exc:
+            raise click.ClickException(str(exc)) from None
+        console.print(f"Daemon started (pid {info['pid']}) on {path}.")
+        return
+
+    try:
+        server = daemon_mod.serve_daemon(
+            path, jobs=jobs, idle_timeout=idle_timeout or None, args=_daemon_args(ctx)
+        )
+    except daemon_mod.DaemonError as exc:
+        raise click.ClickException(str(exc)) from None
+    console.print(f"Daemon listening on {path} (pid {os.getpid()})")
+    try:
+        server.serve_until_idle()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    stats = server.gateway.stats()
+    console.print(
+        f"Daemon stopped after {stats['requests']} requests with "
+        f"{stats['renders']} renders ({stats['coalesced']} coalesced, "
+        f"{stats['errors']} errors)."
+    )
+
+
+@daemon.command(name="stop", help="Stop the render daemon.")
+@click.pass_context
+def daemon_stop(ctx: click.Context) -> None:
+    """Ask the running daemon to exit."""
+    from cloudflare_browser_render import daemon as daemon_mod
+
+    path = _daemon_socket(ctx)
+    if daemon_mod.stop(path):
+        get_console().print(f"Daemon on {path} stopped.")
+    else:
+        get_console().print(f"No daemon is running on {path}.")
+
+
+@daemon.command(name="status", help="Show whether the daemon runs, and its counters.")
+@click.pass_context
+def daemon_status(ctx: click.Context) -> None:
+    """Print the daemon's status; exit with status 1 if it is not running."""
+    from cloudflare_browser_render import daemon as daemon_mod
+
+    path = _daemon_socket(ctx)
+    info = daemon_mod.status(path)
+    if info is None:
+        get_console().print(f"No daemon is running on {path}.")
+        ctx.exit(1)
+    print_json(info)
+
+
 # ---------------------------------------------------------------------------
 # Interactive flow (fallback when no subcommand supplied)
 # ---------------------------------------------------------------------------
@@ -273,18 +1959,11 @@ def markdown(url: str, output: str | None) -> None:  # noqa: D401
 
 def _interactive_flow() -> None:
     """Replicates the original interactive Questionary workflow."""
+    import questionary
+
     endpoint = questionary.select(
         "Which endpoint do you want to use?",
-        choices=[
-            "content",
-            "screenshot",
-            "pdf",
-            "snapshot",
-            "scrape",
-            "json",
-            "links",
-            "markdown",
-        ],
+        choices=list(ENDPOINTS),
     ).ask()
     if not endpoint:
         return
@@ -296,22 +1975,11 @@ def _interactive_flow() -> None:
     # Handle scrape separately because it needs an extra arg.
     if endpoint == "scrape":
         selector = questionary.text("CSS selector:").ask()
-        result = render_scrape(url, selector)  # No expression here
+        result = get_renderer("scrape", lazy=True)(url, selector)  # No expression
         _process_result(result, None)
         return
 
-    renderer_map = {
-        "content": render_content,
-        "screenshot": render_screenshot,
-        "pdf": render_pdf,
-        "snapshot": render_snapshot,
-        "json": render_json,
-        "links": render_links,
-        "markdown": render_markdown,
-    }
-
-    renderer = renderer_map[endpoint]
-    result = renderer(url)
+    result = get_renderer(endpoint, lazy=True)(url)
     _process_result(result, None)
 
 
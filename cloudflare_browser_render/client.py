@@ -1,27 +1,195 @@
-"""HTTP client for Cloudflare Browser Rendering API."""
+"""HTTP client for Cloudflare Browser Rendering API.
 
-from cloudflare import Cloudflare  # type: ignore
+The ``cloudflare`` SDK is imported on first use: it is by far the most
+expensive import in the package and is not needed for ``--help`` or argument
+validation.
 
-from cloudflare_browser_render.config import get_api_token
+Clients are built on an explicitly tuned ``httpx`` client so that the
+connection pool, keep-alive, HTTP/2 and timeouts can be configured (see
+:class:`config.HttpSettings` and :func:`configure_client`). Multi-URL
+runners call :func:`reserve_connections` with their concurrency, so every
+worker can keep a warm connection instead of paying for a new TLS handshake
+per request.
+"""
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
+
+from cloudflare_browser_render.config import (
+    HttpSettings,
+    get_account_id,
+    get_api_token,
+    get_base_url,
+    get_http_settings,
+)
+from cloudflare_browser_render.profiling import phase
+
+if TYPE_CHECKING:
+    from cloudflare import AsyncCloudflare, Cloudflare  # type: ignore
 
 # ---------------------------------------------------------------------------
 # New SDK-based Client (preferred)
 # ---------------------------------------------------------------------------
 
 
-# Internal singleton instance – created lazily.
-_cf_client: Cloudflare | None = None
+# Internal singleton instances – created lazily.
+_cf_client: "Cloudflare | None" = None
+_async_cf_client: "AsyncCloudflare | None" = None
+
+# Settings from configure_client(); they take precedence over the environment.
+_base_url: str | None = None
+_http_overrides: dict[str, Any] = {}
+
+# Largest concurrency announced through reserve_connections().
+_reserved_connections = 0
+
+# (account id, base URL) requests go to, once asked for; see api_scope().
+_api_scope: tuple[str, str] | None = None
+
+
+def configure_client(
+    *, base_url: str | None = None, http: Mapping[str, Any] | None = None
+) -> None:
+    """Set the API base URL and HTTP settings used by clients from now on.
+
+    Existing singletons are dropped so that the next :func:`get_client` or
+    :func:`get_async_client` call picks the new settings up.
+
+    Args:
+        base_url: API base URL. Without it, ``CLOUDFLARE_BASE_URL`` (see
+            :func:`config.get_base_url`) and then Cloudflare's public API are
+            used.
+        http: :class:`config.HttpSettings` fields to override on top of the
+            ``CBR_HTTP_*`` environment, e.g. ``{"http2": True}``.
+
+    """
+    global _cf_client, _async_cf_client, _base_url, _http_overrides, _api_scope
+    _base_url = base_url
+    _http_overrides = dict(http or {})
+    _cf_client = _async_cf_client = _api_scope = None
+
+
+def effective_base_url() -> str | None:
+    """Return the API base URL new clients use.
+
+    Returns:
+        The :func:`configure_client` or ``CLOUDFLARE_BASE_URL`` override, or
+        ``None`` for Cloudflare's public API.
+
+    """
+    return _base_url or get_base_url()
+
+
+def api_scope() -> tuple[str, str]:
+    """Return the account id and API base URL that requests are sent to.
+
+    The same request answers differently for another account or API server
+    (such as ``cbr mock-server``), so the response cache keys on both. The
+    pair is read once per :func:`configure_client`, like the clients.
 
+    Returns:
+        ``(account_id, base_url)``, with an empty base URL for Cloudflare's.
 
-def get_client() -> Cloudflare:
+    """
+    global _api_scope
+    if _api_scope is None:
+        _api_scope = (get_account_id(), effective_base_url() or "")
+    return _api_scope
+
+
+def reserve_connections(count: int) -> None:
+    """Size the connection pool for *count* concurrent requests.
+
+    Both the pool and the number of idle keep-alive connections grow to at
+    least *count*, so concurrent workers reuse warm connections. Only clients
+    created afterwards are affected; runners call this before their first
+    request.
+    """
+    global _reserved_connections
+    _reserved_connections = max(_reserved_connections, count)
+
+
+def http_settings() -> HttpSettings:
+    """Return the effective HTTP settings for new clients.
+
+    Returns:
+        The environment settings with :func:`configure_client` overrides and
+        :func:`reserve_connections` applied.
+
+    """
+    settings = get_http_settings()._replace(**_http_overrides)
+    return settings._replace(
+        max_connections=max(settings.max_connections, _reserved_connections),
+        max_keepalive=max(settings.max_keepalive, _reserved_connections),
+    )
+
+
+def _client_options(http_client_cls: type) -> dict[str, Any]:
+    import httpx
+
+    settings = http_settings()
+    try:
+        http_client = http_client_cls(
+            http2=settings.http2,
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive,
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                settings.read_timeout, connect=settings.connect_timeout
+            ),
+        )
+    except ImportError:
+        raise RuntimeError(
+            "HTTP/2 needs the 'h2' package: pip install 'cloudflare-render[http2]'"
+        ) from None
+    # call_with_retry owns every retry, so that rate limits and retries are
+    # seen by the metrics and the concurrency controller, and latency is not
+    # inflated by the SDK's hidden back-off.
+    options: dict[str, Any] = {"http_client": http_client, "max_retries": 0}
+    base_url = effective_base_url()
+    if base_url:
+        options["base_url"] = base_url
+    return options
+
+
+def get_client() -> "Cloudflare":
     """Return a lazily-instantiated singleton Cloudflare SDK client.
 
     The instance is created on first call using the API token loaded from the
-    environment (via :func:`config.get_api_token`). The Cloudflare SDK handles
-    TLS verification, retries, and other concerns internally, so no extra
-    configuration is necessary here.
+    environment (via :func:`config.get_api_token`) and the HTTP settings from
+    :func:`http_settings`. The SDK's own retries are disabled; requests are
+    retried by :func:`utils.call_with_retry` instead.
     """
     global _cf_client
     if _cf_client is None:
-        _cf_client = Cloudflare(api_token=get_api_token())
+        with phase("imports"):
+            from cloudflare import Cloudflare, DefaultHttpxClient  # type: ignore
+        with phase("client"):
+            _cf_client = Cloudflare(
+                api_token=get_api_token(), **_client_options(DefaultHttpxClient)
+            )
     return _cf_client
+
+
+def get_async_client() -> "AsyncCloudflare":
+    """Return a lazily-instantiated singleton asynchronous Cloudflare SDK client.
+
+    The async client keeps its own connection pool, which is bound to the
+    event loop it is first used on. Long-running services should therefore
+    drive all async renders from a single loop.
+    """
+    global _async_cf_client
+    if _async_cf_client is None:
+        with phase("imports"):
+            from cloudflare import (  # type: ignore
+                AsyncCloudflare,
+                DefaultAsyncHttpxClient,
+            )
+        with phase("client"):
+            _async_cf_client = AsyncCloudflare(
+                api_token=get_api_token(),
+                **_client_options(DefaultAsyncHttpxClient),
+            )
+    return _async_cf_client
@@ -0,0 +1,282 @@
+"""Adaptive (AIMD) concurrency control for multi-URL runs.
+
+:class:`AdaptiveConcurrency` caps the number of requests in flight with a
+window that grows additively (by roughly one slot per window's worth of
+successful, fast responses) and shrinks multiplicatively when Cloudflare
+answers with a rate-limit error or latency climbs well above its baseline.
+
+Latency is judged on smoothed values only, so that jitter does not look like
+congestion: the median of the last :data:`LATENCY_SAMPLES` requests is
+compared with a baseline that follows that median slowly (an exponentially
+weighted moving average). The window is cut at most once per round trip.
+
+Once activated with :func:`configure_concurrency`, every request made through
+:func:`utils.call_with_retry` or :func:`utils.call_with_retry_async` is
+admitted by the controller and reports its outcome back to it via
+:func:`admit` or :func:`admit_async`.
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
+
+# Number of recent latencies whose median is compared with the baseline.
+LATENCY_SAMPLES = 20
+
+# Weight of each new median in the baseline's moving average.
+BASELINE_SMOOTHING = 0.02
+
+
+class AdaptiveConcurrency:
+    """Thread-safe AIMD window controlling how many requests run at once."""
+
+    def __init__(
+        self,
+        initial: int = 4,
+        *,
+        minimum: int = 1,
+        maximum: int = 64,
+        backoff: float = 0.5,
+        latency_factor: float = 2.0,
+        verbose: bool = True,
+    ) -> None:
+        """Create a controller.
+
+        Args:
+            initial: Starting window size.
+            minimum: Smallest window the controller may shrink to.
+            maximum: Largest window the controller may grow to.
+            backoff: Factor applied to the window on congestion.
+            latency_factor: A median recent latency above
+                ``latency_factor * baseline`` counts as congestion.
+            verbose: Log window changes to the console.
+
+        Raises:
+            ValueError: If the bounds are inconsistent.
+
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("expected 1 <= minimum <= initial <= maximum")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.verbose = verbose
+        self._window = float(initial)
+        self._in_flight = 0
+        self._samples: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._recent: float | None = None
+        self._baseline = 0.0
+        self._observed = 0
+        self._last_cut = float("-inf")
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return max(self.minimum, int(self._window))
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently admitted."""
+        return self._in_flight
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def acquire(self) -> None:
+        """Block until the window has room for another request."""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """Take a slot if the window has room, without waiting.
+
+        Returns:
+            Whether a slot was taken; release it with :meth:`release`.
+
+        """
+        with self._cond:
+            if self._in_flight >= self.limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self) -> None:
+        """Return a slot taken with :meth:`acquire`."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    # ------------------------------------------------------------------
+    # Feedback
+    # ------------------------------------------------------------------
+
+    def on_success(self, latency: float) -> None:
+        """Record a successful request that took *latency* seconds."""
+        with self._cond:
+            samples = self._samples
+            samples.append(latency)
+            recent = self._recent = sorted(samples)[len(samples) // 2]
+            # A plain running mean at first, then a moving average that trails
+            # the median slowly, so that a permanently slower backend does not
+            # look congested forever.
+            self._observed += 1
+            weight = max(BASELINE_SMOOTHING, 1 / self._observed)
+            baseline = self._baseline = (
+                self._baseline + (recent - self._baseline) * weight
+            )
+
+            # Only a full set of samples may cut the window, but any elevated
+            # median holds back growth.
+            congested = recent > self.latency_factor * baseline
+            if congested and len(samples) == samples.maxlen:
+                if self._cut(recent, "latency rising"):
+                    # Judge the smaller window on its own latencies only.
+                    samples.clear()
+            elif not congested:
+                self._resize(
+                    min(self.maximum, self._window + 1 / self._window), "stable"
+                )
+
+    def on_rate_limited(self) -> None:
+        """Record a request rejected with a rate-limit error."""
+        with self._cond:
+            self._cut(self._recent or 1.0, "rate limited")
+
+    def _cut(self, cooldown: float, reason: str) -> bool:
+        # Requests already in flight during a cut report the same congestion;
+        # only react once per round trip.
+        now = time.monotonic()
+        if now - self._last_cut < cooldown:
+            return False
+        self._last_cut = now
+        self._resize(max(self.minimum, self._window * self.backoff), reason)
+        return True
+
+    def _resize(self, window: float, reason: str) -> None:
+        old_limit = self.limit
+        self._window = window
+        if self.limit != old_limit:
+            self._cond.notify_all()
+            if self.verbose:
+                # Imported here: utils itself imports this module.
+                from cloudflare_browser_render.utils import get_console
+
+                get_console(stderr=True).print(
+                    f"[dim]Concurrency window {old_limit} → {self.limit} "
+                    f"({reason})[/dim]"
+                )
+
+
+# ---------------------------------------------------------------------------
+# Process-wide controller used by call_with_retry
+# ---------------------------------------------------------------------------
+
+_active_controller: AdaptiveConcurrency | None = None
+
+
+def configure_concurrency(
+    initial: int | None = None, **options: object
+) -> AdaptiveConcurrency | None:
+    """Activate (or, with ``None``, deactivate) adaptive concurrency control.
+
+    Args:
+        initial: Starting window size, or ``None`` to disable the controller.
+        **options: Further keyword arguments for :class:`AdaptiveConcurrency`.
+
+    Returns:
+        The active controller, or ``None`` when disabled.
+
+    """
+    global _active_controller
+    _active_controller = (
+        AdaptiveConcurrency(initial, **options) if initial is not None else None
+    )
+    return _active_controller
+
+
+def get_concurrency_controller() -> AdaptiveConcurrency | None:
+    """Return the active controller, or ``None`` when disabled."""
+    return _active_controller
+
+
+@contextmanager
+def admit(rate_limit_error: type[BaseException]) -> Generator[None, None, None]:
+    """Run the enclosed request inside the active controller's window.
+
+    Successful requests report their latency; *rate_limit_error* shrinks the
+    window. Other exceptions only release the slot. Without an active
+    controller this is a no-op.
+
+    Yields:
+        Once the request has been admitted.
+
+    """
+    controller = _active_controller
+    if controller is None:
+        yield
+        return
+
+    controller.acquire()
+    with _report(controller, rate_limit_error):
+        yield
+
+
+@asynccontextmanager
+async def admit_async(
+    rate_limit_error: type[BaseException],
+) -> AsyncGenerator[None, None]:
+    """Asynchronous counterpart of :func:`admit`.
+
+    Waiting for a slot polls the window instead of blocking, so the event
+    loop keeps running other requests in the meantime.
+
+    Yields:
+        Once the request has been admitted.
+
+    """
+    controller = _active_controller
+    if controller is None:
+        yield
+        return
+
+    # asyncio is necessarily loaded already when this coroutine runs;
+    # importing it here keeps it off the CLI's start-up path.
+    import asyncio
+
+    pause = 0.001
+    while not controller.try_acquire():
+        await asyncio.sleep(pause)
+        pause = min(pause * 2, 0.05)
+    with _report(controller, rate_limit_error):
+        yield
+
+
+@contextmanager
+def _report(
+    controller: AdaptiveConcurrency, rate_limit_error: type[BaseException]
+) -> Generator[None, None, None]:
+    """Report the outcome of an admitted request and release its slot.
+
+    Yields:
+        While the request runs.
+
+    """
+    start = time.monotonic()
+    try:
+        yield
+    except rate_limit_error:
+        controller.on_rate_limited()
+        raise
+    else:
+        controller.on_success(time.monotonic() - start)
+    finally:
+        controller.release()
@@ -1,13 +1,28 @@
 """Configuration for Cloudflare Browser Rendering CLI."""
 
+import functools
 import os
+from typing import NamedTuple
 
-from dotenv import load_dotenv
-
-load_dotenv()
+from cloudflare_browser_render.profiling import phase
 
 API_TOKEN_ENV = "CLOUDFLARE_API_TOKEN"
 ACCOUNT_ID_ENV = "CLOUDFLARE_ACCOUNT_ID"
+BASE_URL_ENV = "CLOUDFLARE_BASE_URL"
+HTTP_ENV_PREFIX = "CBR_HTTP_"
+
+
+@functools.cache
+def load_env() -> None:
+    """Load variables from a ``.env`` file into the environment (once).
+
+    Deferred until configuration is first needed so that commands which never
+    talk to Cloudflare (``--help``, argument errors) skip the file lookup.
+    """
+    with phase("imports"):
+        from dotenv import load_dotenv
+    with phase("config"):
+        load_dotenv()
 
 
 def get_api_token() -> str:
@@ -20,6 +35,7 @@ def get_api_token() -> str:
         RuntimeError: If the API token is not found in environment variables.
 
     """
+    load_env()
     token = os.getenv(API_TOKEN_ENV)
     if not token:
         raise RuntimeError(f"{API_TOKEN_ENV} not found in environment or .env file")
@@ -36,7 +52,68 @@ def get_account_id() -> str:
         RuntimeError: If the Account ID is not found in environment variables.
 
     """
+    load_env()
     account_id = os.getenv(ACCOUNT_ID_ENV)
     if not account_id:
         raise RuntimeError(f"{ACCOUNT_ID_ENV} not found in environment or .env file")
     return account_id
+
+
+def get_base_url() -> str | None:
+    """Return the API base URL override, if one is configured.
+
+    Set it to point the client at a local stand-in such as
+    ``cbr mock-server``; unset means Cloudflare's public API.
+
+    Returns:
+        The base URL, or ``None`` for the default.
+
+    """
+    load_env()
+    return os.getenv(BASE_URL_ENV) or None
+
+
+class HttpSettings(NamedTuple):
+    """Connection pool, keep-alive, protocol and timeout settings.
+
+    The defaults match the Cloudflare SDK's own. Each field can be set from
+    the environment as ``CBR_HTTP_<FIELD>``, e.g. ``CBR_HTTP_MAX_KEEPALIVE``
+    or ``CBR_HTTP_HTTP2=1``.
+    """
+
+    max_connections: int = 100
+    max_keepalive: int = 20
+    keepalive_expiry: float = 5.0
+    http2: bool = False
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+
+
+def get_http_settings() -> HttpSettings:
+    """Return the HTTP settings, applying ``CBR_HTTP_*`` environment overrides.
+
+    Returns:
+        The defaults of :class:`HttpSettings`, with any overrides applied.
+
+    Raises:
+        RuntimeError: If an override is not a valid value for its field.
+
+    """
+    load_env()
+    overrides = {}
+    for field, default in HttpSettings._field_defaults.items():
+        name = f"{HTTP_ENV_PREFIX}{field.upper()}"
+        value = os.getenv(name)
+        if not value:
+            continue
+        if isinstance(default, bool):
+            overrides[field] = value.lower() in ("1", "true", "yes", "on")
+            continue
+        try:
+            parsed = type(default)(value)
+        except ValueError:
+            parsed = -1
+        if parsed < 0:
+            raise RuntimeError(f"{name} must be a non-negative number")
+        overrides[field] = parsed
+    return HttpSettings()._replace(**overrides)
@@ -0,0 +1,183 @@
+"""Breadth-first site crawling built on the ``links`` endpoint.
+
+:func:`iter_crawl` keeps a FIFO frontier of ``(url, depth)`` pairs and fetches
+the links of up to ``2 * jobs`` pages at once. Discovered links are resolved,
+normalised (see :func:`normalize_url`) and deduplicated before they enter the
+frontier, and are only followed while they stay within the crawl's scope:
+maximum depth and page count, the seeds' hosts, and optional include/exclude
+regular expressions.
+"""
+
+import re
+from collections import deque
+from collections.abc import Iterable, Iterator
+from typing import Any, NamedTuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from cloudflare_browser_render.client import reserve_connections
+from cloudflare_browser_render.renderers import get_renderer
+from cloudflare_browser_render.result import unwrap
+
+# Ports implied by the scheme and therefore dropped during normalisation.
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class CrawlPage(NamedTuple):
+    """A page reached by the crawler."""
+
+    url: str
+    depth: int
+    links: tuple[str, ...] = ()
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the page's links were fetched successfully (or not needed)."""
+        return self.error is None
+
+
+def normalize_url(url: str, base: str | None = None) -> str | None:
+    """Return a canonical form of *url* suitable for deduplication.
+
+    Relative URLs are resolved against *base*. The scheme and host are
+    lower-cased, default ports and fragments are dropped, and an empty path
+    becomes ``/``. The query string is kept as-is.
+
+    Returns:
+        The normalised URL, or ``None`` for anything other than http(s).
+
+    """
+    if base is not None:
+        url = urljoin(base, url)
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:  # malformed netloc or port
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+    netloc = parts.hostname
+    if port is not None and port != _DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def _extract_links(result: Any) -> list[str]:
+    """Return the link list from a ``links`` response.
+
+    Accepts both the bare list and the API envelope (``{"result": [...]}``).
+
+    Returns:
+        The non-empty string links in the response.
+
+    """
+    result = unwrap(result)
+    if isinstance(result, dict):
+        result = result.get("result") or []
+    return [link for link in result if isinstance(link, str) and link]
+
+
+def iter_crawl(
+    seeds: Iterable[str],
+    *,
+    max_depth: int = 2,
+    max_pages: int | None = None,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    same_host: bool = True,
+    jobs: int = 4,
+) -> Iterator[CrawlPage]:
+    """Crawl breadth-first from *seeds*, yielding each page reached.
+
+    Links are only fetched for pages shallower than *max_depth*; pages at the
+    maximum depth are yielded without a request, as they are only needed as
+    crawl results.
+
+    Args:
+        seeds: Start URLs (depth 0). Always crawled, regardless of filters.
+        max_depth: Number of link hops to follow from the seeds.
+        max_pages: Stop adding pages to the frontier after this many.
+        include: Regular expressions; if given, a discovered URL must match
+            at least one of them to be followed.
+        exclude: Regular expressions; discovered URLs matching any of them
+            are skipped.
+        same_host: Only follow links to hosts of the seeds.
+        jobs: Maximum number of ``links`` requests in flight at once.
+
+    Yields:
+        A :class:`CrawlPage` per page, roughly in breadth-first order. Renderer
+        exceptions are captured on the page rather than raised.
+
+    Raises:
+        ValueError: If *jobs* is smaller than 1 or *max_depth* is negative.
+
+    """
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    if max_depth < 0:
+        raise ValueError("max_depth must not be negative")
+    reserve_connections(jobs)
+
+    # Imported here to keep the CLI's start-up path lean.
+    from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+    include_res = [re.compile(pattern) for pattern in include]
+    exclude_res = [re.compile(pattern) for pattern in exclude]
+    hosts: set[str] = set()
+    seen: set[str] = set()
+    frontier: deque[tuple[str, int]] = deque()
+
+    def _in_scope(url: str) -> bool:
+        if same_host and urlsplit(url).hostname not in hosts:
+            return False
+        if include_res and not any(r.search(url) for r in include_res):
+            return False
+        return not any(r.search(url) for r in exclude_res)
+
+    def _enqueue(url: str, depth: int) -> None:
+        if url in seen or (max_pages is not None and len(seen) >= max_pages):
+            return
+        seen.add(url)
+        frontier.append((url, depth))
+
+    for seed in seeds:
+        url = normalize_url(seed)
+        if url is not None:
+            hosts.add(urlsplit(url).hostname or "")
+            _enqueue(url, 0)
+
+    render_links = get_renderer("links")
+    pool = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="cbr-crawl")
+    pending: dict[Future, tuple[str, int]] = {}
+    try:
+        while frontier or pending:
+            while frontier and len(pending) < 2 * jobs:
+                url, depth = frontier.popleft()
+                if depth >= max_depth:
+                    yield CrawlPage(url, depth)
+                else:
+                    pending[pool.submit(render_links, url)] = (url, depth)
+            if not pending:
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, depth = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:  # noqa: BLE001 – reported per page
+                    yield CrawlPage(url, depth, error=exc)
+                    continue
+                links = []
+                for href in _extract_links(result):
+                    link = normalize_url(href, url)
+                    if link is None:
+                        continue
+                    links.append(link)
+                    if _in_scope(link):
+                        _enqueue(link, depth + 1)
+                yield CrawlPage(url, depth, tuple(dict.fromkeys(links)))
+    finally:
+        # Pages still queued when the caller stops are not rendered.
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,482 @@
+"""Background render daemon on a Unix socket (``cbr daemon``, ``cbr --daemon``).
+
+A short ``cbr markdown URL`` spends most of its time before the first request
+goes out: importing the Cloudflare SDK, loading ``.env``, building the client
+and opening a TLS connection. With ``--daemon`` (or ``CBR_DAEMON=1``) the
+single-URL commands send their request to a long-lived daemon instead,
+starting it on first use, and write its answer exactly as they would have
+written their own result. The daemon renders with a
+:class:`~cloudflare_browser_render.gateway.RenderGateway`, so it keeps the
+connection pool warm and coalesces identical concurrent requests too.
+
+The protocol is one request per connection. The client sends a JSON line
+``{"op": "render", "endpoint": ..., "params": {"url": ..., ...}}`` (or
+``{"op": "status"}`` / ``{"op": "stop"}``). The daemon answers with a JSON
+header line ``{"status": ..., "content_type": ..., "length": ...}``, followed
+by *length* body bytes, which binary results stream from.
+
+Unix sockets only: this module is imported on demand, never by ``--help``.
+"""
+
+import fcntl
+import json
+import os
+import socket
+import socketserver
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Generator, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from cloudflare_browser_render.result import JSON, TEXT, RenderResult
+from cloudflare_browser_render.utils import save_stream
+
+if TYPE_CHECKING:
+    from cloudflare_browser_render.gateway import RenderGateway
+
+SOCKET_ENV = "CBR_DAEMON_SOCKET"
+START_TIMEOUT = 15.0
+# Auto-started daemons exit after this many idle seconds.
+AUTO_IDLE_TIMEOUT = 900.0
+_JSON_TYPE = "application/json"
+_CHUNK = 64 * 1024
+_MAX_REQUEST = 1024 * 1024
+
+
+class DaemonError(RuntimeError):
+    """The daemon is unreachable, failed to start, or answered with an error."""
+
+
+class DaemonOptionsError(DaemonError):
+    """A running daemon was started with other global options than requested."""
+
+
+def default_socket_path() -> Path:
+    """Return the daemon socket path.
+
+    ``CBR_DAEMON_SOCKET`` wins. Otherwise the socket lives in
+    ``$XDG_RUNTIME_DIR``, or in a per-user directory under the system
+    temporary directory (see :func:`_socket_dir`).
+
+    Returns:
+        The path of the Unix socket.
+
+    """
+    configured = os.environ.get(SOCKET_ENV)
+    if configured:
+        return Path(configured)
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    return (Path(runtime) if runtime else _fallback_dir()) / "cbr-daemon.sock"
+
+
+def _fallback_dir() -> Path:
+    return Path(tempfile.gettempdir(), f"cbr-{os.getuid()}")
+
+
+def _socket_dir(path: Path) -> None:
+    """Create the directory of the socket *path* if needed.
+
+    The fallback directory sits in the shared temporary directory, where
+    another user could have created it (or a symlink by that name) first. It
+    is only used if it is a real directory owned by us and closed to others.
+
+    Raises:
+        DaemonError: If the fallback directory is not private to this user.
+
+    """
+    directory = path.parent
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if directory != _fallback_dir():
+        return
+    info = directory.lstat()
+    if stat.S_ISLNK(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise DaemonError(
+            f"refusing to use {directory}: it must be a directory owned by you "
+            "and accessible to nobody else (mode 700)"
+        )
+
+
+def log_path(path: Path) -> Path:
+    """Return the log file of the daemon listening on *path*.
+
+    Returns:
+        The socket path with a ``.log`` suffix appended.
+
+    """
+    return path.with_name(path.name + ".log")
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+
+def _error_message(body: bytes) -> str:
+    try:
+        return str(json.loads(body)["error"])
+    except (ValueError, KeyError, TypeError):
+        return body.decode(errors="replace")
+
+
+@contextmanager
+def _exchange(
+    path: Path, request: dict[str, Any]
+) -> Generator[tuple[dict[str, Any], IO[bytes]], None, None]:
+    """Send *request* to the daemon and yield its header and body stream.
+
+    Yields:
+        The response header and a reader positioned at the body.
+
+    Raises:
+        DaemonError: If the daemon is unreachable or reports an error.
+
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError as exc:
+        sock.close()
+        raise DaemonError(f"no daemon listening on {path}: {exc}") from None
+    with sock, sock.makefile("rb") as reader:
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        try:
+            header = json.loads(reader.readline())
+        except ValueError:
+            header = None
+        if not isinstance(header, dict):
+            raise DaemonError("the daemon closed the connection without answering")
+        if header["status"] != 200:
+            raise DaemonError(_error_message(reader.read(header["length"])))
+        yield header, reader
+
+
+def _body_chunks(reader: IO[bytes], length: int) -> Iterator[bytes]:
+    """Yield the *length* body bytes from *reader* in chunks.
+
+    Raises:
+        DaemonError: If the connection ends before the body is complete.
+
+    """
+    remaining = length
+    while remaining > 0:
+        chunk = reader.read(min(_CHUNK, remaining))
+        if not chunk:
+            raise DaemonError("the daemon closed the connection mid-response")
+        remaining -= len(chunk)
+        yield chunk
+
+
+def render(path: Path, endpoint: str, url: str, **params: Any) -> Any:
+    """Render *url* with *endpoint* in the daemon listening on *path*.
+
+    Returns:
+        The result as the in-process renderer returns it: ``bytes`` for
+        binary endpoints and a :class:`RenderResult` otherwise.
+
+    """
+    request = {"op": "render", "endpoint": endpoint, "params": {"url": url, **params}}
+    with _exchange(path, request) as (header, reader):
+        body = b"".join(_body_chunks(reader, header["length"]))
+    content_type = header["content_type"]
+    if content_type == _JSON_TYPE:
+        return RenderResult(body, JSON)
+    if content_type.startswith("text/"):
+        return RenderResult(body, TEXT)
+    return body
+
+
+def stream(path: Path, endpoint: str, url: str, filename: str) -> Path | None:
+    """Render a binary *endpoint* in the daemon and stream it to *filename*.
+
+    Returns:
+        The written file, or ``None`` when *filename* is ``-`` (stdout).
+
+    """
+    request = {"op": "render", "endpoint": endpoint, "params": {"url": url}}
+    with _exchange(path, request) as (header, reader):
+        return save_stream(_body_chunks(reader, header["length"]), filename)
+
+
+def status(path: Path) -> dict[str, Any] | None:
+    """Return the status of the daemon listening on *path*.
+
+    Returns:
+        Its pid, socket, uptime and request counters, or ``None`` if no
+        daemon answers.
+
+    """
+    try:
+        with _exchange(path, {"op": "status"}) as (header, reader):
+            return json.loads(reader.read(header["length"]))
+    except DaemonError:
+        return None
+
+
+def stop(path: Path) -> bool:
+    """Ask the daemon listening on *path* to exit.
+
+    Returns:
+        Whether a daemon was running.
+
+    """
+    try:
+        with _exchange(path, {"op": "stop"}) as (header, reader):
+            reader.read(header["length"])
+            return True
+    except DaemonError:
+        return False
+
+
+def start(
+    path: Path,
+    args: Sequence[str] = (),
+    *,
+    jobs: int | None = None,
+    idle_timeout: float | None = None,
+    timeout: float = START_TIMEOUT,
+) -> dict[str, Any]:
+    """Start a daemon on *path* in the background and wait until it answers.
+
+    The daemon runs ``cbr [ARGS] daemon start --foreground`` in a new session,
+    logging to :func:`log_path`. *args* carries the global options (cache,
+    rate limit, HTTP settings) the daemon should render with; *jobs* and
+    *idle_timeout* are passed on to ``daemon start``.
+
+    Returns:
+        The status of the running daemon.
+
+    Raises:
+        DaemonError: If the daemon did not come up within *timeout* seconds,
+            or its socket directory is unsafe.
+
+    """
+    _socket_dir(path)
+    command = [
+        sys.executable, "-m", "cloudflare_browser_render", *args,
+        "--daemon-socket", str(path), "daemon", "start", "--foreground",
+    ]  # fmt: skip
+    if jobs is not None:
+        command += ["--jobs", str(jobs)]
+    if idle_timeout:
+        command += ["--idle-timeout", f"{idle_timeout:g}"]
+    with log_path(path).open("ab") as log:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = status(path)
+        if info is not None:
+            return info
+        # A non-zero exit means it failed; zero means another daemon won.
+        if process.poll():
+            break
+        time.sleep(0.02)
+    raise DaemonError(f"the daemon did not start; see {log_path(path)}")
+
+
+def ensure_running(path: Path, args: Sequence[str] = ()) -> None:
+    """Start a daemon on *path* unless one is already answering there.
+
+    Daemons started this way exit after :data:`AUTO_IDLE_TIMEOUT` idle seconds.
+    A daemon that is already running is only used if it was started with the
+    same global options *args*, so that its results are the ones this process
+    would have produced.
+
+    Raises:
+        DaemonOptionsError: If the running daemon uses other options.
+
+    """
+    info = status(path)
+    if info is None:
+        start(path, args, idle_timeout=AUTO_IDLE_TIMEOUT)
+    elif info.get("args", []) != list(args):
+        running = " ".join(info.get("args", [])) or "no options"
+        raise DaemonOptionsError(
+            f"the daemon on {path} (pid {info['pid']}) was started with "
+            f"{running}, not {' '.join(args) or 'no options'}; stop it with "
+            "`cbr daemon stop` or pick another --daemon-socket"
+        )
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "DaemonServer"
+
+    def _respond(self) -> tuple[int, str, bytes]:
+        try:
+            request = json.loads(self.rfile.readline(_MAX_REQUEST))
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            return 400, _JSON_TYPE, b'{"error": "malformed request"}'
+        op = request.get("op")
+        if op == "render":
+            params = request.get("params")
+            if not isinstance(params, dict):
+                return 400, _JSON_TYPE, b'{"error": "params must be an object"}'
+            response = self.server.gateway.render(str(request.get("endpoint")), params)
+            return response.status, response.content_type, response.body
+        if op == "status":
+            return 200, _JSON_TYPE, json.dumps(self.server.status()).encode()
+        if op == "stop":
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return 200, _JSON_TYPE, b"{}"
+        return 400, _JSON_TYPE, json.dumps({"error": f"unknown op {op!r}"}).encode()
+
+    def handle(self) -> None:
+        with self.server.activity():
+            status_code, content_type, body = self._respond()
+            header = {
+                "status": status_code,
+                "content_type": content_type,
+                "length": len(body),
+            }
+            try:
+                self.wfile.write(json.dumps(header).encode() + b"\n")
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client went away, e.g. interrupted with Ctrl-C
+
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    """Threaded Unix socket server answering with a :class:`RenderGateway`."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: Path,
+        gateway: "RenderGateway",
+        lock: IO[str],
+        idle_timeout: float | None = None,
+        args: Sequence[str] = (),
+    ) -> None:
+        """Listen on *path*; *lock* is held for the daemon's lifetime.
+
+        *args* are the global options the daemon was started with, reported
+        in its status so that clients can check they match their own.
+        """
+        super().__init__(str(path), _Handler)
+        os.chmod(path, 0o600)
+        self.path = path
+        self.gateway = gateway
+        self.idle_timeout = idle_timeout
+        self.args = list(args)
+        self._lock_file = lock
+        self._started = self._last_active = time.monotonic()
+        self._active = 0
+        self._mutex = threading.Lock()
+
+    @contextmanager
+    def activity(self) -> Generator[None, None, None]:
+        """Mark a connection as active, resetting the idle timer."""
+        with self._mutex:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._mutex:
+                self._active -= 1
+                self._last_active = time.monotonic()
+
+    def idle_for(self) -> float:
+        """Return the seconds since the last connection finished.
+
+        Returns:
+            The idle time, or ``0`` while a connection is being served.
+
+        """
+        with self._mutex:
+            return 0.0 if self._active else time.monotonic() - self._last_active
+
+    def status(self) -> dict[str, Any]:
+        """Return the pid, socket, start options, uptime and gateway counters.
+
+        Returns:
+            The status reported to ``cbr daemon status``.
+
+        """
+        return {
+            "pid": os.getpid(),
+            "socket": str(self.path),
+            "args": self.args,
+            "uptime": round(time.monotonic() - self._started, 3),
+            **self.gateway.stats(),
+        }
+
+    def serve_until_idle(self) -> None:
+        """Serve until stopped, or until idle for ``idle_timeout`` seconds."""
+        stopped = threading.Event()
+
+        def _watch() -> None:
+            while not stopped.wait(min(self.idle_timeout, 1.0)):
+                if self.idle_for() >= self.idle_timeout:
+                    self.shutdown()
+                    return
+
+        if self.idle_timeout:
+            threading.Thread(target=_watch, daemon=True).start()
+        try:
+            self.serve_forever()
+        finally:
+            stopped.set()
+
+    def server_close(self) -> None:
+        """Close the socket, remove its file and release the lock."""
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+        self._lock_file.close()
+
+
+def serve_daemon(
+    path: Path,
+    *,
+    jobs: int = 8,
+    idle_timeout: float | None = None,
+    args: Sequence[str] = (),
+) -> DaemonServer:
+    """Bind a daemon to *path*; call ``serve_until_idle`` on it.
+
+    A lock file next to the socket ensures a single daemon per socket; a
+    socket file left behind by a crashed daemon is replaced. *args* are the
+    global options this process was started with (see :func:`ensure_running`).
+
+    Returns:
+        The bound, not yet serving, server.
+
+    Raises:
+        DaemonError: If another daemon already serves *path*, or its socket
+            directory is unsafe.
+
+    """
+    from cloudflare_browser_render.gateway import RenderGateway
+
+    _socket_dir(path)
+    lock = path.with_name(path.name + ".lock").open("a")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        raise DaemonError(f"a daemon is already running on {path}") from None
+    path.unlink(missing_ok=True)
+    try:
+        gateway = RenderGateway(jobs=jobs)
+        return DaemonServer(path, gateway, lock, idle_timeout, args)
+    except BaseException:
+        lock.close()
+        raise
@@ -0,0 +1,342 @@
+"""Local extraction of links, selectors and Markdown from rendered HTML.
+
+Once enabled with :func:`configure_extraction` (the CLI does so for
+``--local-extract``), the ``links`` and ``markdown`` renderers and
+``scrape`` requests without Javascript expressions no longer ask Cloudflare
+to render the page again. They fetch the page once through the ``content``
+endpoint (cached like any other response) and derive their result
+in-process with BeautifulSoup.
+
+Results mirror the shape of the remote endpoints: links, scrape and Markdown
+results all come wrapped in the usual ``{"success": true, "result": ...}``
+envelope.
+"""
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urljoin
+
+from cloudflare_browser_render.renderers import get_async_renderer, get_renderer
+from cloudflare_browser_render.result import unwrap
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, Tag
+
+# Elements whose content never contributes to links, text or Markdown.
+_SKIPPED_TAGS = ("script", "style", "noscript", "template", "head")
+_BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "div", "footer", "header", "main", "nav",
+    "section", "figure", "figcaption", "form", "fieldset", "details", "summary",
+    "dl", "dt", "dd",
+})  # fmt: skip
+_HTML_CACHE_SIZE = 32
+
+
+# ---------------------------------------------------------------------------
+# Process-wide switch used by the renderers
+# ---------------------------------------------------------------------------
+
+_local_extract = False
+
+
+def configure_extraction(local: bool) -> bool:
+    """Enable (or disable) local extraction for links, Markdown and scrape.
+
+    Returns:
+        The new setting.
+
+    """
+    global _local_extract
+    _local_extract = local
+    _html_cache.clear()
+    return _local_extract
+
+
+def local_extract_enabled() -> bool:
+    """Return whether renderers should extract locally from page HTML."""
+    return _local_extract
+
+
+# ---------------------------------------------------------------------------
+# Page HTML, fetched once per URL
+# ---------------------------------------------------------------------------
+
+_html_cache: OrderedDict[str, str] = OrderedDict()
+_html_lock = threading.Lock()
+
+
+def html_from_content(body: str) -> str:
+    """Return the page HTML from a ``content`` response body.
+
+    The endpoint answers with a JSON envelope whose ``result`` is the HTML;
+    bodies that are not such an envelope are returned unchanged.
+
+    Returns:
+        The rendered HTML.
+
+    """
+    if body.lstrip().startswith("{"):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return body
+        if isinstance(payload, dict) and isinstance(payload.get("result"), str):
+            return payload["result"]
+    return body
+
+
+def _recall_html(url: str) -> str | None:
+    with _html_lock:
+        html = _html_cache.get(url)
+        if html is not None:
+            _html_cache.move_to_end(url)
+        return html
+
+
+def _remember_html(url: str, body: str) -> str:
+    html = html_from_content(body)
+    with _html_lock:
+        _html_cache[url] = html
+        while len(_html_cache) > _HTML_CACHE_SIZE:
+            _html_cache.popitem(last=False)
+    return html
+
+
+def fetch_html(url: str) -> str:
+    """Return the HTML of *url*, rendering it at most once per recent URL.
+
+    The response cache (when active) already persists ``content`` results; a
+    small in-memory LRU on top saves re-reading and re-parsing the envelope
+    when several extractors run on the same page in one process.
+
+    Returns:
+        The rendered HTML of *url*.
+
+    """
+    html = _recall_html(url)
+    if html is None:
+        html = _remember_html(url, unwrap(get_renderer("content")(url)))
+    return html
+
+
+async def fetch_html_async(url: str) -> str:
+    """Asynchronous counterpart of :func:`fetch_html`.
+
+    Returns:
+        The rendered HTML of *url*.
+
+    """
+    html = _recall_html(url)
+    if html is None:
+        html = _remember_html(url, unwrap(await get_async_renderer("content")(url)))
+    return html
+
+
+def _soup(html: str) -> "BeautifulSoup":
+    # Imported here: BeautifulSoup is only needed once something is parsed.
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(_SKIPPED_TAGS):
+        tag.decompose()
+    return soup
+
+
+# ---------------------------------------------------------------------------
+# Extractors
+# ---------------------------------------------------------------------------
+
+
+def extract_links(html: str, base_url: str) -> dict[str, Any]:
+    """Return the absolute link targets in *html*, in document order.
+
+    Returns:
+        ``{"success": True, "result": [url, ...]}``, like the ``links``
+        endpoint.
+
+    """
+    links = []
+    for anchor in _soup(html).find_all("a", href=True):
+        href = anchor["href"].strip()
+        if href and not href.startswith(("#", "javascript:")):
+            links.append(urljoin(base_url, href))
+    return {"success": True, "result": list(dict.fromkeys(links))}
+
+
+def extract_elements(html: str, elements: list[Mapping[str, str]]) -> dict[str, Any]:
+    """Match each element's CSS selector against *html*.
+
+    Args:
+        html: Page HTML.
+        elements: ``{"selector": ...}`` entries, as sent to the scrape
+            endpoint. Expressions are not supported locally.
+
+    Returns:
+        ``{"success": True, "result": [{"selector", "results"}, ...]}`` with
+        the ``text``, ``html`` and ``attributes`` of every match, like the
+        ``scrape`` endpoint.
+
+    Raises:
+        ValueError: If an element carries a Javascript expression.
+
+    """
+    soup = _soup(html)
+    result = []
+    for element in elements:
+        if element.get("expression"):
+            raise ValueError("Javascript expressions need a remote render")
+        matches = [
+            {
+                "text": match.get_text(" ", strip=True),
+                "html": match.decode_contents(),
+                "attributes": [
+                    {"name": name, "value": " ".join(v) if isinstance(v, list) else v}
+                    for name, v in match.attrs.items()
+                ],
+            }
+            for match in soup.select(element["selector"])
+        ]
+        result.append({"selector": element["selector"], "results": matches})
+    return {"success": True, "result": result}
+
+
+def extract_markdown(html: str, base_url: str | None = None) -> dict[str, Any]:
+    """Convert *html* to Markdown.
+
+    Handles headings, paragraphs, emphasis, links, images, inline and block
+    code, (nested) lists, block quotes, rules and simple tables. Scripts,
+    styles and the document head are dropped.
+
+    Returns:
+        ``{"success": True, "result": markdown}``, like the ``markdown``
+        endpoint.
+
+    """
+    soup = _soup(html)
+    root = soup.body or soup
+    text = re.sub(r"\n{3,}", "\n\n", _MarkdownWriter(base_url).blocks(root))
+    return {"success": True, "result": text.strip() + "\n"}
+
+
+class _MarkdownWriter:
+    """Recursive HTML-to-Markdown conversion over a BeautifulSoup tree."""
+
+    def __init__(self, base_url: str | None) -> None:
+        self.base_url = base_url
+
+    def _url(self, href: str) -> str:
+        return urljoin(self.base_url, href) if self.base_url else href
+
+    def blocks(self, node: "Tag") -> str:
+        """Return the Markdown for the children of *node*, block by block."""
+        from bs4 import Comment, NavigableString, Tag
+
+        parts: list[str] = []
+        inline: list[str] = []
+
+        def _flush() -> None:
+            text = re.sub(r"[ \t]*\n[ \t]*", "\n", "".join(inline)).strip()
+            if text:
+                parts.append(text)
+            inline.clear()
+
+        for child in node.children:
+            if isinstance(child, Comment):
+                continue
+            if isinstance(child, NavigableString):
+                inline.append(re.sub(r"\s+", " ", str(child)))
+            elif isinstance(child, Tag):
+                block = self.block(child)
+                if block is None:
+                    inline.append(self.inline(child))
+                else:
+                    _flush()
+                    if block:
+                        parts.append(block)
+        _flush()
+        return "\n\n".join(parts)
+
+    def block(self, tag: "Tag") -> str | None:
+        """Return the Markdown for a block-level *tag*, or ``None`` if inline."""
+        name = tag.name
+        if re.fullmatch(r"h[1-6]", name):
+            return f"{'#' * int(name[1])} {self.inline_children(tag).strip()}"
+        if name == "p":
+            return self.inline_children(tag).strip()
+        if name in ("ul", "ol"):
+            return self.list_block(tag)
+        if name == "pre":
+            code = tag.get_text()
+            return f"```\n{code.rstrip()}\n```"
+        if name == "blockquote":
+            return "\n".join(
+                f"> {line}".rstrip() for line in self.blocks(tag).split("\n")
+            )
+        if name == "hr":
+            return "---"
+        if name == "table":
+            return self.table(tag)
+        if name in _BLOCK_TAGS or name in ("body", "html"):
+            return self.blocks(tag)
+        return None
+
+    def list_block(self, tag: "Tag", depth: int = 0) -> str:
+        """Return the Markdown for a ``ul``/``ol`` *tag*, nesting by *depth*."""
+        lines = []
+        for index, item in enumerate(tag.find_all("li", recursive=False), 1):
+            marker = f"{index}." if tag.name == "ol" else "-"
+            nested = [child.extract() for child in item.find_all(("ul", "ol"))]
+            body = self.blocks(item).replace("\n\n", " ").replace("\n", " ")
+            lines.append(f"{'  ' * depth}{marker} {body.strip()}")
+            lines.extend(self.list_block(sub, depth + 1) for sub in nested)
+        return "\n".join(lines)
+
+    def table(self, tag: "Tag") -> str:
+        """Return a pipe table for *tag*, using its first row as the header."""
+        rows = [
+            [self.inline_children(cell).strip().replace("|", "\\|") for cell in row]
+            for row in (tr.find_all(("th", "td")) for tr in tag.find_all("tr"))
+            if row
+        ]
+        if not rows:
+            return ""
+        width = max(len(row) for row in rows)
+        rows = [row + [""] * (width - len(row)) for row in rows]
+        lines = [f"| {' | '.join(rows[0])} |", f"|{' --- |' * width}"]
+        lines += [f"| {' | '.join(row)} |" for row in rows[1:]]
+        return "\n".join(lines)
+
+    def inline_children(self, tag: "Tag") -> str:
+        """Return the inline Markdown for the children of *tag*."""
+        from bs4 import Comment, NavigableString
+
+        return "".join(
+            ""
+            if isinstance(child, Comment)
+            else re.sub(r"\s+", " ", str(child))
+            if isinstance(child, NavigableString)
+            else self.inline(child)
+            for child in tag.children
+        )
+
+    def inline(self, tag: "Tag") -> str:
+        """Return the inline Markdown for *tag*."""
+        name = tag.name
+        if name == "br":
+            return "\n"
+        if name == "img":
+            return f"![{tag.get('alt', '')}]({self._url(tag.get('src', ''))})"
+        content = self.inline_children(tag)
+        if name == "a" and tag.get("href"):
+            return f"[{content.strip()}]({self._url(tag['href'])})"
+        if name in ("strong", "b") and content.strip():
+            return f"**{content.strip()}**"
+        if name in ("em", "i") and content.strip():
+            return f"*{content.strip()}*"
+        if name == "code":
+            return f"`{tag.get_text()}`"
+        return content
@@ -0,0 +1,263 @@
+"""Local HTTP gateway to the renderers (``cbr serve``).
+
+:class:`RenderGateway` answers render requests inside one long-lived process,
+so every caller shares the same warm SDK client and connection pool, the
+rate limiter configured with ``--rate-limit`` and the cache configured with
+``--cache-dir``. Identical requests that arrive while a render is running
+are coalesced with :class:`~cloudflare_browser_render.singleflight.SingleFlight`:
+ten callers asking for the same page's Markdown cost one Cloudflare render.
+
+The HTTP API, served by :func:`serve_gateway`::
+
+    GET  /render/<endpoint>?url=URL[&selector=CSS&expression=JS]
+    POST /render/<endpoint>   {"url": ..., "selector": ..., "fields": {...}}
+    GET  /healthz             gateway counters as JSON
+    GET  /metrics             Prometheus metrics (with ``cbr --metrics``)
+
+Results are returned as-is: PDF and PNG bodies for the binary endpoints, HTML
+or Markdown text, and JSON for the rest. Failures are JSON objects with an
+``error`` message; upstream rate limiting is passed on as ``429``.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+from cloudflare_browser_render.client import reserve_connections
+from cloudflare_browser_render.metrics import get_metrics
+from cloudflare_browser_render.renderers import ENDPOINTS, get_renderer
+from cloudflare_browser_render.result import TEXT, RenderResult
+from cloudflare_browser_render.singleflight import SingleFlight
+
+CONTENT_TYPES = {
+    "content": "text/html; charset=utf-8",
+    "markdown": "text/markdown; charset=utf-8",
+    "pdf": "application/pdf",
+    "screenshot": "image/png",
+}
+JSON_TYPE = "application/json"
+# Keyword arguments each endpoint accepts besides ``url``.
+RENDER_PARAMS: dict[str, frozenset[str]] = {
+    endpoint: frozenset() for endpoint in ENDPOINTS
+} | {"scrape": frozenset({"selector", "expression", "fields"})}
+MAX_BODY = 1024 * 1024
+DEFAULT_PORT = 8788
+
+
+class GatewayResponse(NamedTuple):
+    """A response to send: status, content type, body and coalescing flag."""
+
+    status: int
+    content_type: str
+    body: bytes
+    shared: bool = False
+
+
+def _error(status: int, message: str) -> GatewayResponse:
+    return GatewayResponse(status, JSON_TYPE, json.dumps({"error": message}).encode())
+
+
+def encode_result(endpoint: str, result: Any) -> tuple[str, bytes]:
+    """Encode a renderer *result* as an HTTP body.
+
+    Returns:
+        The content type and the body.
+
+    """
+    if isinstance(result, bytes):
+        return CONTENT_TYPES.get(endpoint, "application/octet-stream"), result
+    if isinstance(result, RenderResult):  # the body as received, not re-encoded
+        if result.kind == TEXT:
+            content_type = CONTENT_TYPES.get(endpoint, "text/plain; charset=utf-8")
+            return content_type, result.data
+        return JSON_TYPE, result.data
+    if isinstance(result, str):
+        content_type = CONTENT_TYPES.get(endpoint, "text/plain; charset=utf-8")
+        return content_type, result.encode()
+    return JSON_TYPE, json.dumps(result).encode()
+
+
+class RenderGateway:
+    """Renders requests for the HTTP gateway, coalescing identical ones."""
+
+    def __init__(self, *, jobs: int = 8) -> None:
+        """Allow up to *jobs* renders to run at the same time.
+
+        Raises:
+            ValueError: If *jobs* is smaller than one.
+
+        """
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1")
+        self.jobs = jobs
+        self.requests = 0
+        self.renders = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._flight: SingleFlight[tuple[str, bytes]] = SingleFlight()
+        self._slots = threading.BoundedSemaphore(jobs)
+        self._lock = threading.Lock()
+        reserve_connections(jobs)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> dict[str, int]:
+        """Return the gateway counters.
+
+        Returns:
+            Requests, renders, coalesced requests, errors and in-flight keys.
+
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "renders": self.renders,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "in_flight": self._flight.in_flight(),
+            }
+
+    def _render(
+        self, endpoint: str, url: str, params: dict[str, Any]
+    ) -> tuple[str, bytes]:
+        with self._slots:
+            self._count("renders")
+            result = get_renderer(endpoint, lazy=True)(url, **params)
+        return encode_result(endpoint, result)
+
+    def render(self, endpoint: str, params: dict[str, Any]) -> GatewayResponse:
+        """Render *endpoint* for the request parameters *params*.
+
+        *params* holds ``url`` and, for ``scrape``, ``selector``,
+        ``expression`` or ``fields``. A request identical to one already
+        being rendered waits for that render instead of starting another.
+
+        Returns:
+            The response to send; errors are turned into JSON error bodies.
+
+        """
+        self._count("requests")
+        if endpoint not in ENDPOINTS:
+            return _error(404, f"unknown endpoint {endpoint!r}")
+        params = {name: value for name, value in params.items() if value is not None}
+        url = params.pop("url", None)
+        if not isinstance(url, str) or not url:
+            return _error(400, "missing 'url'")
+        unknown = set(params) - RENDER_PARAMS[endpoint]
+        if unknown:
+            return _error(400, f"unexpected parameters: {', '.join(sorted(unknown))}")
+
+        key = (endpoint, url, json.dumps(params, sort_keys=True))
+        try:
+            (content_type, body), shared = self._flight.do(
+                key, lambda: self._render(endpoint, url, params)
+            )
+        except (ValueError, TypeError) as exc:
+            self._count("errors")
+            return _error(400, str(exc))
+        except Exception as exc:
+            self._count("errors")
+            status = 429 if getattr(exc, "status_code", None) == 429 else 502
+            return _error(status, f"{type(exc).__name__}: {exc}")
+        if shared:
+            self._count("coalesced")
+        return GatewayResponse(200, content_type, body, shared)
+
+
+# ---------------------------------------------------------------------------
+# HTTP server
+# ---------------------------------------------------------------------------
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "GatewayServer"
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, response: GatewayResponse) -> None:
+        self.send_response(response.status)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("Content-Length", str(len(response.body)))
+        if response.shared:
+            self.send_header("X-Cbr-Coalesced", "1")
+        self.end_headers()
+        self.wfile.write(response.body)
+
+    def _dispatch(self, path: str, params: dict[str, Any]) -> GatewayResponse:
+        gateway = self.server.gateway
+        if path == "/healthz":
+            body = json.dumps({"ok": True, **gateway.stats()}).encode()
+            return GatewayResponse(200, JSON_TYPE, body)
+        if path == "/metrics":
+            metrics = get_metrics()
+            if metrics is None:
+                return _error(404, "metrics are disabled; start with cbr --metrics")
+            body = metrics.to_prometheus().encode()
+            return GatewayResponse(200, "text/plain; version=0.0.4", body)
+        endpoint = path.removeprefix("/render/")
+        if endpoint == path:
+            return _error(404, f"no route for {path}")
+        return gateway.render(endpoint, params)
+
+    def do_GET(self) -> None:  # noqa: N802 – name required by http.server
+        parts = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        self._send(self._dispatch(parts.path, params))
+
+    def do_POST(self) -> None:  # noqa: N802 – name required by http.server
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self.close_connection = True
+            self._send(_error(413, "request body too large"))
+            return
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            params = None
+        if not isinstance(params, dict):
+            self._send(_error(400, "request body must be a JSON object"))
+            return
+        self._send(self._dispatch(urlsplit(self.path).path, params))
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class GatewayServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering with a :class:`RenderGateway`."""
+
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int], gateway: RenderGateway, *, verbose=False
+    ) -> None:
+        """Bind to *address* (port ``0`` picks a free one)."""
+        super().__init__(address, _Handler)
+        self.gateway = gateway
+        self.verbose = verbose
+
+    @property
+    def url(self) -> str:
+        """The gateway's base URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def serve_gateway(
+    gateway: RenderGateway,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    *,
+    verbose: bool = False,
+) -> GatewayServer:
+    """Create a :class:`GatewayServer` for *gateway*; call ``serve_forever`` on it.
+
+    Returns:
+        The bound, not yet serving, server.
+
+    """
+    return GatewayServer((host, port), gateway, verbose=verbose)
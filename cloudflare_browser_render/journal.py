@@ -0,0 +1,113 @@
+"""Append-only JSONL journal for resumable multi-URL runs.
+
+Every state change of a URL is appended to the journal as one JSON line::
+
+    {"ts": 1718000000.0, "endpoint": "markdown", "url": "...", "status": "done",
+     "output": "output/example.com-1a2b3c4d.md"}
+
+Lines are flushed as they are written, so the journal survives Ctrl-C or a
+crash with at most the in-flight URLs unaccounted for. When a run is resumed,
+the journal is replayed and the latest status per ``(endpoint, url)`` wins;
+URLs already ``done`` are skipped, everything else is rendered again. That
+includes URLs recorded as ``unchanged`` by an incremental run, for which no
+output was written.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+PENDING = "pending"
+DONE = "done"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+
+
+class Journal:
+    """Record and replay the per-URL state of a multi-URL run."""
+
+    def __init__(self, path: str | os.PathLike[str], *, resume: bool = False) -> None:
+        """Open the journal at *path*.
+
+        Args:
+            path: Journal file; created if missing.
+            resume: Replay and append to an existing journal. Otherwise the
+                file is truncated and the run starts from scratch.
+
+        """
+        self.path = Path(path)
+        self.skipped = 0
+        self._state: dict[tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+        if resume and self.path.exists():
+            self._replay()
+        self._fh = self.path.open("a" if resume else "w", encoding="utf-8")
+
+    def _replay(self) -> None:
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                    key = (entry["endpoint"], entry["url"])
+                    self._state[key] = entry["status"]
+                except (ValueError, KeyError, TypeError):
+                    # A line cut short by an interrupted write.
+                    continue
+
+    def status(self, endpoint: str, url: str) -> str | None:
+        """Return the latest recorded status of *url*, or ``None``."""
+        return self._state.get((endpoint, url))
+
+    def counts(self) -> Counter[str]:
+        """Return the number of URLs per latest status."""
+        return Counter(self._state.values())
+
+    def record(self, endpoint: str, url: str, status: str, **fields: Any) -> None:
+        """Append a state change for *url* and flush it to disk."""
+        entry = {"ts": time.time(), "endpoint": endpoint, "url": url}
+        entry.update(status=status, **fields)
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._state[(endpoint, url)] = status
+            self._fh.write(line + "\n")
+            self._fh.flush()
+
+    def track(self, endpoint: str, urls: Iterable[str]) -> Iterator[str]:
+        """Filter *urls* down to those still to be rendered.
+
+        URLs already ``done`` are skipped (and counted in :attr:`skipped`);
+        the others are recorded as ``pending`` as they are handed out.
+
+        Yields:
+            Each URL that still needs rendering.
+
+        """
+        for url in urls:
+            if self.status(endpoint, url) == DONE:
+                self.skipped += 1
+                continue
+            self.record(endpoint, url, PENDING)
+            yield url
+
+    def close(self) -> None:
+        """Close the underlying file."""
+        self._fh.close()
+
+    def __enter__(self) -> "Journal":
+        """Return the journal itself for use in a ``with`` block."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Close the journal on leaving a ``with`` block."""
+        self.close()
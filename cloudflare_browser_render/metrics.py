@@ -0,0 +1,267 @@
+"""Per-request instrumentation of renderer calls.
+
+Once activated with :func:`configure_metrics`, every request made through
+:func:`utils.call_with_retry` reports its outcome here: the latency of each
+successful attempt, response sizes, rate-limit responses, retries and
+errors by exception class, all per endpoint. :class:`Metrics` can export
+them in the Prometheus text exposition format or as JSON, and summarise
+latency percentiles at the end of a run.
+"""
+
+import bisect
+import json
+import math
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0,
+)  # fmt: skip
+PERCENTILES: tuple[int, ...] = (50, 95, 99)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the *pct*-th percentile of sorted *samples* (nearest rank).
+
+    Returns:
+        The percentile, or ``0.0`` for no samples.
+
+    """
+    if not samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(samples)))
+    return samples[rank - 1]
+
+
+class _EndpointMetrics:
+    """Counters and latency samples for a single endpoint."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.bytes = 0
+        self.errors: Counter[str] = Counter()
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        # Kept sorted so percentiles are exact; a float per request is cheap
+        # even for runs of tens of thousands of URLs.
+        self.samples: list[float] = []
+
+    def observe(self, latency: float, nbytes: int) -> None:
+        self.requests += 1
+        self.bytes += nbytes
+        self.latency_sum += latency
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        bisect.insort(self.samples, latency)
+
+
+class Metrics:
+    """Thread-safe collection of per-endpoint request metrics."""
+
+    def __init__(self) -> None:
+        """Create an empty collection."""
+        self._endpoints: dict[str, _EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, endpoint: str | None) -> _EndpointMetrics:
+        key = endpoint or "unknown"
+        metrics = self._endpoints.get(key)
+        if metrics is None:
+            metrics = self._endpoints[key] = _EndpointMetrics()
+        return metrics
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def observe(self, endpoint: str | None, latency: float, nbytes: int = 0) -> None:
+        """Record a successful request that took *latency* seconds."""
+        with self._lock:
+            self._get(endpoint).observe(latency, nbytes)
+
+    def observe_rate_limit(self, endpoint: str | None, *, retrying: bool) -> None:
+        """Record a rate-limit response, and whether it will be retried."""
+        with self._lock:
+            metrics = self._get(endpoint)
+            metrics.rate_limited += 1
+            metrics.retries += retrying
+
+    def observe_retry(self, endpoint: str | None) -> None:
+        """Record a request retried after a connection error or ``5xx``."""
+        with self._lock:
+            self._get(endpoint).retries += 1
+
+    def observe_error(self, endpoint: str | None, exc: BaseException) -> None:
+        """Record a request that failed for good with *exc*."""
+        with self._lock:
+            self._get(endpoint).errors[type(exc).__name__] += 1
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot, keyed by endpoint.
+
+        Returns:
+            Request counts, latency percentiles (seconds), retries, rate-limit
+            responses, response bytes and errors by class per endpoint.
+
+        """
+        with self._lock:
+            snapshot = {}
+            for endpoint, m in sorted(self._endpoints.items()):
+                latency = {f"p{p}": percentile(m.samples, p) for p in PERCENTILES}
+                latency["mean"] = m.latency_sum / m.requests if m.requests else 0.0
+                latency["max"] = m.samples[-1] if m.samples else 0.0
+                snapshot[endpoint] = {
+                    "requests": m.requests,
+                    "latency_seconds": latency,
+                    "retries": m.retries,
+                    "rate_limited": m.rate_limited,
+                    "response_bytes": m.bytes,
+                    "errors": dict(m.errors),
+                }
+            return snapshot
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            The exposition text, ending in a newline.
+
+        """
+        lines: list[str] = []
+
+        def _family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            _family(
+                "cbr_request_duration_seconds",
+                "histogram",
+                "Latency of successful Browser Rendering requests.",
+            )
+            for endpoint, m in endpoints:
+                cumulative = 0
+                bounds = [*map(str, LATENCY_BUCKETS), "+Inf"]
+                for bound, count in zip(bounds, m.buckets, strict=True):
+                    cumulative += count
+                    lines.append(
+                        f'cbr_request_duration_seconds_bucket{{endpoint="{endpoint}",'
+                        f'le="{bound}"}} {cumulative}'
+                    )
+                name = "cbr_request_duration_seconds"
+                labels = f'{{endpoint="{endpoint}"}}'
+                lines.append(f"{name}_sum{labels} {m.latency_sum}")
+                lines.append(f"{name}_count{labels} {m.requests}")
+
+            counters = (
+                ("cbr_retries_total", "retries", "Requests retried."),
+                ("cbr_rate_limited_total", "rate_limited", "Responses with a 429."),
+                ("cbr_response_bytes_total", "bytes", "Response body bytes."),
+            )
+            for name, attr, help_text in counters:
+                _family(name, "counter", help_text)
+                for endpoint, m in endpoints:
+                    value = getattr(m, attr)
+                    lines.append(f'{name}{{endpoint="{endpoint}"}} {value}')
+
+            _family("cbr_errors_total", "counter", "Failed requests by error class.")
+            for endpoint, m in endpoints:
+                for error, count in sorted(m.errors.items()):
+                    lines.append(
+                        f'cbr_errors_total{{endpoint="{endpoint}",error="{error}"}} '
+                        f"{count}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | os.PathLike[str]) -> Path:
+        """Write the metrics to *path*: JSON for ``.json``, else Prometheus.
+
+        Returns:
+            The Path written.
+
+        """
+        path = Path(path)
+        if path.suffix == ".json":
+            text = json.dumps(self.to_dict(), indent=2) + "\n"
+        else:
+            text = self.to_prometheus()
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def summary_rows(self) -> list[tuple[str, ...]]:
+        """Return one formatted row per endpoint for an end-of-run summary.
+
+        Returns:
+            Rows of endpoint, requests, p50/p95/p99 in ms, retries, rate
+            limits, bytes and error count.
+
+        """
+        rows = []
+        for endpoint, data in self.to_dict().items():
+            latency = data["latency_seconds"]
+            rows.append((
+                endpoint,
+                str(data["requests"]),
+                *(f"{latency[f'p{p}'] * 1000:.0f}" for p in PERCENTILES),
+                str(data["retries"]),
+                str(data["rate_limited"]),
+                str(data["response_bytes"]),
+                str(sum(data["errors"].values())),
+            ))
+        return rows
+
+
+# ---------------------------------------------------------------------------
+# Process-wide collection used by call_with_retry
+# ---------------------------------------------------------------------------
+
+_active_metrics: Metrics | None = None
+
+
+def configure_metrics(enabled: bool) -> Metrics | None:
+    """Start (or stop) collecting request metrics for this process.
+
+    Returns:
+        The fresh collection, or ``None`` when disabled.
+
+    """
+    global _active_metrics
+    _active_metrics = Metrics() if enabled else None
+    return _active_metrics
+
+
+def get_metrics() -> Metrics | None:
+    """Return the active collection, or ``None`` when disabled."""
+    return _active_metrics
+
+
+def response_size(response: Any) -> int:
+    """Return the body size of an SDK raw response, if it can be told cheaply.
+
+    Buffered responses report their actual length; streamed ones fall back to
+    the ``Content-Length`` header.
+
+    Returns:
+        The size in bytes, or ``0`` if unknown.
+
+    """
+    http = getattr(response, "http_response", None)
+    if http is None:
+        return 0
+    try:
+        return len(http.content)
+    except Exception:  # noqa: BLE001 – httpx.ResponseNotRead for streams
+        try:
+            return int(http.headers.get("content-length", 0))
+        except ValueError:
+            return 0
@@ -0,0 +1,333 @@
+"""Local stand-in for the Cloudflare Browser Rendering API (``cbr mock-server``).
+
+:class:`MockBrowserRendering` answers the eight ``/browser-rendering/*``
+routes with the same response shapes as Cloudflare: JSON envelopes for the
+text and JSON endpoints, binary bodies for ``pdf`` and ``screenshot``. It
+can add latency drawn from a distribution (see :func:`parse_latency`), and
+it can inject server errors and ``429`` responses that carry
+``Retry-After``. Payloads are generated at a configurable size, or read
+from a directory of canned files.
+
+:func:`serve_mock` exposes it over HTTP with the standard library server.
+Point the CLI at it with ``--base-url`` (or ``CLOUDFLARE_BASE_URL``) to load
+test concurrency, rate limiting and caching without spending real quota.
+"""
+
+import base64
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, NamedTuple
+
+ENDPOINT_PATH = re.compile(r"/accounts/[^/]+/browser-rendering/(?P<endpoint>\w+)$")
+BINARY_ENDPOINTS = {"pdf": "application/pdf", "screenshot": "image/png"}
+MOCK_ENDPOINTS = (
+    "content", "screenshot", "pdf", "snapshot",
+    "scrape", "json", "links", "markdown",
+)  # fmt: skip
+API_PREFIX = "/client/v4"
+_CHUNK = 64 * 1024
+
+LatencyModel = Callable[[random.Random], float]
+
+
+def parse_latency(spec: str | float) -> LatencyModel:
+    """Parse a latency distribution such as ``uniform:0.1,0.5``.
+
+    Supported forms (all in seconds): ``S`` or ``fixed:S``,
+    ``uniform:LOW,HIGH``, ``normal:MEAN,STDDEV``, ``lognormal:MEDIAN,SIGMA``
+    and ``exponential:MEAN``. Samples are never negative.
+
+    Returns:
+        A function drawing one latency from a :class:`random.Random`.
+
+    Raises:
+        ValueError: If *spec* is not a known distribution.
+
+    """
+    if isinstance(spec, int | float):
+        spec = str(spec)
+    kind, _, args = spec.partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    try:
+        values = [float(arg) for arg in args.split(",")]
+    except ValueError:
+        raise ValueError(f"invalid latency {spec!r}") from None
+    models: dict[tuple[str, int], LatencyModel] = {
+        ("fixed", 1): lambda rng: values[0],
+        ("uniform", 2): lambda rng: rng.uniform(*values),
+        ("normal", 2): lambda rng: rng.gauss(*values),
+        ("lognormal", 2): lambda rng: rng.lognormvariate(
+            math.log(values[0]), values[1]
+        ),
+        ("exponential", 1): lambda rng: rng.expovariate(1 / values[0]),
+    }
+    model = models.get((kind, len(values)))
+    if model is None or min(values) < 0 or (kind == "exponential" and not values[0]):
+        raise ValueError(f"invalid latency {spec!r}")
+    return lambda rng: max(0.0, model(rng))
+
+
+class MockResponse(NamedTuple):
+    """A response to send: status, headers and body chunks."""
+
+    status: int
+    headers: dict[str, str]
+    chunks: Iterator[bytes]
+
+
+def _html(size: int) -> str:
+    """Return an HTML page of roughly *size* bytes with a few links."""
+    paragraph = (
+        '<p>Lorem ipsum <a href="/page/{n}">dolor</a> sit amet, '
+        "consectetur adipiscing elit.</p>\n"
+    )
+    parts = ["<html><head><title>Mock</title></head><body><h1>Mock page</h1>\n"]
+    length, n = len(parts[0]), 0
+    while length < size:
+        parts.append(paragraph.format(n=n))
+        length += len(parts[-1])
+        n += 1
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def _random_chunks(size: int) -> Iterator[bytes]:
+    """Yield *size* bytes of random data, repeating one random chunk.
+
+    Yields:
+        Chunks of at most ``_CHUNK`` bytes.
+
+    """
+    chunk = os.urandom(min(_CHUNK, size) or 1)
+    remaining = size
+    while remaining > 0:
+        yield chunk[:remaining]
+        remaining -= len(chunk)
+
+
+def _json_response(status: int, payload: dict[str, Any]) -> MockResponse:
+    body = json.dumps(payload).encode()
+    headers = {"content-type": "application/json", "content-length": str(len(body))}
+    return MockResponse(status, headers, iter((body,)))
+
+
+def _error(status: int, message: str) -> MockResponse:
+    return _json_response(status, {
+        "success": False,
+        "errors": [{"code": status, "message": message}],
+        "messages": [],
+        "result": None,
+    })  # fmt: skip
+
+
+class MockBrowserRendering:
+    """Generates Browser Rendering responses, with latency and failures."""
+
+    def __init__(
+        self,
+        *,
+        latency: str | float = 0.0,
+        payload_size: int = 16 * 1024,
+        binary_size: int = 256 * 1024,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        payload_dir: str | os.PathLike[str] | None = None,
+        seed: int | None = None,
+    ) -> None:
+        """Configure the mock.
+
+        Args:
+            latency: Latency distribution, see :func:`parse_latency`.
+            payload_size: Approximate size in bytes of generated text/JSON.
+            binary_size: Size in bytes of generated PDF/screenshot bodies,
+                which are produced chunk by chunk, and of the screenshot
+                embedded in snapshots.
+            error_rate: Share of requests (0–1) answered with a 500.
+            rate_limit_rate: Share of requests (0–1) answered with a 429.
+            retry_after: Seconds advertised in ``Retry-After`` on 429s.
+            payload_dir: Directory of canned payloads named after the
+                endpoint (``content.html``, ``pdf.pdf``, ``links.json``, …).
+                For the JSON-enveloped endpoints the file holds the
+                ``result`` value; binary files are sent as-is.
+            seed: Seed for latency and failure injection.
+
+        """
+        self.latency = parse_latency(latency)
+        self.payload_size = payload_size
+        self.binary_size = binary_size
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.requests: Counter[str] = Counter()
+        self.rate_limited: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self._random = random.Random(seed)
+        # Encoded once: snapshots carry a binary_size screenshot as base64.
+        self._screenshot_b64: str | None = None
+        self._lock = threading.Lock()
+        self._html = _html(payload_size)
+        self._canned: dict[str, bytes] = {}
+        if payload_dir is not None:
+            for path in Path(payload_dir).iterdir():
+                if path.stem in MOCK_ENDPOINTS and path.is_file():
+                    self._canned[path.stem] = path.read_bytes()
+
+    # ------------------------------------------------------------------
+    # Payloads
+    # ------------------------------------------------------------------
+
+    def _result(self, endpoint: str, request: dict[str, Any]) -> Any:
+        canned = self._canned.get(endpoint)
+        if canned is not None:
+            text = canned.decode()
+            return text if endpoint in ("content", "markdown") else json.loads(text)
+        if endpoint == "content":
+            return self._html
+        if endpoint == "markdown":
+            sentence = "Lorem ipsum dolor sit amet. "
+            return "# Mock page\n\n" + sentence * (self.payload_size // len(sentence))
+        if endpoint == "links":
+            base = request.get("url", "").rstrip("/")
+            return [f"{base}/page/{n}" for n in range(50)]
+        if endpoint == "json":
+            return {"title": "Mock page", "items": list(range(self.payload_size // 8))}
+        if endpoint == "scrape":
+            match = {"text": "Mock page", "html": "Mock page", "attributes": []}
+            return [
+                {"selector": element.get("selector"), "results": [match]}
+                for element in request.get("elements", [])
+            ]
+        # snapshot
+        if self._screenshot_b64 is None:
+            screenshot = self._canned.get("screenshot") or b"".join(
+                _random_chunks(self.binary_size)
+            )
+            self._screenshot_b64 = base64.b64encode(screenshot).decode()
+        return {"content": self._html, "screenshot": self._screenshot_b64}
+
+    def _binary(self, endpoint: str) -> MockResponse:
+        canned = self._canned.get(endpoint)
+        size = self.binary_size if canned is None else len(canned)
+        headers = {
+            "content-type": BINARY_ENDPOINTS[endpoint],
+            "content-length": str(size),
+        }
+        if canned is not None:
+            return MockResponse(200, headers, iter((canned,)))
+        return MockResponse(200, headers, _random_chunks(size))
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def handle(self, path: str, body: bytes) -> tuple[float, MockResponse]:
+        """Answer a ``POST`` of *body* to *path*.
+
+        Returns:
+            The latency to wait before answering, and the response.
+
+        """
+        match = ENDPOINT_PATH.search(path.split("?", 1)[0])
+        if match is None or match["endpoint"] not in MOCK_ENDPOINTS:
+            return 0.0, _error(404, f"no route for {path}")
+        endpoint = match["endpoint"]
+        with self._lock:
+            self.requests[endpoint] += 1
+            delay = self.latency(self._random)
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            with self._lock:
+                self.rate_limited[endpoint] += 1
+            response = _error(429, "Rate limit exceeded")
+            response.headers["retry-after"] = f"{self.retry_after:g}"
+            response.headers["retry-after-ms"] = str(int(self.retry_after * 1000))
+            return delay, response
+        if roll < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self.errors[endpoint] += 1
+            return delay, _error(500, "Internal error (injected)")
+        if endpoint in BINARY_ENDPOINTS:
+            return delay, self._binary(endpoint)
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            return delay, _error(400, "request body is not JSON")
+        return delay, _json_response(200, {
+            "success": True,
+            "errors": [],
+            "messages": [],
+            "result": self._result(endpoint, request),
+        })  # fmt: skip
+
+
+# ---------------------------------------------------------------------------
+# HTTP server
+# ---------------------------------------------------------------------------
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "MockServer"
+    protocol_version = "HTTP/1.1"  # keep connections alive, like Cloudflare
+
+    def do_POST(self) -> None:  # noqa: N802 – name required by http.server
+        length = int(self.headers.get("Content-Length") or 0)
+        delay, response = self.server.mock.handle(self.path, self.rfile.read(length))
+        if delay:
+            time.sleep(delay)
+        self.send_response(response.status)
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        for chunk in response.chunks:
+            self.wfile.write(chunk)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class MockServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering with a :class:`MockBrowserRendering`."""
+
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int], mock: MockBrowserRendering, *, verbose=False
+    ) -> None:
+        """Bind to *address* (port ``0`` picks a free one)."""
+        super().__init__(address, _Handler)
+        self.mock = mock
+        self.verbose = verbose
+
+    @property
+    def base_url(self) -> str:
+        """The API base URL to configure clients with."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+
+def serve_mock(
+    mock: MockBrowserRendering,
+    host: str = "127.0.0.1",
+    port: int = 8787,
+    *,
+    verbose: bool = False,
+) -> MockServer:
+    """Create a :class:`MockServer` for *mock*; call ``serve_forever`` on it.
+
+    Returns:
+        The bound, not yet serving, server.
+
+    """
+    return MockServer((host, port), mock, verbose=verbose)
@@ -0,0 +1,66 @@
+"""JSON Lines (NDJSON) output for multi-URL runs.
+
+Instead of collecting every result and dumping one large JSON document at the
+end, ``--format ndjson`` writes one compact JSON object per line and flushes
+it as soon as the result is in. Memory use stays flat however many URLs are
+rendered, and consumers such as ``jq`` can start on the first line straight
+away.
+
+Lines are serialised with `orjson <https://github.com/ijl/orjson>`_ when it
+is installed (``pip install 'cloudflare-render[fast-json]'``), and with the
+standard library otherwise; both produce compact UTF-8.
+"""
+
+import json
+from typing import IO, Any
+
+from cloudflare_browser_render.profiling import phase
+
+# orjson module, None if it is not installed, or ... until first looked up.
+_orjson: Any = ...
+
+
+def _fast_backend() -> Any:
+    global _orjson
+    if _orjson is ...:
+        try:
+            import orjson
+        except ImportError:
+            orjson = None
+        _orjson = orjson
+    return _orjson
+
+
+def dumps_line(record: Any) -> bytes:
+    """Serialise *record* as one compact JSON line.
+
+    Returns:
+        The UTF-8 encoded JSON document followed by a newline.
+
+    """
+    orjson = _fast_backend()
+    if orjson is not None:
+        try:
+            return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:  # e.g. non-string keys; the stdlib copes with those
+            pass
+    text = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+    return (text + "\n").encode()
+
+
+class NDJSONWriter:
+    """Writes one JSON document per line, flushing after every line."""
+
+    def __init__(self, stream: IO[bytes]) -> None:
+        """Write to the binary *stream*."""
+        self.stream = stream
+        self.count = 0
+
+    def write(self, record: Any) -> None:
+        """Append *record* as a line and flush it to the consumer."""
+        with phase("serialize"):
+            line = dumps_line(record)
+        with phase("write"):
+            self.stream.write(line)
+            self.stream.flush()
+        self.count += 1
@@ -0,0 +1,183 @@
+"""Lightweight phase profiler for triaging slow runs (``--profile``).
+
+Code paths mark the work they do with :func:`phase`: lazy imports, SDK
+client construction, network waits, response decoding, cache access, JSON
+serialisation, console rendering and file writes. When profiling is enabled
+with :func:`configure_profiling`, each phase accumulates its *self* time –
+a nested phase pauses its parent – so the phases never double-count. When
+disabled, :func:`phase` costs one global lookup.
+
+Times are summed over all threads and tasks; with ``--jobs`` greater than one
+their total can therefore exceed the wall-clock duration of the run.
+"""
+
+import contextvars
+import threading
+import time
+from collections.abc import Generator, Iterable, Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    import tracemalloc
+
+# Number of allocation sites listed by the memory report.
+TOP_ALLOCATIONS = 10
+
+
+class PhaseStat(NamedTuple):
+    """Accumulated self time of one phase."""
+
+    name: str
+    calls: int
+    seconds: float
+
+
+class AllocationSite(NamedTuple):
+    """Memory still allocated from one source line when the run ended."""
+
+    location: str
+    size: int
+    count: int
+
+
+class Profile:
+    """Per-phase timings and, optionally, a tracemalloc memory profile."""
+
+    def __init__(self, *, memory: bool = False) -> None:
+        """Start the wall clock and, if *memory* is set, tracemalloc."""
+        self.memory = memory
+        self.started = time.perf_counter()
+        self._totals: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+        if memory:
+            import tracemalloc
+
+            tracemalloc.start()
+
+    def add(self, name: str, seconds: float, calls: int = 1) -> None:
+        """Charge *seconds* (over *calls* entries) to phase *name*."""
+        with self._lock:
+            totals = self._totals.setdefault(name, [0, 0.0])
+            totals[0] += calls
+            totals[1] += seconds
+
+    def elapsed(self) -> float:
+        """Return the wall-clock seconds since profiling started."""
+        return time.perf_counter() - self.started
+
+    def phases(self) -> list[PhaseStat]:
+        """Return the accumulated phases, slowest first.
+
+        Returns:
+            One :class:`PhaseStat` per phase that was entered.
+
+        """
+        with self._lock:
+            stats = [
+                PhaseStat(name, int(c), s) for name, (c, s) in self._totals.items()
+            ]
+        return sorted(stats, key=lambda stat: stat.seconds, reverse=True)
+
+    def memory_report(self) -> tuple[int, list[AllocationSite]] | None:
+        """Stop tracemalloc and summarise what it saw.
+
+        Returns:
+            The peak traced memory in bytes and the top allocation sites by
+            size, or ``None`` if memory profiling is off.
+
+        """
+        if not self.memory:
+            return None
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            return None
+        _current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        sites = [
+            AllocationSite(_location(stat.traceback), stat.size, stat.count)
+            for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+        ]
+        return peak, sites
+
+
+def _location(traceback: "tracemalloc.Traceback") -> str:
+    frame = traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+# ---------------------------------------------------------------------------
+# Process-wide profile used by the instrumented code paths
+# ---------------------------------------------------------------------------
+
+_active_profile: Profile | None = None
+
+# Phases currently open in this thread or task, innermost last. Each entry
+# holds the phase name and the time its current slice started.
+_open_phases: contextvars.ContextVar[tuple[list, ...]] = contextvars.ContextVar(
+    "cbr_open_phases", default=()
+)
+
+
+def configure_profiling(enabled: bool, *, memory: bool = False) -> Profile | None:
+    """Start (or stop) profiling this process.
+
+    Returns:
+        The fresh :class:`Profile`, or ``None`` when disabled.
+
+    """
+    global _active_profile
+    _active_profile = Profile(memory=memory) if enabled else None
+    return _active_profile
+
+
+def get_profile() -> Profile | None:
+    """Return the active profile, or ``None`` when profiling is off."""
+    return _active_profile
+
+
+@contextmanager
+def phase(name: str) -> Generator[None, None, None]:
+    """Charge the time spent in the ``with`` block to phase *name*.
+
+    Yields:
+        Nothing; the block simply runs.
+
+    """
+    profile = _active_profile
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    stack = _open_phases.get()
+    if stack:
+        parent = stack[-1]
+        profile.add(parent[0], started - parent[1], calls=0)
+    frame = [name, started]
+    token = _open_phases.set((*stack, frame))
+    try:
+        yield
+    finally:
+        ended = time.perf_counter()
+        _open_phases.reset(token)
+        profile.add(name, ended - frame[1])
+        if stack:
+            stack[-1][1] = ended
+
+
+def timed_chunks(chunks: Iterable[bytes], name: str = "network") -> Iterator[bytes]:
+    """Yield *chunks*, charging the time spent waiting for each to *name*.
+
+    Yields:
+        The chunks of *chunks*, unchanged.
+
+    """
+    iterator = iter(chunks)
+    while True:
+        with phase(name):
+            chunk = next(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
@@ -0,0 +1,285 @@
+"""Client-side token-bucket rate limiting.
+
+Every renderer request passes through :func:`throttle` (see
+:func:`utils.call_with_retry`) before it is sent. Once a limiter has been
+activated with :func:`configure_rate_limit`, requests are paced to stay within
+an account-wide budget and optional per-endpoint budgets instead of relying on
+``429`` responses and back-off.
+
+Buckets live in memory by default and are shared by all threads of the
+process. With a ``state_path`` they are kept in a small SQLite database
+instead, so that several CLI processes on one host draw from the same budget.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+
+from cloudflare_browser_render.config import get_account_id
+
+
+class TokenBucket:
+    """Thread-safe in-memory token bucket.
+
+    Tokens refill continuously at *rate* per second up to *burst*. Callers
+    reserve a token up front and then wait until it becomes available, so
+    concurrent callers are served in reservation order.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        """Create a bucket refilling at *rate* tokens/s with capacity *burst*.
+
+        Raises:
+            ValueError: If *rate* or *burst* is not positive.
+
+        """
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate and burst must be positive")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token, possibly on credit.
+
+        Returns:
+            Seconds the caller must wait before the token may be used.
+
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> float:
+        """Block until a token is available.
+
+        Returns:
+            The number of seconds spent waiting.
+
+        """
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class SQLiteTokenBucket:
+    """Token bucket whose state is shared between processes via SQLite.
+
+    Each reservation runs in an ``IMMEDIATE`` transaction, which serialises
+    concurrent writers across processes on the same host.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike[str], key: str, rate: float, burst: float = 1.0
+    ) -> None:
+        """Create (or attach to) the bucket *key* stored in database *path*.
+
+        Raises:
+            ValueError: If *rate* or *burst* is not positive.
+
+        """
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate and burst must be positive")
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.fspath(path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def reserve(self) -> float:
+        """Take one token, possibly on credit.
+
+        Returns:
+            Seconds the caller must wait before the token may be used.
+
+        """
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Wall-clock time: monotonic clocks are not comparable across
+                # processes.
+                now = time.time()
+                row = conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (self.key,)
+                ).fetchone()
+                tokens = self.burst
+                if row is not None:
+                    tokens = min(self.burst, row[0] + (now - row[1]) * self.rate)
+                tokens -= 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) "
+                    "VALUES (?, ?, ?)",
+                    (self.key, tokens, now),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return max(0.0, -tokens / self.rate)
+
+    def acquire(self) -> float:
+        """Block until a token is available.
+
+        Returns:
+            The number of seconds spent waiting.
+
+        """
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """Account-wide and per-endpoint token buckets combined.
+
+    Rates are given in requests per minute, matching how Cloudflare documents
+    Browser Rendering limits.
+    """
+
+    def __init__(
+        self,
+        per_minute: float | None = None,
+        *,
+        endpoint_limits: Mapping[str, float] | None = None,
+        burst: float = 1.0,
+        state_path: str | os.PathLike[str] | None = None,
+    ) -> None:
+        """Create a limiter.
+
+        Args:
+            per_minute: Account-wide request budget, or ``None`` for no
+                account-wide limit.
+            endpoint_limits: Per-endpoint budgets in requests per minute,
+                applied in addition to the account-wide budget.
+            burst: Number of requests that may be sent back-to-back after an
+                idle period.
+            state_path: SQLite database shared by all processes on the host.
+                In-memory buckets are used when omitted.
+
+        """
+        self.per_minute = per_minute
+        self.endpoint_limits = dict(endpoint_limits or {})
+        self.burst = burst
+        self.state_path = state_path
+        self._buckets: dict[str, TokenBucket | SQLiteTokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: str, per_minute: float) -> TokenBucket | SQLiteTokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate = per_minute / 60
+                if self.state_path:
+                    bucket = SQLiteTokenBucket(self.state_path, key, rate, self.burst)
+                else:
+                    bucket = TokenBucket(rate, self.burst)
+                self._buckets[key] = bucket
+            return bucket
+
+    def reserve(self, endpoint: str | None = None) -> float:
+        """Reserve a request slot for *endpoint* in every applicable bucket.
+
+        Returns:
+            Seconds to wait before the request may be sent.
+
+        """
+        account = get_account_id()
+        wait = 0.0
+        if self.per_minute:
+            wait = self._bucket(account, self.per_minute).reserve()
+        endpoint_limit = self.endpoint_limits.get(endpoint or "")
+        if endpoint_limit:
+            bucket = self._bucket(f"{account}:{endpoint}", endpoint_limit)
+            wait = max(wait, bucket.reserve())
+        return wait
+
+
+# ---------------------------------------------------------------------------
+# Process-wide limiter used by call_with_retry
+# ---------------------------------------------------------------------------
+
+_active_limiter: RateLimiter | None = None
+
+
+def configure_rate_limit(
+    per_minute: float | None = None,
+    *,
+    endpoint_limits: Mapping[str, float] | None = None,
+    **options: object,
+) -> RateLimiter | None:
+    """Activate (or, without any limits, deactivate) proactive rate limiting.
+
+    Args:
+        per_minute: Account-wide request budget per minute.
+        endpoint_limits: Per-endpoint budgets per minute.
+        **options: Further keyword arguments for :class:`RateLimiter`.
+
+    Returns:
+        The active limiter, or ``None`` when rate limiting is disabled.
+
+    """
+    global _active_limiter
+    if per_minute or endpoint_limits:
+        _active_limiter = RateLimiter(
+            per_minute, endpoint_limits=endpoint_limits, **options
+        )
+    else:
+        _active_limiter = None
+    return _active_limiter
+
+
+def get_rate_limiter() -> RateLimiter | None:
+    """Return the active limiter, or ``None`` when rate limiting is disabled."""
+    return _active_limiter
+
+
+def throttle(endpoint: str | None = None) -> float:
+    """Block until the active limiter admits a request to *endpoint*.
+
+    Returns:
+        Seconds spent waiting (``0.0`` when rate limiting is disabled).
+
+    """
+    limiter = _active_limiter
+    if limiter is None:
+        return 0.0
+    wait = limiter.reserve(endpoint)
+    if wait:
+        time.sleep(wait)
+    return wait
+
+
+async def throttle_async(endpoint: str | None = None) -> float:
+    """Asynchronous counterpart of :func:`throttle`.
+
+    Returns:
+        Seconds spent waiting (``0.0`` when rate limiting is disabled).
+
+    """
+    limiter = _active_limiter
+    if limiter is None:
+        return 0.0
+    wait = limiter.reserve(endpoint)
+    if wait:
+        import asyncio
+
+        await asyncio.sleep(wait)
+    return wait
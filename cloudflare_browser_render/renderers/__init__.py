@@ -1,15 +1,45 @@
-"""Renderer modules mapping."""
+"""Renderer modules mapping.
 
-from cloudflare_browser_render.renderers.content import render_content
-from cloudflare_browser_render.renderers.json import render_json
-from cloudflare_browser_render.renderers.links import render_links
-from cloudflare_browser_render.renderers.markdown import render_markdown
-from cloudflare_browser_render.renderers.pdf import render_pdf
-from cloudflare_browser_render.renderers.scrape import render_scrape
-from cloudflare_browser_render.renderers.screenshot import render_screenshot
-from cloudflare_browser_render.renderers.snapshot import render_snapshot
+The individual renderer modules are imported on first access (PEP 562), so
+importing this package stays cheap for code paths that never render.
+"""
+
+import importlib
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from cloudflare_browser_render.renderers.content import render_content
+    from cloudflare_browser_render.renderers.json import render_json
+    from cloudflare_browser_render.renderers.links import render_links
+    from cloudflare_browser_render.renderers.markdown import render_markdown
+    from cloudflare_browser_render.renderers.pdf import render_pdf
+    from cloudflare_browser_render.renderers.scrape import render_scrape
+    from cloudflare_browser_render.renderers.screenshot import render_screenshot
+    from cloudflare_browser_render.renderers.snapshot import render_snapshot
+
+# Endpoint names in the order they are presented to users.
+ENDPOINTS: tuple[str, ...] = (
+    "content",
+    "screenshot",
+    "pdf",
+    "snapshot",
+    "scrape",
+    "json",
+    "links",
+    "markdown",
+)
+
+# Endpoints returning binary bodies that can be streamed straight to disk.
+STREAMING_ENDPOINTS: tuple[str, ...] = ("screenshot", "pdf")
 
 __all__ = [
+    "ENDPOINTS",
+    "STREAMING_ENDPOINTS",
+    "get_async_renderer",
+    "get_renderer",
+    "get_streamer",
     "render_content",
     "render_screenshot",
     "render_pdf",
@@ -19,3 +49,102 @@ __all__ = [
     "render_links",
     "render_markdown",
 ]
+
+
+def _renderer_module(endpoint: str) -> Any:
+    """Import and return the module implementing *endpoint*.
+
+    Returns:
+        The ``cloudflare_browser_render.renderers.<endpoint>`` module.
+
+    Raises:
+        ValueError: If *endpoint* is not a known Browser Rendering endpoint.
+
+    """
+    if endpoint not in ENDPOINTS:
+        raise ValueError(f"Unknown endpoint: {endpoint!r}")
+    return importlib.import_module(f"cloudflare_browser_render.renderers.{endpoint}")
+
+
+def _renderer_name(endpoint: str, lazy: bool) -> str:
+    """Return the name of the renderer function for *endpoint*.
+
+    Returns:
+        ``render_<endpoint>``, or ``render_<endpoint>_lazy`` for a *lazy*
+        text or JSON renderer.
+
+    """
+    if lazy and endpoint not in STREAMING_ENDPOINTS:
+        return f"render_{endpoint}_lazy"
+    return f"render_{endpoint}"
+
+
+def get_renderer(endpoint: str, *, lazy: bool = False) -> Callable[..., Any]:
+    """Return the ``render_<endpoint>`` function for *endpoint*.
+
+    The function is looked up on its module at call time, so patched
+    renderers (e.g. in tests) are honoured.
+
+    Args:
+        endpoint: Name of the Browser Rendering endpoint.
+        lazy: Return the ``render_<endpoint>_lazy`` variant of a text or
+            JSON renderer instead, which returns the response body as a
+            :class:`~cloudflare_browser_render.result.RenderResult`. Binary
+            renderers return ``bytes`` either way.
+
+    Returns:
+        The renderer callable for *endpoint*.
+
+    """
+    return getattr(_renderer_module(endpoint), _renderer_name(endpoint, lazy))
+
+
+def get_async_renderer(
+    endpoint: str, *, lazy: bool = False
+) -> Callable[..., Awaitable[Any]]:
+    """Return the ``render_<endpoint>_async`` coroutine function for *endpoint*.
+
+    Args:
+        endpoint: Name of the Browser Rendering endpoint.
+        lazy: Return the lazy variant, as for :func:`get_renderer`.
+
+    Returns:
+        The asynchronous renderer for *endpoint*.
+
+    """
+    name = _renderer_name(endpoint, lazy)
+    return getattr(_renderer_module(endpoint), f"{name}_async")
+
+
+def get_streamer(endpoint: str) -> Callable[[str, str], Path | None]:
+    """Return the ``stream_<endpoint>`` function for a binary *endpoint*.
+
+    Streamers take ``(url, filename)`` and write the response body to
+    *filename* chunk by chunk instead of returning it.
+
+    Returns:
+        The streaming renderer for *endpoint*.
+
+    Raises:
+        ValueError: If *endpoint* does not return a streamable body.
+
+    """
+    if endpoint not in STREAMING_ENDPOINTS:
+        raise ValueError(f"Endpoint {endpoint!r} does not support streaming")
+    return getattr(_renderer_module(endpoint), f"stream_{endpoint}")
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve ``render_<endpoint>`` attributes lazily.
+
+    Returns:
+        The requested renderer function.
+
+    Raises:
+        AttributeError: If *name* is not a renderer exported by this package.
+
+    """
+    endpoint = name.removeprefix("render_")
+    if name.startswith("render_") and endpoint in ENDPOINTS:
+        return get_renderer(endpoint)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,24 +1,72 @@
 """Content endpoint renderer."""
 
-from cloudflare_browser_render.client import get_client
+from cloudflare_browser_render.cache import cached_render, cached_render_async
+from cloudflare_browser_render.client import get_async_client, get_client
 from cloudflare_browser_render.config import get_account_id
-from cloudflare_browser_render.utils import call_with_retry
+from cloudflare_browser_render.result import TEXT, RenderResult
+from cloudflare_browser_render.utils import call_with_retry, call_with_retry_async
 
-_cf = get_client()
-_account_id = get_account_id()
+
+def render_content_lazy(url: str) -> RenderResult:
+    """Return the raw text content of *url*.
+
+    Returns:
+        The raw text content of the webpage, as a :class:`RenderResult`
+        decoded on demand.
+
+    """
+
+    def _fetch() -> RenderResult:
+        cf = get_client()
+        raw = call_with_retry(
+            lambda: cf.browser_rendering.content.with_raw_response.create(
+                account_id=get_account_id(), url=url
+            ),
+            endpoint="content",
+        )
+        return RenderResult(raw.read(), TEXT)
+
+    return cached_render("content", url, None, _fetch)
+
+
+async def render_content_lazy_async(url: str) -> RenderResult:
+    """Asynchronously return the raw text content of *url*.
+
+    Returns:
+        Same as :func:`render_content_lazy`.
+
+    """
+
+    async def _fetch() -> RenderResult:
+        acf = get_async_client()
+        raw = await call_with_retry_async(
+            lambda: acf.browser_rendering.content.with_raw_response.create(
+                account_id=get_account_id(), url=url
+            ),
+            endpoint="content",
+        )
+        return RenderResult(await raw.read(), TEXT)
+
+    return await cached_render_async("content", url, None, _fetch)
 
 
 def render_content(url: str) -> str:
     """Return the raw text content of *url*.
 
+    :func:`render_content_lazy` returns the body without decoding it.
+
     Returns:
         The raw text content of the webpage.
 
     """
-    raw = call_with_retry(
-        lambda: _cf.browser_rendering.content.with_raw_response.create(
-            account_id=_account_id, url=url
-        )
-    )
-    # SDK returns an httpx.Response; use .text() to get decoded body
-    return raw.text()
+    return render_content_lazy(url).text()
+
+
+async def render_content_async(url: str) -> str:
+    """Asynchronously return the raw text content of *url*.
+
+    Returns:
+        Same as :func:`render_content`.
+
+    """
+    return (await render_content_lazy_async(url)).text()
@@ -1,32 +1,84 @@
 """JSON endpoint renderer."""
 
-from cloudflare_browser_render.client import get_client
+from cloudflare_browser_render.cache import cached_render, cached_render_async
+from cloudflare_browser_render.client import get_async_client, get_client
 from cloudflare_browser_render.config import get_account_id
-from cloudflare_browser_render.utils import call_with_retry
+from cloudflare_browser_render.result import JSON, RenderResult
+from cloudflare_browser_render.utils import call_with_retry, call_with_retry_async
 
-_cf = get_client()
-_account_id = get_account_id()
+# The JSON endpoint requires either a `prompt` or a `response_format`.
+# We use an extremely permissive JSON schema as a sensible default so
+# that users can still fetch structured data without having to supply
+# extra arguments.
+_DEFAULT_SCHEMA = {"type": "json_schema", "json_schema": {"type": "object"}}
 
 
-def render_json(url: str) -> dict:
+def render_json_lazy(url: str) -> RenderResult:
     """Render *url* into structured JSON data.
 
     Returns:
-        Structured JSON data extracted from the webpage.
+        Structured JSON data extracted from the webpage, as a
+        :class:`RenderResult` parsed on demand.
 
     """
-    # The JSON endpoint requires either a `prompt` or a `response_format`.
-    # We use an extremely permissive JSON schema as a sensible default so
-    # that users can still fetch structured data without having to supply
-    # extra arguments.
-
-    default_schema = {"type": "json_schema", "json_schema": {"type": "object"}}
-
-    raw = call_with_retry(
-        lambda: _cf.browser_rendering.json.with_raw_response.create(
-            account_id=_account_id,
-            url=url,
-            response_format=default_schema,
+
+    def _fetch() -> RenderResult:
+        cf = get_client()
+        raw = call_with_retry(
+            lambda: cf.browser_rendering.json.with_raw_response.create(
+                account_id=get_account_id(),
+                url=url,
+                response_format=_DEFAULT_SCHEMA,
+            ),
+            endpoint="json",
         )
+        return RenderResult(raw.read(), JSON)
+
+    return cached_render("json", url, {"response_format": _DEFAULT_SCHEMA}, _fetch)
+
+
+async def render_json_lazy_async(url: str) -> RenderResult:
+    """Asynchronously render *url* into structured JSON data.
+
+    Returns:
+        Same as :func:`render_json_lazy`.
+
+    """
+
+    async def _fetch() -> RenderResult:
+        acf = get_async_client()
+        raw = await call_with_retry_async(
+            lambda: acf.browser_rendering.json.with_raw_response.create(
+                account_id=get_account_id(),
+                url=url,
+                response_format=_DEFAULT_SCHEMA,
+            ),
+            endpoint="json",
+        )
+        return RenderResult(await raw.read(), JSON)
+
+    return await cached_render_async(
+        "json", url, {"response_format": _DEFAULT_SCHEMA}, _fetch
     )
-    return raw.json()
+
+
+def render_json(url: str) -> dict:
+    """Render *url* into structured JSON data.
+
+    :func:`render_json_lazy` returns the body without decoding it.
+
+    Returns:
+        Structured JSON data extracted from the webpage.
+
+    """
+    return render_json_lazy(url).json()
+
+
+async def render_json_async(url: str) -> dict:
+    """Asynchronously render *url* into structured JSON data.
+
+    Returns:
+        Same as :func:`render_json`.
+
+    """
+    return (await render_json_lazy_async(url)).json()
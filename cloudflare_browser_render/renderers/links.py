@@ -1,23 +1,85 @@
 """Links endpoint renderer."""
 
-from cloudflare_browser_render.client import get_client
+from cloudflare_browser_render.cache import cached_render, cached_render_async
+from cloudflare_browser_render.client import get_async_client, get_client
 from cloudflare_browser_render.config import get_account_id
-from cloudflare_browser_render.utils import call_with_retry
+from cloudflare_browser_render.extract import (
+    extract_links,
+    fetch_html,
+    fetch_html_async,
+    local_extract_enabled,
+)
+from cloudflare_browser_render.result import JSON, RenderResult
+from cloudflare_browser_render.utils import call_with_retry, call_with_retry_async
 
-_cf = get_client()
-_account_id = get_account_id()
+
+def render_links_lazy(url: str) -> RenderResult:
+    """Return all links extracted from *url*.
+
+    With local extraction enabled, the links are parsed from the page's
+    ``content`` HTML instead of being rendered remotely.
+
+    Returns:
+        The links found on the webpage, as a :class:`RenderResult` parsed
+        on demand.
+
+    """
+    if local_extract_enabled():
+        return RenderResult.of(extract_links(fetch_html(url), url))
+
+    def _fetch() -> RenderResult:
+        cf = get_client()
+        raw = call_with_retry(
+            lambda: cf.browser_rendering.links.with_raw_response.create(
+                account_id=get_account_id(), url=url
+            ),
+            endpoint="links",
+        )
+        return RenderResult(raw.read(), JSON)
+
+    return cached_render("links", url, None, _fetch)
+
+
+async def render_links_lazy_async(url: str) -> RenderResult:
+    """Asynchronously return all links extracted from *url*.
+
+    Returns:
+        Same as :func:`render_links_lazy`.
+
+    """
+    if local_extract_enabled():
+        return RenderResult.of(extract_links(await fetch_html_async(url), url))
+
+    async def _fetch() -> RenderResult:
+        acf = get_async_client()
+        raw = await call_with_retry_async(
+            lambda: acf.browser_rendering.links.with_raw_response.create(
+                account_id=get_account_id(), url=url
+            ),
+            endpoint="links",
+        )
+        return RenderResult(await raw.read(), JSON)
+
+    return await cached_render_async("links", url, None, _fetch)
 
 
 def render_links(url: str) -> dict:
     """Return all links extracted from *url*.
 
+    :func:`render_links_lazy` returns the body without decoding it.
+
     Returns:
         Dictionary containing all links found on the webpage.
 
     """
-    raw = call_with_retry(
-        lambda: _cf.browser_rendering.links.with_raw_response.create(
-            account_id=_account_id, url=url
-        )
-    )
-    return raw.json()
+    return render_links_lazy(url).json()
+
+
+async def render_links_async(url: str) -> dict:
+    """Asynchronously return all links extracted from *url*.
+
+    Returns:
+        Same as :func:`render_links`.
+
+    """
+    return (await render_links_lazy_async(url)).json()
@@ -1,23 +1,91 @@
 """Markdown endpoint renderer."""
 
-from cloudflare_browser_render.client import get_client
+import json
+
+from cloudflare_browser_render.cache import cached_render, cached_render_async
+from cloudflare_browser_render.client import get_async_client, get_client
 from cloudflare_browser_render.config import get_account_id
-from cloudflare_browser_render.utils import call_with_retry
+from cloudflare_browser_render.extract import (
+    extract_markdown,
+    fetch_html,
+    fetch_html_async,
+    local_extract_enabled,
+)
+from cloudflare_browser_render.result import TEXT, RenderResult
+from cloudflare_browser_render.utils import call_with_retry, call_with_retry_async
+
+
+def render_markdown_lazy(url: str) -> RenderResult:
+    """Convert *url* content to Markdown text.
+
+    With local extraction enabled, the page's ``content`` HTML is converted
+    in-process instead of being rendered remotely, and wrapped in the same
+    JSON envelope as the endpoint's response.
+
+    Returns:
+        The webpage content converted to Markdown format, as a
+        :class:`RenderResult` decoded on demand.
+
+    """
+    if local_extract_enabled():
+        # Serialised like the endpoint's text body, so callers see one shape.
+        envelope = extract_markdown(fetch_html(url), url)
+        return RenderResult.of(json.dumps(envelope, ensure_ascii=False))
+
+    def _fetch() -> RenderResult:
+        cf = get_client()
+        raw = call_with_retry(
+            lambda: cf.browser_rendering.markdown.with_raw_response.create(
+                account_id=get_account_id(), url=url
+            ),
+            endpoint="markdown",
+        )
+        return RenderResult(raw.read(), TEXT)
+
+    return cached_render("markdown", url, None, _fetch)
+
+
+async def render_markdown_lazy_async(url: str) -> RenderResult:
+    """Asynchronously return the Markdown conversion of *url*.
 
-_cf = get_client()
-_account_id = get_account_id()
+    Returns:
+        Same as :func:`render_markdown_lazy`.
+
+    """
+    if local_extract_enabled():
+        envelope = extract_markdown(await fetch_html_async(url), url)
+        return RenderResult.of(json.dumps(envelope, ensure_ascii=False))
+
+    async def _fetch() -> RenderResult:
+        acf = get_async_client()
+        raw = await call_with_retry_async(
+            lambda: acf.browser_rendering.markdown.with_raw_response.create(
+                account_id=get_account_id(), url=url
+            ),
+            endpoint="markdown",
+        )
+        return RenderResult(await raw.read(), TEXT)
+
+    return await cached_render_async("markdown", url, None, _fetch)
 
 
 def render_markdown(url: str) -> str:
     """Convert *url* content to Markdown text.
 
+    :func:`render_markdown_lazy` returns the body without decoding it.
+
     Returns:
         The webpage content converted to Markdown format.
 
     """
-    raw = call_with_retry(
-        lambda: _cf.browser_rendering.markdown.with_raw_response.create(
-            account_id=_account_id, url=url
-        )
-    )
-    return raw.text()
+    return render_markdown_lazy(url).text()
+
+
+async def render_markdown_async(url: str) -> str:
+    """Asynchronously return the Markdown conversion of *url*.
+
+    Returns:
+        Same as :func:`render_markdown`.
+
+    """
+    return (await render_markdown_lazy_async(url)).text()
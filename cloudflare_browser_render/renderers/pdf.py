@@ -1,11 +1,22 @@
 """PDF endpoint renderer."""
 
-from cloudflare_browser_render.client import get_client
-from cloudflare_browser_render.config import get_account_id
-from cloudflare_browser_render.utils import call_with_retry
+from collections.abc import Iterator
+from contextlib import ExitStack
+from pathlib import Path
 
-_cf = get_client()
-_account_id = get_account_id()
+from cloudflare_browser_render.cache import (
+    cached_render,
+    cached_render_async,
+    cached_stream,
+)
+from cloudflare_browser_render.client import get_async_client, get_client
+from cloudflare_browser_render.config import get_account_id
+from cloudflare_browser_render.profiling import timed_chunks
+from cloudflare_browser_render.utils import (
+    STREAM_CHUNK_SIZE,
+    call_with_retry,
+    call_with_retry_async,
+)
 
 
 def render_pdf(url: str) -> bytes:
@@ -15,9 +26,62 @@ def render_pdf(url: str) -> bytes:
         The PDF document as raw bytes.
 
     """
-    raw = call_with_retry(
-        lambda: _cf.browser_rendering.pdf.with_raw_response.create(
-            account_id=_account_id, url=url
+
+    def _fetch() -> bytes:
+        cf = get_client()
+        raw = call_with_retry(
+            lambda: cf.browser_rendering.pdf.with_raw_response.create(
+                account_id=get_account_id(), url=url
+            ),
+            endpoint="pdf",
+        )
+        return raw.read()
+
+    return cached_render("pdf", url, None, _fetch)
+
+
+async def render_pdf_async(url: str) -> bytes:
+    """Asynchronously return the PDF bytes generated from *url*.
+
+    Returns:
+        Same as :func:`render_pdf`.
+
+    """
+
+    async def _fetch() -> bytes:
+        acf = get_async_client()
+        raw = await call_with_retry_async(
+            lambda: acf.browser_rendering.pdf.with_raw_response.create(
+                account_id=get_account_id(), url=url
+            ),
+            endpoint="pdf",
         )
-    )
-    return raw.read()
+        return await raw.read()
+
+    return await cached_render_async("pdf", url, None, _fetch)
+
+
+def stream_pdf(url: str, filename: str) -> Path | None:
+    """Write the PDF document of *url* to *filename* without buffering it.
+
+    The response body is copied to disk in ``STREAM_CHUNK_SIZE`` chunks as it
+    arrives. A *filename* of ``-`` streams to stdout.
+
+    Returns:
+        The Path of the written file, or ``None`` when writing to stdout.
+
+    """
+
+    def _open(stack: ExitStack) -> Iterator[bytes]:
+        cf = get_client()
+        response = call_with_retry(
+            lambda: stack.enter_context(
+                cf.browser_rendering.pdf.with_streaming_response.create(
+                    account_id=get_account_id(), url=url
+                )
+            ),
+            endpoint="pdf",
+        )
+        return timed_chunks(response.iter_bytes(STREAM_CHUNK_SIZE))
+
+    return cached_stream("pdf", url, None, _open, filename)
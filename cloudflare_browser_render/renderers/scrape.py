@@ -1,31 +1,224 @@
-"""Scrape endpoint renderer."""
+"""Scrape endpoint renderer.
 
-from cloudflare_browser_render.client import get_client
-from cloudflare_browser_render.config import get_account_id
-from cloudflare_browser_render.utils import call_with_retry
+Several selectors can be scraped with one browser render by passing named
+*fields*; the response is then split back into one entry per field name.
+"""
+
+from collections.abc import Mapping
+from typing import Any
 
-_cf = get_client()
-_account_id = get_account_id()
+from cloudflare_browser_render.cache import cached_render, cached_render_async
+from cloudflare_browser_render.client import get_async_client, get_client
+from cloudflare_browser_render.config import get_account_id
+from cloudflare_browser_render.extract import (
+    extract_elements,
+    fetch_html,
+    fetch_html_async,
+    local_extract_enabled,
+)
+from cloudflare_browser_render.result import JSON, RenderResult
+from cloudflare_browser_render.utils import call_with_retry, call_with_retry_async
 
+# A field is either a bare CSS selector or ``{"selector": ..., "expression": ...}``.
+FieldSpec = str | Mapping[str, str]
 
-def render_scrape(url: str, selector: str, expression: str | None = None) -> dict:
-    """Scrape elements matching *selector* from *url*.
 
-    Optionally, run a Javascript *expression* on the matched elements.
+def _element(selector: str, expression: str | None) -> dict[str, str]:
+    """Build the `elements` entry sent to the scrape endpoint.
 
     Returns:
-        Dictionary containing the scraped elements.
+        The element specification for *selector* (and *expression*).
 
     """
     element = {"selector": selector}
     if expression:
         element["expression"] = expression
+    return element
+
+
+def _field_element(name: str, spec: FieldSpec) -> dict[str, str]:
+    """Build the `elements` entry for the named field *name*.
+
+    Returns:
+        The element specification described by *spec*.
+
+    Raises:
+        ValueError: If *spec* does not name a selector.
+
+    """
+    if isinstance(spec, str):
+        return _element(spec, None)
+    selector = spec.get("selector")
+    if not selector:
+        raise ValueError(f"scrape field {name!r} has no selector")
+    return _element(selector, spec.get("expression"))
+
+
+def _elements(
+    selector: str | None,
+    expression: str | None,
+    fields: Mapping[str, FieldSpec] | None,
+) -> list[dict[str, str]]:
+    """Return the `elements` payload for a single selector or named fields.
+
+    Returns:
+        One element per selector, in field order.
+
+    Raises:
+        ValueError: Unless exactly one of *selector* and *fields* is given.
+
+    """
+    if (selector is None) == (not fields):
+        raise ValueError("pass either a selector or a non-empty fields mapping")
+    if fields:
+        return [_field_element(name, spec) for name, spec in fields.items()]
+    return [_element(selector, expression)]
+
+
+def _extract_locally(elements: list[dict[str, str]]) -> bool:
+    """Whether *elements* can be matched locally instead of rendered remotely.
+
+    Returns:
+        ``True`` if local extraction is on and no element needs Javascript.
+
+    """
+    return local_extract_enabled() and not any(e.get("expression") for e in elements)
+
+
+def demux_fields(names: list[str], response: Any) -> dict[str, Any]:
+    """Split a multi-selector scrape response into named fields.
+
+    The endpoint answers with one entry per requested element, in request
+    order, each holding the element's ``selector`` and its ``results``.
+
+    Args:
+        names: Field names, in the order their elements were sent.
+        response: The scrape response, with or without the API envelope.
+
+    Returns:
+        A mapping of field name to that field's ``results`` list.
+
+    """
+    entries = response.get("result", []) if isinstance(response, dict) else response
+    return {
+        name: entry.get("results", entry) if isinstance(entry, dict) else entry
+        for name, entry in zip(names, entries or [], strict=False)
+    }
 
-    raw = call_with_retry(
-        lambda: _cf.browser_rendering.scrape.with_raw_response.create(
-            account_id=_account_id,
-            elements=[element],
-            url=url,
+
+def render_scrape_lazy(
+    url: str,
+    selector: str | None = None,
+    expression: str | None = None,
+    *,
+    fields: Mapping[str, FieldSpec] | None = None,
+) -> RenderResult:
+    """Scrape elements matching *selector* (or each of *fields*) from *url*.
+
+    Optionally, run a Javascript *expression* on the matched elements. With
+    *fields*, every selector is scraped in the same request and the result
+    is keyed by field name, e.g. ``fields={"title": "h1", "canonical":
+    {"selector": "link[rel=canonical]"}}``.
+
+    With local extraction enabled, selectors without an *expression* are
+    matched against the page's ``content`` HTML instead.
+
+    Returns:
+        The scraped elements, or the per-field results when *fields* is
+        given, as a :class:`RenderResult` parsed on demand.
+
+    """
+    elements = _elements(selector, expression, fields)
+    if _extract_locally(elements):
+        result = extract_elements(fetch_html(url), elements)
+        return RenderResult.of(demux_fields(list(fields), result) if fields else result)
+
+    def _fetch() -> RenderResult:
+        cf = get_client()
+        raw = call_with_retry(
+            lambda: cf.browser_rendering.scrape.with_raw_response.create(
+                account_id=get_account_id(),
+                elements=elements,
+                url=url,
+            ),
+            endpoint="scrape",
         )
-    )
-    return raw.json()
+        return RenderResult(raw.read(), JSON)
+
+    result = cached_render("scrape", url, {"elements": elements}, _fetch)
+    if fields:
+        return RenderResult.of(demux_fields(list(fields), result.json()))
+    return result
+
+
+async def render_scrape_lazy_async(
+    url: str,
+    selector: str | None = None,
+    expression: str | None = None,
+    *,
+    fields: Mapping[str, FieldSpec] | None = None,
+) -> RenderResult:
+    """Asynchronously scrape elements matching *selector* from *url*.
+
+    Returns:
+        Same as :func:`render_scrape_lazy`.
+
+    """
+    elements = _elements(selector, expression, fields)
+    if _extract_locally(elements):
+        result = extract_elements(await fetch_html_async(url), elements)
+        return RenderResult.of(demux_fields(list(fields), result) if fields else result)
+
+    async def _fetch() -> RenderResult:
+        acf = get_async_client()
+        raw = await call_with_retry_async(
+            lambda: acf.browser_rendering.scrape.with_raw_response.create(
+                account_id=get_account_id(),
+                elements=elements,
+                url=url,
+            ),
+            endpoint="scrape",
+        )
+        return RenderResult(await raw.read(), JSON)
+
+    result = await cached_render_async("scrape", url, {"elements": elements}, _fetch)
+    if fields:
+        return RenderResult.of(demux_fields(list(fields), result.json()))
+    return result
+
+
+def render_scrape(
+    url: str,
+    selector: str | None = None,
+    expression: str | None = None,
+    *,
+    fields: Mapping[str, FieldSpec] | None = None,
+) -> dict:
+    """Scrape elements matching *selector* (or each of *fields*) from *url*.
+
+    Takes the same arguments as :func:`render_scrape_lazy`, which returns
+    the body without parsing it.
+
+    Returns:
+        Dictionary containing the scraped elements, or the per-field results
+        when *fields* is given.
+
+    """
+    return render_scrape_lazy(url, selector, expression, fields=fields).json()
+
+
+async def render_scrape_async(
+    url: str,
+    selector: str | None = None,
+    expression: str | None = None,
+    *,
+    fields: Mapping[str, FieldSpec] | None = None,
+) -> dict:
+    """Asynchronously scrape elements matching *selector* from *url*.
+
+    Returns:
+        Same as :func:`render_scrape`.
+
+    """
+    result = await render_scrape_lazy_async(url, selector, expression, fields=fields)
+    return result.json()
@@ -1,23 +1,71 @@
 """Snapshot endpoint renderer."""
 
-from cloudflare_browser_render.client import get_client
+from cloudflare_browser_render.cache import cached_render, cached_render_async
+from cloudflare_browser_render.client import get_async_client, get_client
 from cloudflare_browser_render.config import get_account_id
-from cloudflare_browser_render.utils import call_with_retry
+from cloudflare_browser_render.result import JSON, RenderResult
+from cloudflare_browser_render.utils import call_with_retry, call_with_retry_async
 
-_cf = get_client()
-_account_id = get_account_id()
+
+def render_snapshot_lazy(url: str) -> RenderResult:
+    """Create a durable snapshot of *url* and return metadata.
+
+    Returns:
+        The snapshot metadata, as a :class:`RenderResult` parsed on demand.
+
+    """
+
+    def _fetch() -> RenderResult:
+        cf = get_client()
+        raw = call_with_retry(
+            lambda: cf.browser_rendering.snapshot.with_raw_response.create(
+                account_id=get_account_id(), url=url
+            ),
+            endpoint="snapshot",
+        )
+        return RenderResult(raw.read(), JSON)
+
+    return cached_render("snapshot", url, None, _fetch)
+
+
+async def render_snapshot_lazy_async(url: str) -> RenderResult:
+    """Asynchronously return the snapshot metadata for *url*.
+
+    Returns:
+        Same as :func:`render_snapshot_lazy`.
+
+    """
+
+    async def _fetch() -> RenderResult:
+        acf = get_async_client()
+        raw = await call_with_retry_async(
+            lambda: acf.browser_rendering.snapshot.with_raw_response.create(
+                account_id=get_account_id(), url=url
+            ),
+            endpoint="snapshot",
+        )
+        return RenderResult(await raw.read(), JSON)
+
+    return await cached_render_async("snapshot", url, None, _fetch)
 
 
 def render_snapshot(url: str) -> dict:
     """Create a durable snapshot of *url* and return metadata.
 
+    :func:`render_snapshot_lazy` returns the body without decoding it.
+
     Returns:
         Dictionary containing snapshot metadata.
 
     """
-    raw = call_with_retry(
-        lambda: _cf.browser_rendering.snapshot.with_raw_response.create(
-            account_id=_account_id, url=url
-        )
-    )
-    return raw.json()
+    return render_snapshot_lazy(url).json()
+
+
+async def render_snapshot_async(url: str) -> dict:
+    """Asynchronously return the snapshot metadata for *url*.
+
+    Returns:
+        Same as :func:`render_snapshot`.
+
+    """
+    return (await render_snapshot_lazy_async(url)).json()
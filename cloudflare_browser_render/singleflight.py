@@ -0,0 +1,112 @@
+"""Request coalescing: run concurrent identical calls only once.
+
+:class:`SingleFlight` lets the first caller for a key (the *leader*) run the
+work while later callers with the same key wait and receive the leader's
+result, or its exception. A key is only "in flight" while the leader is
+running. Once the call finishes the key is forgotten, so this is not a
+cache: it merely ensures that ten simultaneous requests for the same page
+cost one render.
+
+:meth:`SingleFlight.do` coalesces threads and :meth:`SingleFlight.do_async`
+coalesces coroutines running on the same event loop. The two are kept apart
+because a thread cannot await a coroutine's result, and vice versa.
+"""
+
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    import asyncio
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    """One in-flight call and the outcome its followers wait for."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: T | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight(Generic[T]):
+    """Coalescing of concurrent calls that share a key, for threads and asyncio."""
+
+    def __init__(self) -> None:
+        """Create a group with nothing in flight."""
+        self._calls: dict[Hashable, _Call[T]] = {}
+        self._tasks: dict[tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> tuple[T, bool]:
+        """Return ``func()``, sharing one execution among concurrent callers.
+
+        If the leader's *func* raises, the same exception is raised in every
+        caller that waited for it.
+
+        Returns:
+            The result and whether it was shared from another caller's call.
+
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True  # type: ignore[return-value]
+
+        try:
+            call.value = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    async def do_async(
+        self, key: Hashable, func: Callable[[], Awaitable[T]]
+    ) -> tuple[T, bool]:
+        """Asynchronous counterpart of :meth:`do`.
+
+        The call runs as a task of its own, so cancelling one waiting caller
+        does not cancel the render the others are waiting for.
+
+        Returns:
+            The result and whether it was shared from another caller's call.
+
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._tasks.get((loop, key))
+            shared = task is not None
+            if task is None:
+                task = loop.create_task(func())  # type: ignore[arg-type]
+                self._tasks[loop, key] = task
+                task.add_done_callback(lambda done: self._forget(loop, key, done))
+        return await asyncio.shield(task), shared
+
+    def _forget(
+        self, loop: "asyncio.AbstractEventLoop", key: Hashable, task: "asyncio.Task"
+    ) -> None:
+        with self._lock:
+            if self._tasks.get((loop, key)) is task:
+                del self._tasks[loop, key]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller was cancelled
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls) + len(self._tasks)
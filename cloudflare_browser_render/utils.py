@@ -1,22 +1,171 @@
 """Utility helpers for CLI operations."""
 
+import hashlib
 import json
+import os
+import re
+import sys
+import threading
 import time
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable, Iterable, Iterator
 from pathlib import Path
-from typing import TypeVar
+from typing import TYPE_CHECKING, TypeVar
+from urllib.parse import urlsplit
 
-from rich.console import Console
+from cloudflare_browser_render.concurrency import admit, admit_async
+from cloudflare_browser_render.metrics import get_metrics, response_size
+from cloudflare_browser_render.profiling import phase
+from cloudflare_browser_render.ratelimit import throttle, throttle_async
 
-# Cloudflare SDK error class for rate-limiting
-try:
-    from cloudflare import RateLimitError  # type: ignore
-except ImportError:  # pragma: no cover – fallback for old SDKs
-    RateLimitError = Exception  # type: ignore  # noqa: N816
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from cloudflare_browser_render.metrics import Metrics
 
 T = TypeVar("T")
 
-console = Console()
+# Chunk size used when streaming response bodies to disk or stdout.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Internal singletons – created lazily, as importing Rich is comparatively slow.
+_console: "Console | None" = None
+_err_console: "Console | None" = None
+
+# Set by --raw: write results to stdout unformatted even on a terminal.
+_force_raw = False
+
+
+def get_console(*, stderr: bool = False) -> "Console":
+    """Return the shared Rich console, creating it on first use.
+
+    Results are printed on the stdout console. Status messages, warnings and
+    other diagnostics use the ``stderr=True`` one, so stdout only ever
+    carries the data a command produces and can be piped safely.
+
+    Returns:
+        The stdout console, or the stderr console if *stderr* is set.
+
+    """
+    global _console, _err_console
+    if (_err_console if stderr else _console) is None:
+        with phase("imports"):
+            from rich.console import Console
+
+        if stderr:
+            _err_console = Console(stderr=True)
+        else:
+            _console = Console()
+    return _err_console if stderr else _console  # type: ignore[return-value]
+
+
+def configure_output(raw: bool) -> None:
+    """Force raw result output (``--raw``), even when stdout is a terminal."""
+    global _force_raw
+    _force_raw = raw
+
+
+def raw_output() -> bool:
+    """Return whether results bypass Rich and go straight to stdout as bytes.
+
+    That is the case when ``--raw`` was given or stdout is not a terminal, so
+    piping ``cbr markdown`` into other tools is neither wrapped nor slowed
+    down by markup parsing.
+
+    Returns:
+        ``True`` for raw output, ``False`` for Rich's formatted output.
+
+    """
+    return _force_raw or not sys.stdout.isatty()
+
+
+def write_stdout(data: bytes) -> None:
+    """Write *data* unchanged to the binary stdout and flush it."""
+    out = sys.stdout.buffer
+    with phase("write"):
+        out.write(data)
+        out.flush()
+
+
+def write_line(data: bytes) -> None:
+    """Write *data* to the binary stdout, ending it with a newline if needed."""
+    out = sys.stdout.buffer
+    with phase("write"):
+        out.write(data)
+        if not data.endswith(b"\n"):
+            out.write(b"\n")
+        out.flush()
+
+
+def print_text(text: str) -> None:
+    """Print a text result, raw (see :func:`raw_output`) or through Rich.
+
+    Rich's markup is disabled either way, so ``[brackets]`` in page text are
+    printed as they are.
+    """
+    if raw_output():
+        with phase("serialize"):
+            data = text.encode()
+        write_line(data)
+        return
+    console = get_console()
+    with phase("console"):
+        console.print(text, markup=False)
+
+
+def rate_limit_error() -> type[Exception]:
+    """Return the Cloudflare SDK's rate-limit exception class.
+
+    Imported on demand so that merely importing this module does not pull in
+    the SDK.
+
+    Returns:
+        ``cloudflare.RateLimitError``, or ``Exception`` for old SDKs.
+
+    """
+    try:
+        from cloudflare import RateLimitError  # type: ignore
+    except ImportError:  # pragma: no cover – fallback for old SDKs
+        return Exception
+    return RateLimitError
+
+
+def transient_errors() -> tuple[type[Exception], ...]:
+    """Return the SDK exceptions retried besides rate limits.
+
+    These are connection failures, timeouts and ``5xx`` responses, which the
+    SDK would retry itself if its own retries were not disabled (see
+    :mod:`cloudflare_browser_render.client`).
+
+    Returns:
+        The exception classes, or an empty tuple for old SDKs.
+
+    """
+    try:
+        from cloudflare import APIConnectionError, InternalServerError  # type: ignore
+    except ImportError:  # pragma: no cover – fallback for old SDKs
+        return ()
+    return (APIConnectionError, InternalServerError)
+
+
+def retry_delay(exc: BaseException, default: float) -> float:
+    """Return how long to wait before retrying after *exc*.
+
+    A ``Retry-After-Ms`` or ``Retry-After`` header (in seconds) on the
+    response is honoured when it asks for at most a minute, as the SDK does.
+
+    Returns:
+        The advertised delay, or *default* without a usable header.
+
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 1000), ("retry-after", 1)):
+        try:
+            delay = float(headers[name]) / scale
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 < delay <= 60:
+            return delay
+    return default
 
 
 def save_bytes(data: bytes, filename: str) -> Path:
@@ -27,8 +176,9 @@ def save_bytes(data: bytes, filename: str) -> Path:
 
     """
     path = Path(filename)
-    path.write_bytes(data)
-    console.print(f"[green]Saved file to {path}[/green]")
+    with phase("write"):
+        path.write_bytes(data)
+    get_console(stderr=True).print(f"[green]Saved file to {path}[/green]")
     return path
 
 
@@ -40,14 +190,121 @@ def save_text(data: str, filename: str) -> Path:
 
     """
     path = Path(filename)
-    path.write_text(data)
-    console.print(f"[green]Saved file to {path}[/green]")
+    with phase("write"):
+        path.write_text(data)
+    get_console(stderr=True).print(f"[green]Saved file to {path}[/green]")
+    return path
+
+
+def save_stream(chunks: Iterable[bytes], filename: str) -> Path | None:
+    """Write *chunks* to *filename* without holding the whole body in memory.
+
+    Chunks go to a temporary file next to *filename*, which is atomically
+    renamed into place once the stream is complete, so readers never observe
+    a partially written file. A *filename* of ``-`` streams to stdout instead.
+
+    Returns:
+        The Path of the written file, or ``None`` when writing to stdout.
+
+    """
+    if filename == "-":
+        out = sys.stdout.buffer
+        with phase("write"):
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+        return None
+
+    path = Path(filename)
+    # Unique per process and thread; unlike mkstemp, honours the umask.
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with phase("write"), tmp.open("wb") as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    get_console(stderr=True).print(f"[green]Saved file to {path}[/green]")
     return path
 
 
+def iter_base64(text: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Decode the base64 *text* piece by piece instead of all at once.
+
+    Only one slice of roughly *chunk_size* decoded bytes exists at a time,
+    so a multi-megabyte screenshot is never held twice. Line breaks and other
+    whitespace in *text* are skipped.
+
+    Yields:
+        Successive chunks of the decoded data.
+
+    Raises:
+        ValueError: If *text* is not valid base64.
+
+    """
+    import binascii
+
+    step = max(chunk_size // 3 * 4, 4)
+    pending = ""
+    for start in range(0, len(text), step):
+        piece = pending + "".join(text[start : start + step].split())
+        usable = len(piece) - len(piece) % 4
+        pending = piece[usable:]
+        if usable:
+            try:
+                yield binascii.a2b_base64(piece[:usable], strict_mode=True)
+            except binascii.Error as exc:
+                raise ValueError(f"invalid base64 data: {exc}") from None
+    if pending:
+        raise ValueError("invalid base64 data: truncated input")
+
+
+def iter_encoded(text: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Encode *text* as UTF-8 in slices, for :func:`save_stream`.
+
+    Yields:
+        Successive UTF-8 chunks of *text*.
+
+    """
+    for start in range(0, len(text), chunk_size):
+        yield text[start : start + chunk_size].encode()
+
+
+def url_to_filename(url: str, suffix: str = "") -> str:
+    """Derive a filesystem-safe, unique file name for *url*.
+
+    The name is built from the host and path (non-alphanumeric characters
+    collapsed to ``-``) followed by a short hash of the full URL, so that URLs
+    differing only in their query string do not collide.
+
+    Returns:
+        A file name such as ``example.com-docs-intro-1a2b3c4d.md``.
+
+    """
+    parts = urlsplit(url)
+    stem = re.sub(r"[^A-Za-z0-9._]+", "-", f"{parts.netloc}{parts.path}").strip("-.")
+    digest = hashlib.sha1(url.encode(), usedforsecurity=False).hexdigest()[:8]
+    return f"{stem[:100] or 'page'}-{digest}{suffix}"
+
+
 def print_json(data: dict | list) -> None:  # type: ignore[type-arg]
-    """Pretty-print *data* as JSON using Rich's coloured output."""
-    console.print_json(json.dumps(data))
+    """Pretty-print *data* as JSON using Rich's coloured output.
+
+    With raw output (see :func:`raw_output`) the same indented JSON is written
+    to stdout without highlighting.
+    """
+    if raw_output():
+        with phase("serialize"):
+            raw = json.dumps(data, indent=2, ensure_ascii=False).encode()
+        write_line(raw)
+        return
+    with phase("serialize"):
+        text = json.dumps(data)
+    console = get_console()
+    with phase("console"):
+        console.print_json(text)
 
 
 # ---------------------------------------------------------------------------
@@ -55,16 +312,62 @@ def print_json(data: dict | list) -> None:  # type: ignore[type-arg]
 # ---------------------------------------------------------------------------
 
 
+def _observe_retry(
+    metrics: "Metrics | None",
+    exc: BaseException,
+    rate_limited: bool,
+    endpoint: str | None,
+    final: bool,
+) -> None:
+    """Report a failed attempt of a retryable request to *metrics*."""
+    if metrics is None:
+        return
+    if rate_limited:
+        metrics.observe_rate_limit(endpoint, retrying=not final)
+    elif not final:
+        metrics.observe_retry(endpoint)
+    if final:
+        metrics.observe_error(endpoint, exc)
+
+
+def _warn_retry(
+    exc: BaseException, rate_limited: bool, attempt: int, max_retries: int, delay: float
+) -> None:
+    reason = "Rate limit hit" if rate_limited else type(exc).__name__
+    get_console(stderr=True).print(
+        f"[yellow]{reason} (attempt {attempt + 1}/{max_retries}). "
+        f"Retrying in {delay:.1f}s …[/yellow]"
+    )
+
+
 def call_with_retry(
-    func: Callable[[], T], *, max_retries: int = 3, base_delay: float = 1.0
+    func: Callable[[], T],
+    *,
+    endpoint: str | None = None,
+    max_retries: int = 3,
+    base_delay: float = 1.0,
 ) -> T:  # noqa: D401
     """Call *func* and retry automatically on Cloudflare *RateLimitError*.
 
+    Connection failures, timeouts and ``5xx`` responses (see
+    :func:`transient_errors`) are retried the same way. The SDK clients do
+    not retry on their own, so every attempt is seen here.
+
+    Each attempt first waits for the active client-side rate limiter (see
+    :mod:`cloudflare_browser_render.ratelimit`) and is then admitted by the
+    adaptive concurrency controller (see
+    :mod:`cloudflare_browser_render.concurrency`), if either is configured.
+    Latency, rate limits, retries and failures are reported to the active
+    :mod:`cloudflare_browser_render.metrics` collection, if any.
+
     Args:
         func: A zero-argument callable that performs the Cloudflare SDK request.
+        endpoint: Name of the endpoint being called, used to select the
+            per-endpoint rate limit.
         max_retries: Number of attempts before giving up (default **3**).
         base_delay: Initial delay in seconds before retrying. Each subsequent
-            retry doubles this delay (exponential back-off).
+            retry doubles this delay (exponential back-off), unless the
+            response asks for a specific delay (see :func:`retry_delay`).
 
     Returns:
         The return value of *func*.
@@ -73,20 +376,101 @@ def call_with_retry(
         RuntimeError: If retries are exhausted unexpectedly.
 
     """
+    retry_on = rate_limit_error()
+    retryable = (retry_on, *transient_errors())
+    metrics = get_metrics()
     delay = base_delay
     for attempt in range(max_retries):
+        throttle(endpoint)
+        started = time.perf_counter()
         try:
-            return func()
-        except RateLimitError:
-            if attempt == max_retries - 1:
+            with admit(retry_on), phase("network"):
+                result = func()
+        except retryable as exc:
+            rate_limited = isinstance(exc, retry_on)
+            final = attempt == max_retries - 1
+            _observe_retry(metrics, exc, rate_limited, endpoint, final)
+            if final:
                 raise  # re-raise after final attempt
 
-            console.print(
-                f"[yellow]Rate limit hit (attempt {attempt + 1}/{max_retries}). "
-                f"Retrying in {delay:.1f}s …[/yellow]"
-            )
-            time.sleep(delay)
+            wait = retry_delay(exc, delay)
+            _warn_retry(exc, rate_limited, attempt, max_retries, wait)
+            time.sleep(wait)
             delay *= 2  # exponential back-off
+        except Exception as exc:
+            if metrics is not None:
+                metrics.observe_error(endpoint, exc)
+            raise
+        else:
+            if metrics is not None:
+                latency = time.perf_counter() - started
+                metrics.observe(endpoint, latency, response_size(result))
+            return result
 
     # This point should never be reached – kept for static analysers.
     raise RuntimeError("call_with_retry exhausted retries unexpectedly")
+
+
+async def call_with_retry_async(
+    func: Callable[[], Awaitable[T]],
+    *,
+    endpoint: str | None = None,
+    max_retries: int = 3,
+    base_delay: float = 1.0,
+) -> T:
+    """Asynchronous counterpart of :func:`call_with_retry`.
+
+    Requests are admitted by the adaptive concurrency controller through
+    :func:`~cloudflare_browser_render.concurrency.admit_async`.
+
+    Args:
+        func: A zero-argument callable returning an awaitable SDK request.
+        endpoint: Name of the endpoint being called (for rate limiting).
+        max_retries: Number of attempts before giving up (default **3**).
+        base_delay: Initial delay in seconds before retrying, doubled on each
+            subsequent retry.
+
+    Returns:
+        The awaited result of *func*.
+
+    Raises:
+        RuntimeError: If retries are exhausted unexpectedly.
+
+    """
+    retry_on = rate_limit_error()
+    retryable = (retry_on, *transient_errors())
+    metrics = get_metrics()
+    delay = base_delay
+    for attempt in range(max_retries):
+        await throttle_async(endpoint)
+        started = time.perf_counter()
+        try:
+            async with admit_async(retry_on):
+                with phase("network"):
+                    result = await func()
+        except retryable as exc:
+            rate_limited = isinstance(exc, retry_on)
+            final = attempt == max_retries - 1
+            _observe_retry(metrics, exc, rate_limited, endpoint, final)
+            if final:
+                raise
+
+            wait = retry_delay(exc, delay)
+            _warn_retry(exc, rate_limited, attempt, max_retries, wait)
+            # asyncio is necessarily loaded already when this coroutine runs;
+            # importing it here keeps it off the CLI's start-up path.
+            import asyncio
+
+            await asyncio.sleep(wait)
+            delay *= 2
+        except Exception as exc:
+            if metrics is not None:
+                metrics.observe_error(endpoint, exc)
+            raise
+        else:
+            if metrics is not None:
+                latency = time.perf_counter() - started
+                metrics.observe(endpoint, latency, response_size(result))
+            return result
+
+    raise RuntimeError("call_with_retry_async exhausted retries unexpectedly")
@@ -0,0 +1,136 @@
+"""Incremental rendering: detect which pages changed since the last run.
+
+:class:`ContentState` keeps a hash of every ``(endpoint, url)`` result in a
+small JSON file. Each new result is normalised and hashed (see
+:func:`content_hash`), and only results whose hash differs from the stored
+one count as changes. Callers write outputs and emit a :class:`ChangeEvent`
+for those alone, so downstream jobs only see pages that actually changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from cloudflare_browser_render.result import unwrap
+
+_STATE_VERSION = 1
+
+
+def content_hash(result: Any) -> str:
+    """Return a SHA-256 of *result* that ignores insignificant differences.
+
+    Text has its whitespace runs collapsed and JSON values are serialised
+    with sorted keys, so re-indented markup or reordered keys do not count as
+    changes. Bytes are hashed as-is; a lazy :class:`RenderResult` is decoded
+    first.
+
+    Returns:
+        The hex digest.
+
+    """
+    result = unwrap(result)
+    if isinstance(result, bytes):
+        data = result
+    elif isinstance(result, str):
+        data = re.sub(r"\s+", " ", result).strip().encode()
+    else:
+        data = json.dumps(result, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+class ChangeEvent(NamedTuple):
+    """A result that is new or differs from the previous run."""
+
+    endpoint: str
+    url: str
+    hash: str
+    previous: str | None
+    output: str | None = None
+
+    @property
+    def kind(self) -> str:
+        """``"new"`` for first-seen pages, ``"changed"`` otherwise."""
+        return "new" if self.previous is None else "changed"
+
+    def to_json(self) -> str:
+        """Serialise the event as a single JSON line.
+
+        Returns:
+            The event, without a trailing newline.
+
+        """
+        return json.dumps({
+            "ts": time.time(),
+            "event": self.kind,
+            "endpoint": self.endpoint,
+            "url": self.url,
+            "hash": self.hash,
+            "previous": self.previous,
+            "output": self.output,
+        })
+
+
+class ContentState:
+    """Per-``(endpoint, url)`` content hashes persisted between runs."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Load the state stored at *path*, if it exists.
+
+        Raises:
+            ValueError: If *path* exists but is not a state file.
+
+        """
+        self.path = Path(path)
+        self.changes: list[ChangeEvent] = []
+        self._hashes: dict[str, str] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self._hashes = dict(data["hashes"])
+            except (ValueError, KeyError, TypeError):
+                raise ValueError(f"{self.path} is not a cbr state file") from None
+
+    @staticmethod
+    def _key(endpoint: str, url: str) -> str:
+        return f"{endpoint} {url}"
+
+    def check(
+        self, endpoint: str, url: str, result: Any, output: str | None = None
+    ) -> ChangeEvent | None:
+        """Record *result* and report whether it changed.
+
+        The new hash is remembered immediately; call :meth:`save` to persist
+        it. Change events are also collected in :attr:`changes`.
+
+        Returns:
+            A :class:`ChangeEvent` if the result is new or changed, otherwise
+            ``None``.
+
+        """
+        digest = content_hash(result)
+        key = self._key(endpoint, url)
+        with self._lock:
+            previous = self._hashes.get(key)
+            if previous == digest:
+                return None
+            self._hashes[key] = digest
+            event = ChangeEvent(endpoint, url, digest, previous, output)
+            self.changes.append(event)
+        return event
+
+    def save(self) -> None:
+        """Atomically write the state back to its file."""
+        with self._lock:
+            payload = json.dumps(
+                {"version": _STATE_VERSION, "hashes": self._hashes}, indent=0
+            )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.path)
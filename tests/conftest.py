@@ -1,5 +1,164 @@
+from __future__ import annotations
+
+import json
 import os
+import types
+from collections.abc import Callable
+from typing import Any
+
+import pytest
 
 # Ensure CI/test environment has the required variables without a .env file.
 os.environ.setdefault("CLOUDFLARE_API_TOKEN", "test-token")
 os.environ.setdefault("CLOUDFLARE_ACCOUNT_ID", "test-account")
+
+
+# ---------------------------------------------------------------------------
+# Helpers: stub client & raw-response wrappers
+# ---------------------------------------------------------------------------
+
+
+class _Raw:
+    """Mimics the Cloudflare SDK *APIResponse* used with `.with_raw_response`."""
+
+    def __init__(self, payload: Any):
+        self._payload = payload
+
+    # Behaviour for `.text()` (content / markdown endpoints)
+    def text(self) -> str:  # noqa: D401 – Click expects .text()
+        return str(self._payload)
+
+    # Behaviour for `.json()` (json / scrape / snapshot / links endpoints)
+    def json(self) -> Any:  # noqa: D401 – mimics SDK signature
+        return self._payload
+
+    # Behaviour for `.read()` (the raw body every renderer reads)
+    def read(self) -> bytes:  # noqa: D401 – mimics SDK signature
+        if isinstance(self._payload, bytes):  # already bytes → return as-is
+            return self._payload
+        if isinstance(self._payload, str):
+            return self._payload.encode()
+        return json.dumps(self._payload).encode()
+
+    # Attribute used by some renderer comments (not strictly required here)
+    @property
+    def content(self) -> bytes:  # noqa: D401 – matches httpx.Response API
+        return self.read()
+
+
+class _EndpointStub:
+    """Callable stub returned from `with_raw_response` chain."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+
+    # `.with_raw_response` returns an object exposing `.create(...)`.
+    @property
+    def with_raw_response(self):  # noqa: D401 – property name mirrors SDK
+        return self
+
+    # pylint: disable=unused-argument – signature matches SDK.
+    def create(self, *args, **kwargs):  # noqa: D401 – mirrors SDK
+        return _Raw(self._factory())
+
+    # `.with_streaming_response.create(...)` returns a context manager.
+    @property
+    def with_streaming_response(self):  # noqa: D401 – property name mirrors SDK
+        return types.SimpleNamespace(
+            create=lambda *args, **kwargs: _StreamedRaw(self._factory())
+        )
+
+
+class _StreamedRaw(_Raw):
+    """Mimics the SDK *StreamedBinaryAPIResponse* from `.with_streaming_response`."""
+
+    def iter_bytes(self, chunk_size: int | None = None):  # noqa: D401
+        data = self.read()
+        step = chunk_size or len(data) or 1
+        for start in range(0, len(data), step):
+            yield data[start : start + step]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+class _AsyncRaw(_Raw):
+    """Async flavour of :class:`_Raw` (mimics *AsyncAPIResponse*)."""
+
+    async def text(self) -> str:  # noqa: D401 – mimics SDK signature
+        return _Raw.text(self)
+
+    async def json(self) -> Any:  # noqa: D401 – mimics SDK signature
+        return _Raw.json(self)
+
+    async def read(self) -> bytes:  # noqa: D401 – mimics SDK signature
+        return _Raw.read(self)
+
+
+class _AsyncEndpointStub(_EndpointStub):
+    """Async flavour of :class:`_EndpointStub`."""
+
+    async def create(self, *args, **kwargs):  # noqa: D401 – mirrors SDK
+        return _AsyncRaw(self._factory())
+
+
+# Mapping: endpoint name → value factory used by the renderer tests.
+ENDPOINT_PAYLOADS: dict[str, Callable[[], Any]] = {
+    "content": lambda: "stub-content",
+    "markdown": lambda: "# stub-markdown",
+    "json": lambda: {"key": "value"},
+    "scrape": lambda: {"selector": "h1", "text": "stub"},
+    "snapshot": lambda: {"id": "abc123"},
+    "links": lambda: ["https://example.com"],
+    "pdf": lambda: b"%PDF-stub%\n",
+    "screenshot": lambda: b"\x89PNG\r\nstub",
+}
+
+
+@pytest.fixture()
+def stub_client(monkeypatch):
+    """Install a predictable stub as the `get_client()` singleton.
+
+    Returns:
+        The stub client, so tests can tweak individual endpoints.
+
+    """
+    # Build a browser_rendering namespace with dynamic attributes.
+    browser_rendering = types.SimpleNamespace(**{
+        name: types.SimpleNamespace(
+            create=_EndpointStub(func).create,
+            with_raw_response=_EndpointStub(func),
+            with_streaming_response=_EndpointStub(func).with_streaming_response,
+        )
+        for name, func in ENDPOINT_PAYLOADS.items()
+    })
+
+    stub = types.SimpleNamespace(browser_rendering=browser_rendering)
+
+    import cloudflare_browser_render.client as client_mod
+
+    monkeypatch.setattr(client_mod, "_cf_client", stub)
+    return stub
+
+
+@pytest.fixture()
+def stub_async_client(monkeypatch):
+    """Install an async stub as the `get_async_client()` singleton.
+
+    Returns:
+        The stub client, so tests can tweak individual endpoints.
+
+    """
+    browser_rendering = types.SimpleNamespace(**{
+        name: types.SimpleNamespace(with_raw_response=_AsyncEndpointStub(func))
+        for name, func in ENDPOINT_PAYLOADS.items()
+    })
+    stub = types.SimpleNamespace(browser_rendering=browser_rendering)
+
+    import cloudflare_browser_render.client as client_mod
+
+    monkeypatch.setattr(client_mod, "_async_cf_client", stub)
+    return stub
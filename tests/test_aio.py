@@ -0,0 +1,57 @@
+"""Tests for the asyncio rendering API (`cloudflare_browser_render.aio`)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from cloudflare_browser_render import aio
+from cloudflare_browser_render.renderers import ENDPOINTS
+
+
+async def _collect(endpoint: str, urls, **kwargs):
+    return [item async for item in aio.render_many(endpoint, urls, **kwargs)]
+
+
+@pytest.mark.usefixtures("stub_async_client")
+def test_async_renderers_mirror_sync_results():
+    assert asyncio.run(aio.render_markdown_async("https://a.test")) == (
+        "# stub-markdown"
+    )
+    assert asyncio.run(aio.render_pdf_async("https://a.test")).startswith(b"%PDF")
+    assert asyncio.run(aio.render_scrape_async("https://a.test", "h1"))["text"]
+
+
+@pytest.mark.usefixtures("stub_async_client")
+@pytest.mark.parametrize("endpoint", [e for e in ENDPOINTS if e != "scrape"])
+def test_render_many_yields_every_url(endpoint):
+    urls = [f"https://example.com/{i}" for i in range(20)]
+    items = asyncio.run(_collect(endpoint, urls, concurrency=5))
+    assert sorted(i.url for i in items) == sorted(urls)
+    assert all(i.ok for i in items)
+
+
+def test_render_many_bounds_concurrency_and_captures_errors(monkeypatch):
+    import cloudflare_browser_render.renderers.content as content_mod
+
+    in_flight = peak = 0
+
+    async def _render(url: str) -> str:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if url == "https://example.com/7":
+            raise RuntimeError("boom")
+        return url
+
+    monkeypatch.setattr(content_mod, "render_content_async", _render)
+    urls = [f"https://example.com/{i}" for i in range(20)]
+    items = asyncio.run(_collect("content", urls, concurrency=4))
+
+    assert peak == 4
+    failed = [i for i in items if not i.ok]
+    assert [i.url for i in failed] == ["https://example.com/7"]
+    assert str(failed[0].error) == "boom"
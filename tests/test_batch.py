@@ -0,0 +1,83 @@
+"""Tests for concurrent multi-URL rendering (`cbr batch`)."""
+
+from __future__ import annotations
+
+import io
+import threading
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from cloudflare_browser_render.batch import iter_batch, read_urls
+from cloudflare_browser_render.cli import cli
+
+
+def test_read_urls_skips_blanks_comments_and_duplicates():
+    stream = io.StringIO(
+        "https://a.test\n\n# comment\nhttps://b.test\nhttps://a.test\n"
+    )
+    assert list(read_urls(stream)) == ["https://a.test", "https://b.test"]
+
+
+@pytest.mark.usefixtures("stub_client")
+def test_iter_batch_yields_one_item_per_url():
+    urls = [f"https://example.com/{i}" for i in range(10)]
+    items = list(iter_batch("markdown", urls, jobs=3))
+    assert sorted(item.url for item in items) == sorted(urls)
+    assert all(item.ok and item.result == "# stub-markdown" for item in items)
+
+
+def test_iter_batch_captures_errors(monkeypatch):
+    import cloudflare_browser_render.renderers.content as content_mod
+
+    def _render(url: str) -> str:
+        if url.endswith("bad"):
+            raise RuntimeError("boom")
+        return url
+
+    monkeypatch.setattr(content_mod, "render_content", _render)
+    items = {i.url: i for i in iter_batch("content", ["https://ok", "https://bad"])}
+    assert items["https://ok"].result == "https://ok"
+    assert str(items["https://bad"].error) == "boom"
+
+
+def test_closing_iter_batch_cancels_queued_renders():
+    gate = threading.Event()
+    calls: list[str] = []
+
+    def _render(url: str) -> str:
+        calls.append(url)
+        if not url.endswith("/0"):
+            gate.wait(5)
+        return url
+
+    urls = [f"https://a.test/{i}" for i in range(10)]
+    items = iter_batch("content", urls, jobs=2, render=_render)
+    assert next(items).url == "https://a.test/0"
+    # The 2 * jobs window holds three more URLs, of which two run at most.
+    threading.Timer(0.1, gate.set).start()
+    items.close()
+    assert "https://a.test/3" not in calls
+    assert set(calls) <= {f"https://a.test/{i}" for i in range(3)}
+
+
+@pytest.mark.usefixtures("stub_client")
+def test_batch_cli_writes_one_file_per_url():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        Path("urls.txt").write_text("https://example.com/a\nhttps://example.com/b\n")
+        result = runner.invoke(
+            cli, ["batch", "pdf", "urls.txt", "-j", "2", "-d", "out"]
+        )
+        assert result.exit_code == 0, result.output
+        files = sorted(Path("out").iterdir())
+        assert len(files) == 2
+        assert all(f.suffix == ".pdf" for f in files)
+
+
+def test_batch_cli_requires_selector_for_scrape():
+    runner = CliRunner()
+    result = runner.invoke(cli, ["batch", "scrape", "-"], input="https://a.test\n")
+    assert result.exit_code == 2
+    assert "--selector" in result.output
@@ -0,0 +1,53 @@
+"""Tests for the offline benchmark suite and its fake Browser Rendering API."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from benchmarks.fake import FakeBrowserRendering
+from benchmarks.run import ENDPOINT_CALLS, URL, main
+from cloudflare_browser_render.renderers import get_renderer
+
+
+def test_fake_serves_every_endpoint_through_the_sdk():
+    with FakeBrowserRendering(binary_size=1000).installed() as fake:
+        results = {
+            endpoint: call(get_renderer(endpoint))
+            for endpoint, call in ENDPOINT_CALLS.items()
+        }
+    assert set(fake.requests) == set(ENDPOINT_CALLS)
+    assert len(results["pdf"]) == 1000
+    assert results["links"]["result"][0] == f"{URL}/page/0"
+    assert results["scrape"]["result"][0]["selector"] == "h1"
+
+
+def test_injected_rate_limits_are_retried():
+    fake = FakeBrowserRendering(rate_limit_rate=0.5, retry_after=0.001, seed=1)
+    with fake.installed(max_retries=20):
+        for _ in range(10):
+            assert get_renderer("markdown")(URL).startswith('{"success"')
+    assert sum(fake.rate_limited.values()) > 0
+
+
+def test_runner_records_json_and_flags_regressions(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    args = ["--quick", "--only", "single_call", "-o", str(output)]
+    assert main(args) == 0
+    results = json.loads(output.read_text())["results"]
+    assert results["single_call.content"]["unit"] == "us"
+
+    baseline = tmp_path / "baseline.json"
+    for result in results.values():
+        result["value"] /= 100
+    baseline.write_text(json.dumps({"results": results}))
+    assert main([*args, "--compare", str(baseline)]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+
+
+@pytest.fixture(autouse=True)
+def _no_cache():
+    from cloudflare_browser_render.cache import configure_cache
+
+    configure_cache(None)
@@ -0,0 +1,171 @@
+"""Tests for multi-format bundles (`cbr bundle`)."""
+
+from __future__ import annotations
+
+import base64
+import json
+import threading
+
+import pytest
+from click.testing import CliRunner
+
+import cloudflare_browser_render.renderers.content as content_mod
+import cloudflare_browser_render.renderers.links as links_mod
+import cloudflare_browser_render.renderers.markdown as markdown_mod
+import cloudflare_browser_render.renderers.snapshot as snapshot_mod
+from cloudflare_browser_render.bundle import iter_bundles, plan_bundle, split_snapshot
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.extract import configure_extraction
+from cloudflare_browser_render.result import TEXT, RenderResult
+
+PNG = b"\x89PNG\r\nbundle"
+
+
+@pytest.fixture()
+def snapshot_calls(monkeypatch):
+    calls: list[str] = []
+
+    def _render_snapshot(url: str) -> dict:
+        calls.append(url)
+        return {
+            "success": True,
+            "result": {
+                "content": "<h1>hi</h1>",
+                "screenshot": base64.b64encode(PNG).decode(),
+            },
+        }
+
+    monkeypatch.setattr(snapshot_mod, "render_snapshot_lazy", _render_snapshot)
+    return calls
+
+
+def test_plan_serves_content_and_screenshot_from_one_snapshot():
+    plan = plan_bundle(["markdown", "content", "screenshot"])
+    assert [served for served, _ in plan] == [("content", "screenshot"), ("markdown",)]
+    assert [served for served, _ in plan_bundle(["screenshot"])] == [("screenshot",)]
+
+
+def test_plan_rejects_scrape():
+    with pytest.raises(ValueError):
+        plan_bundle(["scrape"])
+
+
+def test_bundle_requests_run_concurrently(tmp_path, monkeypatch, snapshot_calls):
+    # Every request blocks until all three are in flight at the same time.
+    barrier = threading.Barrier(3, timeout=5)
+
+    def _markdown(url: str) -> str:
+        barrier.wait()
+        return "# md"
+
+    def _links(url: str) -> list[str]:
+        barrier.wait()
+        return [url]
+
+    original = snapshot_mod.render_snapshot_lazy
+
+    def _snapshot(url: str) -> dict:
+        barrier.wait()
+        return original(url)
+
+    monkeypatch.setattr(markdown_mod, "render_markdown_lazy", _markdown)
+    monkeypatch.setattr(links_mod, "render_links_lazy", _links)
+    monkeypatch.setattr(snapshot_mod, "render_snapshot_lazy", _snapshot)
+
+    formats = ["markdown", "links", "content", "screenshot"]
+    (item,) = iter_bundles(["https://a.test"], formats, tmp_path, jobs=4)
+
+    assert item.ok, item.errors
+    assert snapshot_calls == ["https://a.test"]
+    assert sorted(p.name for p in item.directory.iterdir()) == [
+        "content.html",
+        "links.json",
+        "markdown.md",
+        "screenshot.png",
+    ]
+    assert item.files["screenshot"].read_bytes() == PNG
+    assert json.loads(item.files["links"].read_text()) == ["https://a.test"]
+
+
+@pytest.mark.usefixtures("stub_client", "snapshot_calls")
+@pytest.mark.parametrize("local", [False, True])
+def test_content_html_is_bare_html_on_every_plan(tmp_path, monkeypatch, local):
+    envelope = b'{"success": true, "result": "<h1>hi</h1>"}'
+    monkeypatch.setattr(
+        content_mod, "render_content_lazy", lambda url: RenderResult(envelope, TEXT)
+    )
+    configure_extraction(local)
+    try:
+        # From the snapshot, then from the content endpoint.
+        pages = [
+            next(iter_bundles(["https://a.test"], formats, tmp_path / formats[1]))
+            for formats in (["content", "screenshot"], ["content", "markdown"])
+        ]
+    finally:
+        configure_extraction(False)
+    assert [item.files["content"].read_text() for item in pages] == ["<h1>hi</h1>"] * 2
+
+
+@pytest.mark.usefixtures("stub_client")
+def test_cli_bundle_writes_one_directory_per_url(tmp_path):
+    result = CliRunner().invoke(
+        cli,
+        ["bundle", "https://a.test/1", "https://a.test/2", "-f", "markdown,pdf",
+         "-d", str(tmp_path)],
+    )  # fmt: skip
+    assert result.exit_code == 0, result.output
+    dirs = sorted(tmp_path.iterdir())
+    assert len(dirs) == 2
+    assert sorted(p.name for p in dirs[0].iterdir()) == ["markdown.md", "pdf.pdf"]
+
+
+def test_cli_bundle_rejects_unknown_format():
+    result = CliRunner().invoke(cli, ["bundle", "https://a.test", "-f", "nope"])
+    assert result.exit_code == 2
+    assert "choose from" in result.output
+
+
+def test_split_snapshot_writes_html_png_and_metadata(tmp_path, snapshot_calls):
+    result = snapshot_mod.render_snapshot_lazy("https://a.test")
+    result["result"]["title"] = "Hi"
+    files = split_snapshot(result, tmp_path / "page")
+    assert files["content"].read_text() == "<h1>hi</h1>"
+    assert files["screenshot"].read_bytes() == PNG
+    assert json.loads(files["snapshot"].read_text()) == {
+        "success": True,
+        "result": {"title": "Hi", "content": "content.html",
+                   "screenshot": "screenshot.png"},
+    }  # fmt: skip
+
+
+@pytest.mark.usefixtures("snapshot_calls")
+def test_cli_snapshot_output_dir(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(cli, ["snapshot", "https://a.test", "-d", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "content.html", "screenshot.png", "snapshot.json",
+    ]  # fmt: skip
+    result = runner.invoke(
+        cli, ["snapshot", "https://a.test", "-d", str(tmp_path), "-o", "x.json"]
+    )
+    assert result.exit_code == 2
+
+
+def test_closing_iter_bundles_cancels_queued_tasks(monkeypatch, tmp_path):
+    gate = threading.Event()
+    calls: list[str] = []
+
+    def _render(url: str) -> RenderResult:
+        calls.append(url)
+        if not url.endswith("/0"):
+            gate.wait(5)
+        return RenderResult(b"# md", TEXT)
+
+    monkeypatch.setattr(markdown_mod, "render_markdown_lazy", _render)
+    urls = [f"https://a.test/{i}" for i in range(10)]
+    bundles = iter_bundles(urls, ["markdown"], tmp_path, jobs=2)
+    assert next(bundles).url == "https://a.test/0"
+    threading.Timer(0.1, gate.set).start()
+    bundles.close()
+    assert "https://a.test/3" not in calls
@@ -0,0 +1,104 @@
+"""Tests for the persistent on-disk response cache."""
+
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from cloudflare_browser_render.cache import ResponseCache, configure_cache
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.client import configure_client
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache():
+    yield
+    configure_cache(None)
+
+
+@pytest.mark.parametrize("value", [b"\x89PNG", "text ✓", {"result": ["a", "b"]}])
+def test_round_trip_preserves_type(tmp_path, value):
+    cache = ResponseCache(tmp_path)
+    cache.put("content", "https://a.test", None, value)
+    assert cache.get("content", "https://a.test", None) == value
+
+
+def test_key_includes_params(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put("scrape", "https://a.test", {"elements": [{"selector": "h1"}]}, {"x": 1})
+    assert (
+        cache.get("scrape", "https://a.test", {"elements": [{"selector": "h2"}]})
+        is None
+    )
+
+
+def test_key_includes_account_and_base_url(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path)
+    cache.put("content", "https://a.test", None, "html")
+    try:
+        configure_client(base_url="http://127.0.0.1:8787/client/v4")
+        assert cache.get("content", "https://a.test", None) is None
+        configure_client()
+        monkeypatch.setenv("CLOUDFLARE_ACCOUNT_ID", "other-account")
+        assert cache.get("content", "https://a.test", None) is None
+    finally:
+        configure_client()
+    monkeypatch.undo()
+    assert cache.get("content", "https://a.test", None) == "html"
+
+
+def test_per_endpoint_ttl_expires_entries(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=3600, endpoint_ttls={"pdf": 10})
+    cache.put("pdf", "https://a.test", None, b"pdf")
+    cache.put("content", "https://a.test", None, "html")
+    old = time.time() - 60
+    for path in tmp_path.glob("*/*"):
+        os.utime(path, (old, old))
+
+    assert cache.get("pdf", "https://a.test", None) is None
+    assert cache.get("content", "https://a.test", None) == "html"
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=250)
+    for i in range(2):
+        cache.put("pdf", f"https://a.test/{i}", None, b"x" * 100)
+    # Age both entries, then touch /0 so /1 becomes the LRU victim.
+    for n, path in enumerate(sorted(tmp_path.glob("*/*"))):
+        os.utime(path, (1000 + n, time.time()))
+    assert cache.get("pdf", "https://a.test/0", None) == b"x" * 100
+
+    cache.put("pdf", "https://a.test/2", None, b"x" * 100)
+
+    assert cache.size() <= 250
+    assert cache.get("pdf", "https://a.test/0", None) is not None
+    assert cache.get("pdf", "https://a.test/1", None) is None
+
+
+def test_cli_cache_dir_avoids_second_render(tmp_path, stub_client):
+    calls = []
+    endpoint = stub_client.browser_rendering.markdown.with_raw_response
+    original = endpoint.create
+
+    def _counting_create(*args, **kwargs):
+        calls.append(kwargs["url"])
+        return original(*args, **kwargs)
+
+    endpoint.create = _counting_create
+    runner = CliRunner()
+    args = ["--cache-dir", str(tmp_path), "markdown", "https://a.test"]
+    for _ in range(2):
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 0, result.output
+        assert "# stub-markdown" in result.output
+
+    assert calls == ["https://a.test"]
+
+
+def test_cli_rejects_unknown_ttl_endpoint():
+    result = CliRunner().invoke(cli, ["--cache-ttl", "nope=5", "content", "x"])
+    assert result.exit_code == 2
+    assert "unknown endpoint" in result.output
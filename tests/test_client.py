@@ -0,0 +1,56 @@
+"""Tests for SDK client construction: base URL, pooling and timeouts."""
+
+from __future__ import annotations
+
+import pytest
+
+from cloudflare_browser_render import client as client_mod
+from cloudflare_browser_render.batch import iter_batch
+from cloudflare_browser_render.client import (
+    configure_client,
+    get_client,
+    http_settings,
+)
+from cloudflare_browser_render.config import get_http_settings
+
+
+@pytest.fixture(autouse=True)
+def _reset_client(monkeypatch):
+    monkeypatch.setattr(client_mod, "_reserved_connections", 0)
+    yield
+    configure_client()
+
+
+def test_http_settings_read_environment(monkeypatch):
+    monkeypatch.setenv("CBR_HTTP_MAX_KEEPALIVE", "64")
+    monkeypatch.setenv("CBR_HTTP_HTTP2", "true")
+    monkeypatch.setenv("CBR_HTTP_READ_TIMEOUT", "90")
+    settings = get_http_settings()
+    assert (settings.max_keepalive, settings.http2, settings.read_timeout) == (
+        64,
+        True,
+        90.0,
+    )
+
+    monkeypatch.setenv("CBR_HTTP_CONNECT_TIMEOUT", "soon")
+    with pytest.raises(RuntimeError, match="CBR_HTTP_CONNECT_TIMEOUT"):
+        get_http_settings()
+
+
+def test_pool_tracks_batch_concurrency():
+    list(iter_batch("content", [], jobs=150))
+    settings = http_settings()
+    assert (settings.max_connections, settings.max_keepalive) == (150, 150)
+
+
+def test_client_uses_tuned_http_client():
+    configure_client(
+        base_url="http://127.0.0.1:9/client/v4",
+        http={"keepalive_expiry": 30.0, "connect_timeout": 2.0},
+    )
+    cf = get_client()
+    assert str(cf.base_url) == "http://127.0.0.1:9/client/v4/"
+    assert cf._client.timeout.connect == 2.0
+    pool = cf._client._transport._pool
+    assert pool._keepalive_expiry == 30.0
+    assert pool._max_keepalive_connections == 20
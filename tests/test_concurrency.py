@@ -0,0 +1,147 @@
+"""Tests for the adaptive (AIMD) concurrency controller."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+import types
+
+import pytest
+
+import cloudflare_browser_render.concurrency as concurrency_mod
+from cloudflare_browser_render.batch import iter_batch
+from cloudflare_browser_render.concurrency import (
+    LATENCY_SAMPLES,
+    AdaptiveConcurrency,
+    admit,
+    admit_async,
+    configure_concurrency,
+)
+
+
+class _RateLimitedError(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def _reset_controller():
+    yield
+    configure_concurrency(None)
+
+
+def test_window_grows_additively_on_stable_latency():
+    controller = AdaptiveConcurrency(2, maximum=10, verbose=False)
+    # Roughly one extra slot per window's worth of successes.
+    for _ in range(3):
+        controller.on_success(0.1)
+    assert controller.limit == 3
+    for _ in range(6):
+        controller.on_success(0.1)
+    assert controller.limit == 4
+
+
+def test_window_halves_on_rate_limit_once_per_round_trip():
+    controller = AdaptiveConcurrency(8, verbose=False)
+    controller.on_success(10.0)  # long baseline → long cooldown
+    controller.on_rate_limited()
+    controller.on_rate_limited()
+    assert controller.limit == 4
+
+
+def test_sustained_latency_rise_shrinks_window_once():
+    controller = AdaptiveConcurrency(8, maximum=8, verbose=False)
+    for _ in range(LATENCY_SAMPLES):
+        controller.on_success(0.1)
+    controller.on_success(0.5)  # a single slow request is not congestion
+    assert controller.limit == 8
+    for _ in range(LATENCY_SAMPLES):
+        controller.on_success(0.5)
+    assert controller.limit == 4  # cut once, then held while latency stays up
+
+
+def test_jittery_latency_does_not_collapse_window(monkeypatch):
+    now = 0.0
+    monkeypatch.setattr(concurrency_mod, "time", types.SimpleNamespace(
+        monotonic=lambda: now
+    ))  # fmt: skip
+    rng = random.Random(42)
+    controller = AdaptiveConcurrency(8, maximum=32, verbose=False)
+    lowest = controller.limit
+    for _ in range(2000):
+        latency = rng.uniform(0.01, 0.2)  # no congestion, just noise
+        now += latency / controller.limit
+        controller.on_success(latency)
+        lowest = min(lowest, controller.limit)
+    assert lowest > controller.minimum
+    assert controller.limit == 32
+
+
+def test_window_respects_bounds():
+    controller = AdaptiveConcurrency(2, minimum=2, maximum=3, verbose=False)
+    for _ in range(50):
+        controller.on_success(0.1)
+    assert controller.limit == 3
+    controller._last_cut = float("-inf")
+    controller.on_rate_limited()
+    assert controller.limit == 2
+
+
+def test_admit_caps_in_flight_requests():
+    controller = configure_concurrency(3, maximum=3, verbose=False)
+    peak = 0
+    lock = threading.Lock()
+
+    def _work():
+        nonlocal peak
+        with admit(_RateLimitedError):
+            with lock:
+                peak = max(peak, controller.in_flight)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=_work) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 3
+    assert controller.in_flight == 0
+
+
+def test_admit_reports_rate_limits():
+    controller = configure_concurrency(8, verbose=False)
+    with pytest.raises(_RateLimitedError), admit(_RateLimitedError):
+        raise _RateLimitedError
+    assert controller.limit == 4
+
+
+def test_async_requests_are_admitted_and_cut_on_rate_limits():
+    controller = configure_concurrency(3, maximum=3, verbose=False)
+    peak = 0
+
+    async def _work():
+        nonlocal peak
+        async with admit_async(_RateLimitedError):
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0.005)
+
+    async def _run():
+        await asyncio.gather(*(_work() for _ in range(12)))
+        with pytest.raises(_RateLimitedError):
+            async with admit_async(_RateLimitedError):
+                raise _RateLimitedError
+
+    asyncio.run(_run())
+    assert peak == 3
+    assert controller.in_flight == 0
+    assert controller.limit == 1
+
+
+@pytest.mark.usefixtures("stub_client")
+def test_batch_requests_flow_through_controller():
+    controller = configure_concurrency(2, maximum=16, verbose=False)
+    urls = [f"https://example.com/{i}" for i in range(20)]
+    assert all(item.ok for item in iter_batch("content", urls, jobs=16))
+    assert controller.limit > 2
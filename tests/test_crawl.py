@@ -0,0 +1,121 @@
+"""Tests for the breadth-first crawler."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+from click.testing import CliRunner
+
+import cloudflare_browser_render.renderers.links as links_mod
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.crawl import iter_crawl, normalize_url
+
+# Small link graph served by the patched ``render_links``.
+SITE = {
+    "https://a.test/": ["/docs", "/blog#top", "https://other.test/x"],
+    "https://a.test/docs": ["/docs/1", "/docs/2", "HTTPS://A.TEST:443/"],
+    "https://a.test/blog": ["/blog/post"],
+    "https://a.test/docs/1": ["/docs/deep"],
+}
+
+
+@pytest.fixture()
+def site(monkeypatch):
+    calls: list[str] = []
+
+    def _render_links(url: str) -> dict:
+        calls.append(url)
+        return {"success": True, "result": SITE.get(url, [])}
+
+    monkeypatch.setattr(links_mod, "render_links", _render_links)
+    return calls
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("HTTP://Example.COM", "http://example.com/"),
+        ("https://example.com:443/a?b=1#frag", "https://example.com/a?b=1"),
+        ("http://example.com:8080/", "http://example.com:8080/"),
+        ("mailto:someone@example.com", None),
+    ],
+)
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_normalize_url_resolves_relative_links():
+    assert normalize_url("../b", "https://a.test/x/y/z") == "https://a.test/x/b"
+
+
+def test_crawl_respects_depth_and_dedupes(site):
+    pages = list(iter_crawl(["https://a.test"], max_depth=2, jobs=2))
+    urls = sorted(page.url for page in pages)
+
+    assert urls == [
+        "https://a.test/",
+        "https://a.test/blog",
+        "https://a.test/blog/post",
+        "https://a.test/docs",
+        "https://a.test/docs/1",
+        "https://a.test/docs/2",
+    ]
+    # Pages at the maximum depth are not fetched.
+    assert sorted(site) == [
+        "https://a.test/",
+        "https://a.test/blog",
+        "https://a.test/docs",
+    ]
+
+
+def test_crawl_include_exclude_and_hosts(site):
+    pages = iter_crawl(
+        ["https://a.test/"],
+        max_depth=3,
+        include=[r"/docs"],
+        exclude=[r"/docs/2$"],
+        same_host=False,
+    )
+    assert {page.url for page in pages} == {
+        "https://a.test/",
+        "https://a.test/docs",
+        "https://a.test/docs/1",
+        "https://a.test/docs/deep",
+    }
+
+
+def test_crawl_max_pages(site):
+    pages = list(iter_crawl(["https://a.test/"], max_depth=5, max_pages=3))
+    assert len(pages) == 3
+
+
+def test_cli_crawl_then_renders_pages(tmp_path, site, stub_client):
+    out = tmp_path / "out"
+    result = CliRunner().invoke(
+        cli,
+        ["crawl", "https://a.test/", "--max-depth", "1", "--then", "markdown",
+         "-d", str(out)],
+    )  # fmt: skip
+    assert result.exit_code == 0, result.output
+    assert "https://a.test/docs" in result.output
+    assert len(list(out.glob("*.md"))) == 3
+
+
+def test_closing_iter_crawl_cancels_queued_pages(monkeypatch):
+    gate = threading.Event()
+    calls: list[str] = []
+
+    def _render_links(url: str) -> dict:
+        calls.append(url)
+        if not url.endswith("/0"):
+            gate.wait(5)
+        return {"success": True, "result": []}
+
+    monkeypatch.setattr(links_mod, "render_links", _render_links)
+    seeds = [f"https://a.test/{i}" for i in range(10)]
+    pages = iter_crawl(seeds, max_depth=1, jobs=2)
+    assert next(pages).url == "https://a.test/0"
+    threading.Timer(0.1, gate.set).start()
+    pages.close()
+    assert "https://a.test/3" not in calls
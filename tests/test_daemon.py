@@ -0,0 +1,152 @@
+"""Tests for the background render daemon (`cbr daemon`, `cbr --daemon`)."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+from click.testing import CliRunner
+
+from cloudflare_browser_render import daemon
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.renderers import get_renderer
+
+URL = "https://a.test"
+
+
+@pytest.fixture()
+def daemon_socket(tmp_path, stub_client):
+    path = tmp_path / "cbr.sock"
+    server = daemon.serve_daemon(path, jobs=2)
+    thread = threading.Thread(target=server.serve_until_idle, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("endpoint", ["markdown", "links", "snapshot", "pdf"])
+def test_render_round_trips_results(daemon_socket, endpoint):
+    assert daemon.render(daemon_socket, endpoint, URL) == get_renderer(endpoint)(URL)
+
+
+def test_stream_status_and_stop(daemon_socket, tmp_path):
+    target = tmp_path / "page.pdf"
+    assert daemon.stream(daemon_socket, "pdf", URL, str(target)) == target
+    assert target.read_bytes() == b"%PDF-stub%\n"
+
+    info = daemon.status(daemon_socket)
+    assert info["renders"] == 1
+    with pytest.raises(daemon.DaemonError, match="unknown endpoint"):
+        daemon.render(daemon_socket, "nope", URL)
+    with pytest.raises(daemon.DaemonError, match="already running"):
+        daemon.serve_daemon(daemon_socket)
+
+    assert daemon.stop(daemon_socket)
+    assert daemon.status(tmp_path / "missing.sock") is None
+    assert not daemon.stop(tmp_path / "missing.sock")
+
+
+def test_cli_forwards_to_daemon_with_unchanged_output(daemon_socket):
+    runner = CliRunner()
+    local = runner.invoke(cli, ["markdown", URL])
+    forwarded = runner.invoke(
+        cli, ["--daemon", "--daemon-socket", str(daemon_socket), "markdown", URL]
+    )
+    assert forwarded.exit_code == 0, forwarded.output
+    assert forwarded.output == local.output
+    assert daemon.status(daemon_socket)["requests"] == 1
+
+    status = runner.invoke(
+        cli, ["--daemon-socket", str(daemon_socket), "daemon", "status"]
+    )
+    assert status.exit_code == 0
+    assert '"renders": 1' in status.output
+
+
+def test_auto_start_forwards_command_line_options(tmp_path, monkeypatch):
+    calls = []
+
+    def _start(path, args, **kwargs):
+        calls.append((path, args, kwargs))
+        raise daemon.DaemonError("boom")
+
+    monkeypatch.setattr(daemon, "start", _start)
+    socket_path = tmp_path / "cbr.sock"
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--cache-dir", str(tmp_path), "--local-extract", "--no-http2",
+            "--rate-limit", "60", "--rate-limit", "pdf=5", "--metrics",
+            "--daemon", "--daemon-socket", str(socket_path), "markdown", URL,
+        ],
+    )  # fmt: skip
+    assert result.exit_code == 1
+    assert "boom" in result.output
+    path, args, kwargs = calls[0]
+    assert path == socket_path
+    assert args == [
+        "--cache-dir", str(tmp_path), "--rate-limit", "60", "--rate-limit",
+        "pdf=5", "--local-extract", "--no-http2",
+    ]  # fmt: skip
+    assert kwargs == {"idle_timeout": daemon.AUTO_IDLE_TIMEOUT}
+
+
+def test_fallback_socket_dir_must_be_private(tmp_path, monkeypatch):
+    monkeypatch.delenv(daemon.SOCKET_ENV, raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(daemon.tempfile, "gettempdir", lambda: str(tmp_path))
+    path = daemon.default_socket_path()
+    shared = path.parent
+
+    (tmp_path / "elsewhere").mkdir(mode=0o700)
+    shared.symlink_to(tmp_path / "elsewhere")
+    with pytest.raises(daemon.DaemonError, match="refusing"):
+        daemon.serve_daemon(path)
+    shared.unlink()
+
+    shared.mkdir(mode=0o755)
+    shared.chmod(0o755)
+    with pytest.raises(daemon.DaemonError, match="refusing"):
+        daemon.start(path)
+    shared.rmdir()
+
+    server = daemon.serve_daemon(path)
+    server.server_close()
+    assert shared.stat().st_mode & 0o777 == 0o700
+
+
+def test_running_daemon_must_match_the_global_options(tmp_path, stub_client):
+    path = tmp_path / "cbr.sock"
+    server = daemon.serve_daemon(path, jobs=2, args=["--local-extract"])
+    threading.Thread(target=server.serve_until_idle, daemon=True).start()
+    runner = CliRunner()
+    base = ["--daemon", "--daemon-socket", str(path)]
+    try:
+        mismatch = runner.invoke(cli, [*base, "markdown", URL])
+        match = runner.invoke(cli, ["--local-extract", *base, "markdown", URL])
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert mismatch.exit_code == 2
+    assert "started with --local-extract, not no options" in mismatch.output
+    assert match.exit_code == 0, match.output
+
+
+def test_daemon_options_are_absolute_and_include_the_environment(tmp_path, monkeypatch):
+    calls = []
+
+    def _start(path, args, **kwargs):
+        calls.append(args)
+        raise daemon.DaemonError("boom")
+
+    monkeypatch.setattr(daemon, "start", _start)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CBR_LOCAL_EXTRACT", "1")
+    result = CliRunner().invoke(
+        cli,
+        ["--cache-dir", "cache", "--daemon", "--daemon-socket",
+         str(tmp_path / "cbr.sock"), "markdown", URL],
+    )  # fmt: skip
+    assert result.exit_code == 1
+    assert calls == [["--cache-dir", str(tmp_path / "cache"), "--local-extract"]]
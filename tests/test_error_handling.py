@@ -21,35 +21,35 @@ class DummyAPIError(Exception):
 # Endpoint definitions: (patch_target, args)
 ENDPOINTS: list[tuple[str, list[str]]] = [
     (
-        "cloudflare_browser_render.renderers.content.render_content",
+        "cloudflare_browser_render.renderers.content.render_content_lazy",
         ["content", "https://example.com"],
     ),
     (
-        "cloudflare_browser_render.renderers.screenshot.render_screenshot",
+        "cloudflare_browser_render.renderers.screenshot.stream_screenshot",
         ["screenshot", "https://example.com"],
     ),
     (
-        "cloudflare_browser_render.renderers.pdf.render_pdf",
+        "cloudflare_browser_render.renderers.pdf.stream_pdf",
         ["pdf", "https://example.com"],
     ),
     (
-        "cloudflare_browser_render.renderers.snapshot.render_snapshot",
+        "cloudflare_browser_render.renderers.snapshot.render_snapshot_lazy",
         ["snapshot", "https://example.com"],
     ),
     (
-        "cloudflare_browser_render.renderers.scrape.render_scrape",
+        "cloudflare_browser_render.renderers.scrape.render_scrape_lazy",
         ["scrape", "https://example.com", "h1"],
     ),
     (
-        "cloudflare_browser_render.renderers.json.render_json",
+        "cloudflare_browser_render.renderers.json.render_json_lazy",
         ["json", "https://example.com"],
     ),
     (
-        "cloudflare_browser_render.renderers.links.render_links",
+        "cloudflare_browser_render.renderers.links.render_links_lazy",
         ["links", "https://example.com"],
     ),
     (
-        "cloudflare_browser_render.renderers.markdown.render_markdown",
+        "cloudflare_browser_render.renderers.markdown.render_markdown_lazy",
         ["markdown", "https://example.com"],
     ),
 ]
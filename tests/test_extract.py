@@ -0,0 +1,94 @@
+"""Tests for local extraction from rendered HTML (`--local-extract`)."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+import cloudflare_browser_render.renderers.content as content_mod
+from cloudflare_browser_render.bundle import plan_bundle
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.extract import (
+    configure_extraction,
+    extract_elements,
+    extract_links,
+    extract_markdown,
+    html_from_content,
+)
+from cloudflare_browser_render.renderers import get_renderer
+
+PAGE = """<html><head><title>t</title><script>var x;</script></head><body>
+<h1>Title <em>here</em></h1>
+<p>Read the <a href="/docs">docs</a> or <a href="#top">skip</a>.</p>
+<ul><li>one</li><li>two<ul><li>nested</li></ul></li></ul>
+<pre><code>x = 1</code></pre>
+<table><tr><th>a</th><th>b</th></tr><tr><td>1</td><td>2</td></tr></table>
+<meta name="description" content="about">
+</body></html>"""
+
+
+@pytest.fixture()
+def content_calls(monkeypatch):
+    calls: list[str] = []
+
+    def _render_content(url: str) -> str:
+        calls.append(url)
+        return json.dumps({"success": True, "result": PAGE})
+
+    monkeypatch.setattr(content_mod, "render_content", _render_content)
+    configure_extraction(True)
+    yield calls
+    configure_extraction(False)
+
+
+def test_html_from_content_unwraps_envelope():
+    assert html_from_content('{"success": true, "result": "<p>x</p>"}') == "<p>x</p>"
+    assert html_from_content("<p>x</p>") == "<p>x</p>"
+
+
+def test_extract_markdown():
+    assert extract_markdown(PAGE, "https://a.test/")["result"] == (
+        "# Title *here*\n\n"
+        "Read the [docs](https://a.test/docs) or [skip](https://a.test/#top).\n\n"
+        "- one\n- two\n  - nested\n\n"
+        "```\nx = 1\n```\n\n"
+        "| a | b |\n| --- | --- |\n| 1 | 2 |\n"
+    )
+
+
+def test_extract_links_and_elements():
+    assert extract_links(PAGE, "https://a.test/")["result"] == ["https://a.test/docs"]
+    result = extract_elements(PAGE, [{"selector": "meta[name=description]"}])
+    (match,) = result["result"][0]["results"]
+    assert {"name": "content", "value": "about"} in match["attributes"]
+
+
+def test_renderers_share_one_content_fetch(content_calls):
+    url = "https://a.test/"
+    assert get_renderer("links")(url)["result"] == ["https://a.test/docs"]
+    assert json.loads(get_renderer("markdown")(url))["result"].startswith("# Title")
+    fields = get_renderer("scrape")(url, fields={"title": "h1"})
+    assert fields["title"][0]["text"] == "Title here"
+    assert content_calls == [url]
+
+
+def test_scrape_expressions_still_render_remotely(content_calls, stub_client):
+    result = get_renderer("scrape")("https://a.test/", "h1", "e.innerText")
+    assert result == {"selector": "h1", "text": "stub"}
+    assert content_calls == []
+
+
+def test_local_bundle_plan_uses_one_request():
+    plan = plan_bundle(["markdown", "links", "content"], local=True)
+    assert [served for served, _ in plan] == [("markdown", "links", "content")]
+    plan = plan_bundle(["markdown", "screenshot"], local=True)
+    assert [served for served, _ in plan] == [("markdown", "screenshot")]
+
+
+def test_cli_local_extract_flag(content_calls):
+    result = CliRunner().invoke(cli, ["--local-extract", "links", "https://a.test/"])
+    assert result.exit_code == 0, result.output
+    assert "https://a.test/docs" in result.output
+    assert content_calls == ["https://a.test/"]
@@ -0,0 +1,104 @@
+"""Tests for the local rendering gateway (`cbr serve`)."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from cloudflare_browser_render.gateway import RenderGateway, serve_gateway
+
+
+@pytest.fixture()
+def gateway_server(stub_client):
+    server = serve_gateway(RenderGateway(jobs=4), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(url: str):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.headers, exc.read()
+
+
+def test_gateway_coalesces_identical_requests(stub_client):
+    started, release = threading.Event(), threading.Event()
+    renders = []
+
+    endpoint = stub_client.browser_rendering.markdown.with_raw_response
+    original = endpoint.create
+
+    def _slow_create(*args, **kwargs):
+        renders.append(kwargs["url"])
+        started.set()
+        release.wait(5)
+        return original(*args, **kwargs)
+
+    endpoint.create = _slow_create
+    gateway = RenderGateway(jobs=2)
+    responses = []
+
+    def call() -> None:
+        responses.append(gateway.render("markdown", {"url": "https://a.test"}))
+
+    threads = [threading.Thread(target=call) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(renders) == 1
+    assert {r.body for r in responses} == {b"# stub-markdown"}
+    assert sum(r.shared for r in responses) == 9
+    assert gateway.stats() == {
+        "requests": 10, "renders": 1, "coalesced": 9, "errors": 0, "in_flight": 0,
+    }  # fmt: skip
+
+
+def test_gateway_validates_requests(stub_client):
+    gateway = RenderGateway()
+    assert gateway.render("nope", {"url": "https://a.test"}).status == 404
+    assert gateway.render("content", {}).status == 400
+    response = gateway.render("content", {"url": "https://a.test", "selector": "h1"})
+    assert response.status == 400
+    assert b"selector" in response.body
+
+
+def test_gateway_http_api(gateway_server):
+    base = gateway_server.url
+    status, headers, body = _get(f"{base}/render/markdown?url=https://a.test")
+    assert status == 200
+    assert headers["Content-Type"].startswith("text/markdown")
+    assert body == b"# stub-markdown"
+
+    status, headers, body = _get(f"{base}/render/pdf?url=https://a.test")
+    assert (status, headers["Content-Type"]) == (200, "application/pdf")
+    assert body == b"%PDF-stub%\n"
+
+    request = urllib.request.Request(
+        f"{base}/render/scrape",
+        data=json.dumps({"url": "https://a.test", "selector": "h1"}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        assert response.headers["Content-Type"] == "application/json"
+        assert json.loads(response.read())
+
+    status, _headers, body = _get(f"{base}/healthz")
+    assert status == 200
+    assert json.loads(body)["renders"] == 3
+    assert _get(f"{base}/nowhere")[0] == 404
+    assert _get(f"{base}/metrics")[0] == 404  # metrics not enabled
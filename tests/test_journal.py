@@ -0,0 +1,98 @@
+"""Tests for the resumable batch journal."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+import cloudflare_browser_render.renderers.markdown as markdown_mod
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.journal import DONE, FAILED, PENDING, Journal
+
+
+def test_journal_replays_latest_status(tmp_path):
+    path = tmp_path / "run.jsonl"
+    with Journal(path) as journal:
+        journal.record("markdown", "https://a.test", PENDING)
+        journal.record("markdown", "https://a.test", DONE)
+        journal.record("markdown", "https://b.test", FAILED, error="boom")
+    # Simulate a write cut short by a crash.
+    with path.open("a") as fh:
+        fh.write('{"endpoint": "markdown", "url": "https://c.te')
+
+    with Journal(path, resume=True) as journal:
+        assert journal.status("markdown", "https://a.test") == DONE
+        assert journal.status("markdown", "https://b.test") == FAILED
+        assert journal.status("content", "https://a.test") is None
+        todo = list(journal.track("markdown", ["https://a.test", "https://b.test"]))
+    assert todo == ["https://b.test"]
+    assert journal.skipped == 1
+
+
+def test_journal_without_resume_starts_fresh(tmp_path):
+    path = tmp_path / "run.jsonl"
+    with Journal(path) as journal:
+        journal.record("markdown", "https://a.test", DONE)
+    with Journal(path) as journal:
+        assert journal.status("markdown", "https://a.test") is None
+    assert path.read_text() == ""
+
+
+def test_batch_resume_skips_done_and_writes_dead_letter(monkeypatch):
+    calls: list[str] = []
+    failing = {"https://a.test/2"}
+
+    def _render(url: str) -> str:
+        calls.append(url)
+        if url in failing:
+            raise RuntimeError("quota exhausted")
+        return f"# {url}"
+
+    monkeypatch.setattr(markdown_mod, "render_markdown_lazy", _render)
+    runner = CliRunner()
+    args = ["batch", "markdown", "urls.txt", "-d", "out", "--journal", "run.jsonl"]
+    with runner.isolated_filesystem():
+        Path("urls.txt").write_text("".join(f"https://a.test/{i}\n" for i in range(3)))
+        result = runner.invoke(cli, [*args, "--dead-letter", "failed.txt"])
+        assert result.exit_code == 1
+        assert Path("failed.txt").read_text() == (
+            "# RuntimeError: quota exhausted\nhttps://a.test/2\n"
+        )
+        entries = [json.loads(line) for line in Path("run.jsonl").open()]
+        assert {e["status"] for e in entries} == {PENDING, DONE, FAILED}
+
+        calls.clear()
+        failing.clear()
+        result = runner.invoke(cli, [*args, "--resume"])
+        assert result.exit_code == 0, result.output
+        assert calls == ["https://a.test/2"]
+        assert "Skipped 2 URLs" in result.output
+        assert len(list(Path("out").iterdir())) == 3
+
+
+def test_dead_letter_keeps_multi_line_errors_on_one_comment_line(monkeypatch):
+    def _render(url: str) -> str:
+        raise RuntimeError("upstream said:\n<html>\n  503\n</html>")
+
+    monkeypatch.setattr(markdown_mod, "render_markdown_lazy", _render)
+    runner = CliRunner()
+    args = ["batch", "markdown", "-d", "out", "--dead-letter", "failed.txt"]
+    with runner.isolated_filesystem():
+        Path("urls.txt").write_text("https://a.test/1\n")
+        assert runner.invoke(cli, [*args, "urls.txt"]).exit_code == 1
+        assert Path("failed.txt").read_text() == (
+            "# RuntimeError: upstream said: <html> 503 </html>\nhttps://a.test/1\n"
+        )
+        Path("failed.txt").rename("retry.txt")
+        calls: list[str] = []
+        monkeypatch.setattr(markdown_mod, "render_markdown_lazy", calls.append)
+        runner.invoke(cli, [*args, "retry.txt"])
+        assert calls == ["https://a.test/1"]
+
+
+def test_resume_requires_journal():
+    result = CliRunner().invoke(cli, ["batch", "content", "--resume"])
+    assert result.exit_code == 2
+    assert "--resume requires --journal" in result.output
@@ -0,0 +1,121 @@
+"""Tests for per-request metrics (`--metrics`, `--metrics-file`)."""
+
+from __future__ import annotations
+
+import json
+import types
+
+import pytest
+from click.testing import CliRunner
+
+from cloudflare_browser_render import utils
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.metrics import (
+    Metrics,
+    configure_metrics,
+    percentile,
+    response_size,
+)
+from cloudflare_browser_render.utils import call_with_retry
+
+
+class _RateLimitedError(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    yield
+    configure_metrics(False)
+
+
+def test_percentile_nearest_rank():
+    samples = [float(n) for n in range(1, 101)]
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([], 50) == 0
+
+
+def test_call_with_retry_records_latency_retries_and_errors(monkeypatch):
+    monkeypatch.setattr(utils, "rate_limit_error", lambda: _RateLimitedError)
+    monkeypatch.setattr(utils.time, "sleep", lambda _delay: None)
+    metrics = configure_metrics(True)
+    http = types.SimpleNamespace(content=b"12345")
+    outcomes = iter([_RateLimitedError(), types.SimpleNamespace(http_response=http)])
+
+    def _request():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    call_with_retry(_request, endpoint="pdf")
+    with pytest.raises(KeyError):
+        call_with_retry(lambda: {}["missing"], endpoint="pdf")
+
+    data = metrics.to_dict()["pdf"]
+    assert data["requests"] == 1
+    assert (data["retries"], data["rate_limited"]) == (1, 1)
+    assert data["response_bytes"] == 5
+    assert data["errors"] == {"KeyError": 1}
+
+
+def test_transient_errors_are_retried_honouring_retry_after(monkeypatch):
+    import cloudflare
+    import httpx
+
+    delays = []
+    monkeypatch.setattr(utils.time, "sleep", delays.append)
+    metrics = configure_metrics(True)
+    request = httpx.Request("POST", "https://api.test")
+    limited = httpx.Response(429, headers={"retry-after-ms": "250"}, request=request)
+    outcomes = iter([
+        cloudflare.APIConnectionError(request=request),
+        cloudflare.RateLimitError("slow down", response=limited, body=None),
+        "ok",
+    ])
+
+    def _request():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert call_with_retry(_request, endpoint="links", base_delay=1.0) == "ok"
+    assert delays == [1.0, 0.25]
+    data = metrics.to_dict()["links"]
+    assert (data["requests"], data["retries"], data["rate_limited"]) == (1, 2, 1)
+
+
+def test_response_size_falls_back_to_content_length():
+    class _Streamed:
+        headers = {"content-length": "42"}
+
+        @property
+        def content(self):
+            raise RuntimeError("not read")
+
+    assert response_size(types.SimpleNamespace(http_response=_Streamed())) == 42
+    assert response_size(object()) == 0
+
+
+def test_prometheus_export():
+    metrics = Metrics()
+    metrics.observe("pdf", 0.3, 10)
+    metrics.observe("pdf", 7.0, 20)
+    metrics.observe_error("pdf", ValueError())
+    text = metrics.to_prometheus()
+    assert 'cbr_request_duration_seconds_bucket{endpoint="pdf",le="0.5"} 1' in text
+    assert 'cbr_request_duration_seconds_bucket{endpoint="pdf",le="+Inf"} 2' in text
+    assert 'cbr_response_bytes_total{endpoint="pdf"} 30' in text
+    assert 'cbr_errors_total{endpoint="pdf",error="ValueError"} 1' in text
+
+
+@pytest.mark.usefixtures("stub_client")
+def test_cli_exports_metrics_file(tmp_path):
+    metrics_file = tmp_path / "metrics.json"
+    args = ["--metrics-file", str(metrics_file), "content", "https://a.test"]
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    assert "Request metrics" in result.output
+    assert json.loads(metrics_file.read_text())["content"]["requests"] == 1
@@ -0,0 +1,137 @@
+"""Tests for the local mock API (`cbr mock-server`) and `--base-url`."""
+
+from __future__ import annotations
+
+import base64
+import json
+import random
+import threading
+
+import pytest
+from click.testing import CliRunner
+
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.client import configure_client
+from cloudflare_browser_render.extract import configure_extraction
+from cloudflare_browser_render.mockserver import (
+    MockBrowserRendering,
+    parse_latency,
+    serve_mock,
+)
+from cloudflare_browser_render.renderers import get_renderer
+
+PATH = "/client/v4/accounts/acct/browser-rendering/{}"
+
+
+@pytest.fixture()
+def mock_server():
+    mock = MockBrowserRendering(binary_size=100_000, seed=0)
+    server = serve_mock(mock, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    configure_client()
+
+
+def _body(response) -> bytes:
+    return b"".join(response.chunks)
+
+
+def test_parse_latency():
+    rng = random.Random(0)
+    assert parse_latency("0.25")(rng) == 0.25
+    assert 0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2
+    assert parse_latency("normal:0,1")(rng) >= 0
+    for bad in ("slow", "uniform:1", "exponential:0", "fixed:-1"):
+        with pytest.raises(ValueError):
+            parse_latency(bad)
+
+
+def test_injected_rate_limits_carry_retry_after():
+    mock = MockBrowserRendering(rate_limit_rate=1.0, retry_after=2)
+    _delay, response = mock.handle(PATH.format("content"), b"{}")
+    assert response.status == 429
+    assert response.headers["retry-after"] == "2"
+    assert json.loads(_body(response))["success"] is False
+
+    mock = MockBrowserRendering(error_rate=1.0)
+    assert mock.handle(PATH.format("pdf"), b"{}")[1].status == 500
+    assert mock.handle("/nowhere", b"")[1].status == 404
+
+
+def test_snapshot_screenshot_has_binary_size():
+    mock = MockBrowserRendering(binary_size=3 * 1024 * 1024)
+    body = json.loads(_body(mock.handle(PATH.format("snapshot"), b"{}")[1]))
+    assert len(base64.b64decode(body["result"]["screenshot"])) == 3 * 1024 * 1024
+
+
+def test_canned_payloads(tmp_path):
+    (tmp_path / "links.json").write_text('["https://canned.test"]')
+    (tmp_path / "pdf.pdf").write_bytes(b"%PDF-canned")
+    mock = MockBrowserRendering(payload_dir=tmp_path)
+    links = json.loads(_body(mock.handle(PATH.format("links"), b"{}")[1]))
+    assert links["result"] == ["https://canned.test"]
+    assert _body(mock.handle(PATH.format("pdf"), b"{}")[1]) == b"%PDF-canned"
+
+
+def test_sdk_talks_to_mock_server(mock_server):
+    configure_client(base_url=mock_server.base_url)
+    assert get_renderer("content")("https://a.test").startswith('{"success"')
+    assert len(get_renderer("pdf")("https://a.test")) == 100_000
+    assert mock_server.mock.requests == {"content": 1, "pdf": 1}
+
+
+@pytest.mark.parametrize("endpoint", ["markdown", "links"])
+def test_local_extraction_matches_remote_shape(mock_server, endpoint):
+    configure_client(base_url=mock_server.base_url)
+    remote = get_renderer(endpoint)("https://a.test")
+    configure_extraction(True)
+    try:
+        local = get_renderer(endpoint)("https://a.test")
+    finally:
+        configure_extraction(False)
+    assert type(local) is type(remote)
+    if isinstance(remote, str):
+        remote, local = json.loads(remote), json.loads(local)
+    assert local["success"] is remote["success"] is True
+    assert type(local["result"]) is type(remote["result"])
+
+
+def test_cli_base_url(mock_server):
+    args = ["--base-url", mock_server.base_url, "links", "https://a.test"]
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    assert "https://a.test/page/0" in result.output
+
+
+def test_mock_server_rejects_bad_latency():
+    result = CliRunner().invoke(cli, ["mock-server", "--latency", "sometimes"])
+    assert result.exit_code == 2
+    assert "invalid latency" in result.output
+
+
+def test_metrics_count_every_rate_limited_attempt(tmp_path):
+    mock = MockBrowserRendering(rate_limit_rate=0.3, retry_after=0.001, seed=1)
+    server = serve_mock(mock, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = tmp_path / "urls.txt"
+    urls.write_text("".join(f"https://a.test/{n}\n" for n in range(40)))
+    metrics_file = tmp_path / "metrics.json"
+    try:
+        result = CliRunner().invoke(
+            cli,
+            ["--base-url", server.base_url, "--metrics-file", str(metrics_file),
+             "batch", "markdown", str(urls), "-d", str(tmp_path / "out")],
+        )  # fmt: skip
+    finally:
+        server.shutdown()
+        server.server_close()
+        configure_client()
+    data = json.loads(metrics_file.read_text())["markdown"]
+    failed = data["errors"].get("RateLimitError", 0)
+    assert result.exit_code == (1 if failed else 0), result.output
+    assert data["rate_limited"] == mock.rate_limited["markdown"] > 0
+    assert data["retries"] == data["rate_limited"] - failed
+    assert data["requests"] + data["rate_limited"] == mock.requests["markdown"]
@@ -0,0 +1,138 @@
+"""Tests for JSON Lines output (`--format ndjson`)."""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+import types
+
+import pytest
+from click.testing import CliRunner
+
+import cloudflare_browser_render.ndjson as ndjson_mod
+import cloudflare_browser_render.renderers.content as content_mod
+from cloudflare_browser_render import utils
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.ndjson import NDJSONWriter, dumps_line
+
+
+@pytest.fixture()
+def site(monkeypatch):
+    import cloudflare_browser_render.renderers.links as links_mod
+
+    pages = {"https://a.test/": ["/docs", "/blog"], "https://a.test/docs": ["/x"]}
+    monkeypatch.setattr(
+        links_mod, "render_links", lambda url: {"result": pages.get(url, [])}
+    )
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_dumps_line_is_compact_utf8(monkeypatch, fast):
+    if not fast:
+        monkeypatch.setattr(ndjson_mod, "_orjson", None)
+    line = dumps_line({"url": "https://a.test/é", "result": [1, {"a": None}]})
+    assert line == '{"url":"https://a.test/é","result":[1,{"a":null}]}\n'.encode()
+    assert dumps_line({1: "x"}) == b'{"1":"x"}\n'
+
+
+def test_writer_flushes_every_line():
+    class _Stream(io.BytesIO):
+        flushes = 0
+
+        def flush(self):
+            self.flushes += 1
+
+    stream = _Stream()
+    writer = NDJSONWriter(stream)
+    writer.write({"n": 1})
+    writer.write({"n": 2})
+    assert stream.getvalue() == b'{"n":1}\n{"n":2}\n'
+    assert (stream.flushes, writer.count) == (2, 2)
+
+
+def test_batch_ndjson_streams_results_and_errors(monkeypatch, tmp_path):
+    def _render(url: str) -> str:
+        if url.endswith("bad"):
+            raise RuntimeError("boom")
+        return f"<p>{url}</p>"
+
+    monkeypatch.setattr(content_mod, "render_content", _render)
+    urls = tmp_path / "urls.txt"
+    urls.write_text("https://a.test/ok\nhttps://a.test/bad\n")
+    result = CliRunner().invoke(
+        cli, ["batch", "content", str(urls), "--format", "ndjson"]
+    )
+    assert result.exit_code == 1
+    lines = {r["url"]: r for r in map(json.loads, result.stdout.splitlines())}
+    assert lines["https://a.test/ok"] == {
+        "url": "https://a.test/ok",
+        "endpoint": "content",
+        "result": "<p>https://a.test/ok</p>",
+    }
+    assert lines["https://a.test/bad"]["error"] == "RuntimeError: boom"
+    assert "Rendered 1/2 URLs as JSON lines" in result.stderr
+
+
+class _RateLimitedError(Exception):
+    pass
+
+
+def test_batch_ndjson_stdout_holds_only_json(stub_client, monkeypatch, tmp_path):
+    monkeypatch.setattr(utils, "rate_limit_error", lambda: _RateLimitedError)
+    monkeypatch.setattr(utils.time, "sleep", lambda _delay: None)
+    seen, lock = set(), threading.Lock()
+
+    def create(url, **_kwargs):
+        with lock:
+            first, _ = url not in seen, seen.add(url)
+        if first:  # every URL is rate limited once
+            raise _RateLimitedError(url)
+        return types.SimpleNamespace(read=lambda: b"# stub-markdown")
+
+    stub_client.browser_rendering.markdown.with_raw_response.create = create
+    urls = tmp_path / "urls.txt"
+    urls.write_text("".join(f"https://a.test/{n}\n" for n in range(20)))
+    result = CliRunner().invoke(
+        cli,
+        ["batch", "markdown", str(urls), "--format", "ndjson", "--adaptive",
+         "-j", "8"],
+    )  # fmt: skip
+    assert result.exit_code == 0, result.output
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+    assert len(lines) == 20
+    assert {line["result"] for line in lines} == {"# stub-markdown"}
+    assert "Rate limit hit" in result.stderr
+    assert "Concurrency window" in result.stderr
+
+
+def test_batch_ndjson_rejects_binary_endpoints_and_file_options(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(cli, ["batch", "pdf", "-", "--format", "ndjson"], input="")
+    assert result.exit_code == 2
+    assert "binary" in result.output
+    result = runner.invoke(cli, ["batch", "content", "-", "-o", "x.jsonl"], input="")
+    assert result.exit_code == 2
+
+
+@pytest.mark.usefixtures("stub_client")
+def test_crawl_ndjson(tmp_path, site):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["crawl", "https://a.test/", "--max-depth", "1", "--format", "ndjson"]
+    )
+    assert result.exit_code == 0, result.output
+    pages = [json.loads(line) for line in result.stdout.splitlines()]
+    assert {"url": "https://a.test/", "depth": 0} in pages
+    assert len(pages) == 3
+
+    out = tmp_path / "pages.jsonl"
+    result = runner.invoke(
+        cli,
+        ["crawl", "https://a.test/", "--max-depth", "1", "--then", "markdown",
+         "--format", "ndjson", "-o", str(out)],
+    )  # fmt: skip
+    assert result.exit_code == 0, result.output
+    rendered = [json.loads(line) for line in out.read_text().splitlines()]
+    assert len(rendered) == 3
+    assert {r["result"] for r in rendered} == {"# stub-markdown"}
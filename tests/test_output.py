@@ -0,0 +1,88 @@
+"""Tests for raw result output on stdout (pipes and `--raw`)."""
+
+from __future__ import annotations
+
+import io
+import types
+
+import pytest
+from click.testing import CliRunner
+
+from cloudflare_browser_render import utils
+from cloudflare_browser_render.cli import cli
+
+TEXT = "[bold]not markup[/bold] " + "x" * 300
+
+
+class _RateLimitedError(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def _reset_output():
+    yield
+    utils.configure_output(False)
+
+
+def test_piped_output_is_written_unchanged(capsysbinary):
+    utils.print_text(TEXT)
+    utils.print_text("ends with newline\n")
+    utils.print_json({"name": "café", "links": ["https://a.test"]})
+    assert capsysbinary.readouterr().out == (
+        f"{TEXT}\nends with newline\n".encode()
+        + '{\n  "name": "café",\n  "links": [\n    "https://a.test"\n  ]\n}\n'.encode()
+    )
+
+
+def test_terminal_output_goes_through_rich_without_markup(monkeypatch):
+    from rich.console import Console
+
+    # Patched here rather than in a fixture: pytest swaps sys.stdout per phase.
+    terminal = io.BytesIO()
+    stdout = types.SimpleNamespace(isatty=lambda: True, buffer=terminal)
+    monkeypatch.setattr(utils.sys, "stdout", stdout)
+    screen = io.StringIO()
+    monkeypatch.setattr(utils, "_console", Console(file=screen, width=40))
+    utils.print_text(TEXT)
+    assert terminal.getvalue() == b""
+    assert "[bold]not markup[/bold]" in screen.getvalue()
+    assert max(map(len, screen.getvalue().splitlines())) <= 40  # wrapped
+
+    utils.configure_output(True)
+    utils.print_text(TEXT)
+    assert terminal.getvalue() == f"{TEXT}\n".encode()
+
+
+@pytest.mark.usefixtures("stub_client")
+def test_cli_prints_raw_results():
+    runner = CliRunner()
+    result = runner.invoke(cli, ["markdown", "https://a.test"])
+    assert result.exit_code == 0, result.output
+    assert result.stdout_bytes == b"# stub-markdown\n"
+
+    result = runner.invoke(cli, ["--raw", "links", "https://a.test"])
+    assert result.stdout_bytes == b'["https://example.com"]\n'
+
+
+def test_retry_warnings_and_status_stay_off_stdout(stub_client, monkeypatch, tmp_path):
+    monkeypatch.setattr(utils, "rate_limit_error", lambda: _RateLimitedError)
+    monkeypatch.setattr(utils.time, "sleep", lambda _delay: None)
+    outcomes = iter([_RateLimitedError(), None, None])
+
+    def create(**_kwargs):
+        if (error := next(outcomes)) is not None:
+            raise error
+        return types.SimpleNamespace(read=lambda: b"# stub-markdown")
+
+    stub_client.browser_rendering.markdown.with_raw_response.create = create
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--raw", "markdown", "https://a.test"])
+    assert result.exit_code == 0, result.output
+    assert result.stdout_bytes == b"# stub-markdown\n"
+    assert "Rate limit hit" in result.stderr
+
+    target = tmp_path / "page.md"
+    result = runner.invoke(cli, ["markdown", "https://a.test", "-o", str(target)])
+    assert result.exit_code == 0, result.output
+    assert result.stdout_bytes == b""
+    assert "Saved file to" in result.stderr
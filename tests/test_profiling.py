@@ -0,0 +1,70 @@
+"""Tests for the phase profiler (`--profile`)."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.profiling import (
+    configure_profiling,
+    phase,
+    timed_chunks,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_profile():
+    yield
+    configure_profiling(False)
+
+
+def test_nested_phases_charge_self_time():
+    profile = configure_profiling(True)
+    with phase("outer"):
+        time.sleep(0.02)
+        with phase("inner"):
+            time.sleep(0.05)
+    stats = {stat.name: stat for stat in profile.phases()}
+    assert stats["inner"].seconds >= 0.05
+    assert 0.02 <= stats["outer"].seconds < 0.05
+    assert (stats["outer"].calls, stats["inner"].calls) == (1, 1)
+
+
+def test_timed_chunks_charges_waits_to_network():
+    profile = configure_profiling(True)
+
+    def _slow():
+        time.sleep(0.02)
+        yield b"a"
+
+    with phase("write"):
+        assert list(timed_chunks(_slow())) == [b"a"]
+    stats = {stat.name: stat.seconds for stat in profile.phases()}
+    assert stats["network"] >= 0.02 > stats["write"]
+
+
+def test_phase_is_a_no_op_when_disabled():
+    with phase("anything"):
+        pass
+    assert configure_profiling(False) is None
+
+
+def test_memory_report_lists_allocation_sites():
+    profile = configure_profiling(True, memory=True)
+    blob = [bytes(1024) for _ in range(100)]
+    peak, sites = profile.memory_report()
+    assert peak >= 100 * 1024
+    assert sites
+    del blob
+
+
+@pytest.mark.usefixtures("stub_client")
+def test_cli_profile_reports_phases():
+    result = CliRunner().invoke(cli, ["--profile", "json", "https://a.test"])
+    assert result.exit_code == 0, result.output
+    assert "Profile (" in result.output
+    for name in ("network", "decode", "write"):
+        assert name in result.output
@@ -0,0 +1,75 @@
+"""Tests for the client-side token-bucket rate limiter."""
+
+from __future__ import annotations
+
+import pytest
+from click.testing import CliRunner
+
+from cloudflare_browser_render import ratelimit
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.ratelimit import (
+    RateLimiter,
+    SQLiteTokenBucket,
+    TokenBucket,
+    configure_rate_limit,
+    get_rate_limiter,
+)
+from cloudflare_browser_render.utils import call_with_retry
+
+
+@pytest.fixture(autouse=True)
+def _reset_limiter():
+    yield
+    configure_rate_limit(None)
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.02)
+
+
+def test_sqlite_buckets_share_budget_between_instances(tmp_path):
+    state = tmp_path / "limits.sqlite"
+    first = SQLiteTokenBucket(state, "acct", rate=1)
+    second = SQLiteTokenBucket(state, "acct", rate=1)
+    other = SQLiteTokenBucket(state, "other-acct", rate=1)
+
+    assert first.reserve() == 0
+    assert second.reserve() == pytest.approx(1, abs=0.05)
+    assert other.reserve() == 0
+
+
+def test_endpoint_limit_applies_on_top_of_account_limit():
+    limiter = RateLimiter(600, endpoint_limits={"pdf": 60})
+    assert limiter.reserve("pdf") == 0
+    # The account bucket (10/s) would allow this; the pdf bucket (1/s) doesn't.
+    assert limiter.reserve("pdf") == pytest.approx(1, abs=0.05)
+    # Both pdf requests also used account tokens: 2 queued at 10/s.
+    assert limiter.reserve("content") == pytest.approx(0.2, abs=0.05)
+
+
+def test_call_with_retry_waits_for_limiter(monkeypatch):
+    sleeps: list[float] = []
+    monkeypatch.setattr(ratelimit.time, "sleep", sleeps.append)
+    configure_rate_limit(60)
+
+    for _ in range(3):
+        assert call_with_retry(lambda: "ok", endpoint="content") == "ok"
+
+    assert sleeps == [pytest.approx(1, abs=0.05), pytest.approx(2, abs=0.05)]
+
+
+def test_cli_configures_limiter(tmp_path, stub_client):
+    state = tmp_path / "limits.sqlite"
+    args = ["--rate-limit", "120", "--rate-limit", "pdf=6"]
+    args += ["--rate-limit-state", str(state), "links", "https://a.test"]
+    result = CliRunner().invoke(cli, args)
+
+    assert result.exit_code == 0, result.output
+    limiter = get_rate_limiter()
+    assert limiter.per_minute == 120
+    assert limiter.endpoint_limits == {"pdf": 6}
+    assert state.exists()
@@ -0,0 +1,72 @@
+"""Tests for lazily decoded render results."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from cloudflare_browser_render.cache import ResponseCache
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.renderers import get_renderer
+from cloudflare_browser_render.result import JSON, TEXT, RenderResult, unwrap
+
+# Deliberately not what json.dumps would produce: spacing and escapes survive.
+BODY = b'{"result":  ["https://a.test/\\u00e9"], "success": true}'
+
+
+class _Response:
+    def read(self):
+        return BODY
+
+
+@pytest.fixture()
+def links_body(stub_client):
+    raw = stub_client.browser_rendering.links.with_raw_response
+    raw.create = lambda **_kwargs: _Response()
+
+
+def test_result_decodes_on_demand():
+    result = RenderResult(BODY, JSON)
+    assert result.data is BODY
+    assert "bytes=" in repr(result)
+    assert result._value is RenderResult._UNSET
+    assert result.json()["result"] == ["https://a.test/é"]
+    assert result.value() is result.json()  # parsed once
+    assert result == {"result": ["https://a.test/é"], "success": True}
+    assert RenderResult("# café".encode(), TEXT) == RenderResult.of("# café")
+    assert unwrap(RenderResult.of(["x"])) == ["x"]
+    assert RenderResult.of({"a": "é"}).data == '{"a": "é"}'.encode()
+
+
+def test_cache_keeps_the_body_as_received(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put("links", "https://a.test", None, RenderResult(BODY, JSON))
+    hit = cache.get("links", "https://a.test")
+    assert isinstance(hit, RenderResult)
+    assert hit.data == BODY
+    assert hit._value is RenderResult._UNSET
+
+
+@pytest.mark.usefixtures("stub_client")
+def test_public_renderers_return_plain_values():
+    markdown = get_renderer("markdown")("https://a.test")
+    assert type(markdown) is str
+    assert markdown == "# stub-markdown"
+    snapshot = get_renderer("snapshot")("https://a.test")
+    assert isinstance(snapshot, dict)
+    assert json.dumps(snapshot) == '{"id": "abc123"}'
+    assert isinstance(
+        get_renderer("markdown", lazy=True)("https://a.test"), RenderResult
+    )
+    assert get_renderer("pdf", lazy=True) is get_renderer("pdf")
+
+
+@pytest.mark.usefixtures("links_body")
+def test_output_files_get_the_original_bytes(tmp_path):
+    assert get_renderer("links", lazy=True)("https://a.test").data is BODY
+    target = tmp_path / "links.json"
+    result = CliRunner().invoke(cli, ["links", "https://a.test", "-o", str(target)])
+    assert result.exit_code == 0, result.output
+    assert target.read_bytes() == BODY
@@ -0,0 +1,101 @@
+"""Tests for multi-selector scraping."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.renderers.scrape import demux_fields, render_scrape
+
+
+class _Response:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def read(self):
+        return json.dumps(self._payload).encode()
+
+
+@pytest.fixture()
+def scrape_calls(stub_client):
+    """Answer scrape requests with one entry per element and record them.
+
+    Returns:
+        The list of ``elements`` payloads sent.
+
+    """
+    calls: list[list[dict]] = []
+
+    def _create(*, account_id, elements, url):
+        calls.append(elements)
+        return _Response({
+            "success": True,
+            "result": [
+                {"selector": e["selector"], "results": [{"text": e["selector"]}]}
+                for e in elements
+            ],
+        })
+
+    stub_client.browser_rendering.scrape.with_raw_response.create = _create
+    return calls
+
+
+def test_demux_fields_by_position():
+    response = {"result": [{"selector": "h1", "results": [1]}, {"results": [2]}]}
+    assert demux_fields(["title", "desc"], response) == {
+        "title": [1],
+        "desc": [2],
+    }
+
+
+def test_render_scrape_fields_use_one_request(scrape_calls):
+    result = render_scrape(
+        "https://a.test",
+        fields={
+            "title": "h1",
+            "canonical": {"selector": "link[rel=canonical]", "expression": "e.href"},
+        },
+    )
+    assert scrape_calls == [
+        [
+            {"selector": "h1"},
+            {"selector": "link[rel=canonical]", "expression": "e.href"},
+        ]
+    ]
+    assert result == {
+        "title": [{"text": "h1"}],
+        "canonical": [{"text": "link[rel=canonical]"}],
+    }
+
+
+def test_render_scrape_requires_selector_or_fields():
+    with pytest.raises(ValueError):
+        render_scrape("https://a.test")
+
+
+def test_cli_scrape_named_selectors_and_spec(tmp_path, scrape_calls):
+    spec = tmp_path / "spec.json"
+    spec.write_text(json.dumps({"desc": {"selector": "meta[name=description]"}}))
+    result = CliRunner().invoke(
+        cli,
+        ["scrape", "https://a.test", "-s", "title=h1", "--spec", str(spec)],
+    )
+    assert result.exit_code == 0, result.output
+    assert len(scrape_calls) == 1
+    assert set(json.loads(result.output)) == {"title", "desc"}
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["scrape", "https://a.test"],
+        ["scrape", "https://a.test", "h1", "-s", "title=h2"],
+        ["scrape", "https://a.test", "-s", "h1"],
+    ],
+)
+def test_cli_scrape_rejects_bad_selector_usage(args):
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 2
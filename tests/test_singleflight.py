@@ -0,0 +1,122 @@
+"""Tests for coalescing of concurrent identical requests (`singleflight.py`)."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from cloudflare_browser_render import aio
+from cloudflare_browser_render.renderers import get_renderer
+from cloudflare_browser_render.singleflight import SingleFlight
+
+
+def test_singleflight_shares_result_and_exception():
+    flight: SingleFlight[int] = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow() -> int:
+        calls.append(1)
+        release.wait(5)
+        return 42
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert sorted(results) == [(42, False)] + [(42, True)] * 4
+    assert flight.in_flight() == 0
+
+    def boom() -> int:
+        raise RuntimeError("nope")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", boom)
+    assert flight.do("k", lambda: 1) == (1, False)  # nothing is cached
+
+
+def test_singleflight_async_shares_one_task():
+    flight: SingleFlight[int] = SingleFlight()
+    calls = []
+
+    async def slow() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 7
+
+    async def main():
+        waiter = asyncio.ensure_future(flight.do_async("k", slow))
+        await asyncio.sleep(0)
+        waiter.cancel()  # a cancelled caller does not cancel the shared call
+        results = await asyncio.gather(*(flight.do_async("k", slow) for _ in range(4)))
+        return results, flight.in_flight()
+
+    results, in_flight = asyncio.run(main())
+    assert len(calls) == 1
+    assert results == [(7, True)] * 4
+    assert in_flight == 0
+
+
+def test_renderers_coalesce_concurrent_threads(stub_client):
+    started, release = threading.Event(), threading.Event()
+    renders = []
+    endpoint = stub_client.browser_rendering.markdown.with_raw_response
+    original = endpoint.create
+
+    def _slow_create(*args, **kwargs):
+        renders.append(kwargs["url"])
+        started.set()
+        release.wait(5)
+        return original(*args, **kwargs)
+
+    endpoint.create = _slow_create
+    render = get_renderer("markdown")
+    results = []
+    threads = [
+        threading.Thread(target=lambda url=url: results.append(render(url)))
+        for url in ["https://a.test"] * 8 + ["https://b.test"] * 2
+    ]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(renders) == ["https://a.test", "https://b.test"]
+    assert results == ["# stub-markdown"] * 10
+
+
+def test_async_renderers_coalesce_concurrent_tasks(stub_async_client):
+    renders = []
+    endpoint = stub_async_client.browser_rendering.links.with_raw_response
+    original = endpoint.create
+
+    async def _slow_create(*args, **kwargs):
+        renders.append(kwargs["url"])
+        await asyncio.sleep(0.05)
+        return await original(*args, **kwargs)
+
+    endpoint.create = _slow_create
+
+    async def main():
+        return await asyncio.gather(
+            *(aio.render_links_async("https://a.test") for _ in range(10))
+        )
+
+    assert asyncio.run(main()) == [["https://example.com"]] * 10
+    assert renders == ["https://a.test"]
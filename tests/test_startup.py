@@ -0,0 +1,72 @@
+"""Start-up budget tests for the CLI.
+
+The CLI is invoked from shell loops, so ``--help`` and argument errors must
+not import the Cloudflare SDK (or other heavy dependencies), read
+credentials, or construct a client. Each check runs in a fresh interpreter so
+that modules imported by other tests do not mask regressions.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Generous enough for slow CI runners, yet far below the ~0.5 s it takes to
+# import the Cloudflare SDK alone.
+IMPORT_BUDGET_S = 0.15
+
+HEAVY_MODULES = ["cloudflare", "httpx", "questionary", "rich", "dotenv", "asyncio"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from cloudflare_browser_render.cli import cli
+elapsed = time.perf_counter() - start
+import click
+if sys.argv[1:]:
+    try:
+        cli.main(sys.argv[1:], standalone_mode=False)
+    except click.UsageError:
+        pass
+heavy = sorted({m.split(".")[0] for m in sys.modules} & set(json.loads(HEAVY)))
+print(json.dumps({"elapsed": elapsed, "heavy": heavy}))
+"""
+
+
+def _probe(*args: str) -> dict:
+    env = {
+        k: v
+        for k, v in os.environ.items()
+        if k not in {"CLOUDFLARE_API_TOKEN", "CLOUDFLARE_ACCOUNT_ID"}
+    }
+    code = _PROBE.replace("HEAVY", repr(json.dumps(HEAVY_MODULES)))
+    proc = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_import_is_within_budget():
+    # Best of three to smooth out noisy CI machines.
+    elapsed = min(_probe()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_S
+
+
+@pytest.mark.parametrize(
+    "args", [["--help"], ["markdown", "--help"], ["batch", "--help"]]
+)
+def test_help_needs_no_credentials_or_heavy_imports(args):
+    assert _probe(*args)["heavy"] == []
+
+
+@pytest.mark.parametrize("args", [["batch", "nope"], ["--cache-ttl", "x", "pdf"]])
+def test_argument_errors_skip_heavy_imports(args):
+    assert _probe(*args)["heavy"] == []
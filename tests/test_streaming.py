@@ -0,0 +1,72 @@
+"""Tests for streaming PDF/screenshot bodies to disk."""
+
+from __future__ import annotations
+
+import base64
+
+import pytest
+from click.testing import CliRunner
+
+from cloudflare_browser_render.cache import configure_cache
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.renderers import get_streamer
+from cloudflare_browser_render.utils import iter_base64, save_stream
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache():
+    yield
+    configure_cache(None)
+
+
+def test_save_stream_is_atomic(tmp_path):
+    def _chunks():
+        yield b"partial"
+        raise OSError("connection reset")
+
+    target = tmp_path / "out.pdf"
+    with pytest.raises(OSError):
+        save_stream(_chunks(), str(target))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_iter_base64_decodes_in_chunks():
+    data = bytes(range(256)) * 40
+    encoded = base64.b64encode(data).decode()
+    chunks = list(iter_base64(encoded, chunk_size=1000))
+    assert b"".join(chunks) == data
+    assert max(map(len, chunks)) <= 1000
+    assert b"".join(iter_base64(base64.encodebytes(data).decode(), 999)) == data
+    for bad in ("abc", "ab!d"):
+        with pytest.raises(ValueError, match="invalid base64"):
+            list(iter_base64(bad))
+
+
+def test_stream_pdf_writes_file(tmp_path, stub_client):
+    target = tmp_path / "doc.pdf"
+    assert get_streamer("pdf")("https://a.test", str(target)) == target
+    assert target.read_bytes() == b"%PDF-stub%\n"
+
+
+def test_streamed_body_is_cached(tmp_path, stub_client):
+    calls = []
+    endpoint = stub_client.browser_rendering.screenshot.with_streaming_response
+    original = endpoint.create
+
+    def _counting_create(*args, **kwargs):
+        calls.append(kwargs["url"])
+        return original(*args, **kwargs)
+
+    endpoint.create = _counting_create
+    configure_cache(tmp_path / "cache")
+    for name in ("a.png", "b.png"):
+        get_streamer("screenshot")("https://a.test", str(tmp_path / name))
+
+    assert calls == ["https://a.test"]
+    assert (tmp_path / "a.png").read_bytes() == (tmp_path / "b.png").read_bytes()
+
+
+def test_cli_pdf_to_stdout(stub_client):
+    result = CliRunner().invoke(cli, ["pdf", "https://a.test", "-o", "-"])
+    assert result.exit_code == 0, result.output
+    assert result.stdout_bytes == b"%PDF-stub%\n"
@@ -0,0 +1,98 @@
+"""Tests for incremental change detection (`cbr watch`, `--incremental`)."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+import cloudflare_browser_render.renderers.markdown as markdown_mod
+from cloudflare_browser_render.cli import cli
+from cloudflare_browser_render.watch import ContentState, content_hash
+
+
+def test_content_hash_normalises_whitespace_and_key_order():
+    assert content_hash("<p>a\n   b</p>") == content_hash("<p>a b</p>  ")
+    assert content_hash({"a": 1, "b": 2}) == content_hash({"b": 2, "a": 1})
+    assert content_hash("a") != content_hash("b")
+
+
+def test_state_reports_only_changes_and_persists(tmp_path):
+    path = tmp_path / "state.json"
+    state = ContentState(path)
+    assert state.check("markdown", "https://a.test", "# v1").kind == "new"
+    assert state.check("markdown", "https://a.test", "# v1") is None
+    state.save()
+
+    state = ContentState(path)
+    assert state.check("markdown", "https://a.test", "#  v1") is None
+    event = state.check("markdown", "https://a.test", "# v2")
+    assert event.kind == "changed"
+    assert event.previous == content_hash("# v1")
+
+
+def test_state_rejects_foreign_files(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text("[]")
+    with pytest.raises(ValueError):
+        ContentState(path)
+
+
+def test_watch_only_writes_changed_pages(monkeypatch):
+    pages_2 = "https://a.test/2"
+    pages = {"https://a.test/1": "# one", pages_2: "# two"}
+    monkeypatch.setattr(markdown_mod, "render_markdown_lazy", pages.__getitem__)
+    runner = CliRunner()
+    args = ["watch", "markdown", "urls.txt", "-d", "out", "--events", "events.jsonl"]
+    with runner.isolated_filesystem():
+        Path("urls.txt").write_text("\n".join(pages))
+        assert runner.invoke(cli, args).exit_code == 0
+        assert len(list(Path("out").iterdir())) == 2
+
+        for path in Path("out").iterdir():
+            path.unlink()
+        pages[pages_2] = "# two, edited"
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 0, result.output
+        assert "Pass 1: 1 of 2 pages new or changed" in result.output
+        assert len(list(Path("out").iterdir())) == 1
+
+        events = [json.loads(line) for line in Path("events.jsonl").open()]
+        assert {(e["event"], e["url"]) for e in events[:2]} == {
+            ("new", "https://a.test/1"),
+            ("new", "https://a.test/2"),
+        }
+        assert (events[2]["event"], events[2]["url"]) == ("changed", pages_2)
+
+
+@pytest.mark.usefixtures("stub_client")
+def test_batch_incremental_skips_unchanged(tmp_path):
+    runner = CliRunner()
+    urls = tmp_path / "urls.txt"
+    urls.write_text("https://a.test/1\n")
+    args = ["batch", "pdf", str(urls), "-d", str(tmp_path / "out"),
+            "--incremental", str(tmp_path / "state.json")]  # fmt: skip
+    assert runner.invoke(cli, args).exit_code == 0
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    assert "0 of them new or changed" in result.output
+
+
+@pytest.mark.usefixtures("stub_client")
+def test_incremental_journal_does_not_mark_unchanged_pages_done(tmp_path):
+    runner = CliRunner()
+    urls = tmp_path / "urls.txt"
+    urls.write_text("https://a.test/1\n")
+    journal = tmp_path / "run.jsonl"
+    args = ["batch", "markdown", str(urls), "-d", str(tmp_path / "out"),
+            "--incremental", str(tmp_path / "state.json"),
+            "--journal", str(journal)]  # fmt: skip
+    assert runner.invoke(cli, args).exit_code == 0
+    assert runner.invoke(cli, args).exit_code == 0
+    statuses = [json.loads(line)["status"] for line in journal.open()]
+    assert statuses == ["pending", "unchanged"]
+    result = runner.invoke(cli, [*args, "--resume"])
+    assert result.exit_code == 0, result.output
+    assert "Skipped" not in result.output